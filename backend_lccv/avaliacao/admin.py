@@ -1,8 +1,43 @@
 from django.contrib import admin
-from .models import Colaborador, TipoItemAvaliacaoDesempenho, AvaliacaoDesempenho, ItemAvaliacaoDesempenho
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import Colaborador, TipoItemAvaliacaoDesempenho, AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao
+
+class PaginadorContagemEstimada(Paginator):
+    """
+    Sem filtros na changelist, usa a estimativa de linhas do postgres
+    (pg_class.reltuples, atualizada pelo autovacuum/ANALYZE) no lugar do
+    COUNT(*) da tabela inteira. Tabelas pequenas, estimativa ausente ou
+    changelist filtrada/buscada continuam com a contagem exata
+    """
+
+    minimo_estimativa = 100_000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and connections[self.object_list.db].vendor == 'postgresql':
+            with connections[self.object_list.db].cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [self.object_list.model._meta.db_table],
+                )
+                linha = cursor.fetchone()
+            if linha and linha[0] >= self.minimo_estimativa:
+                return linha[0]
+        return super().count
+
+
+class ListagemGrandeAdmin(admin.ModelAdmin):
+    """Changelist de tabela grande: contagem estimada e sem o segundo COUNT do total"""
+
+    paginator = PaginadorContagemEstimada
+    show_full_result_count = False
+
 
 @admin.register(Colaborador)
-class ColaboradorAdmin(admin.ModelAdmin):
+class ColaboradorAdmin(ListagemGrandeAdmin):
     list_display = ['id', 'nome', 'cargo']
     search_fields = ['nome', 'cargo']
     ordering = ['nome']
@@ -21,11 +56,15 @@ class ItemAvaliacaoDesempenhoInline(admin.TabularInline):
     readonly_fields = ['tipo_item_avaliacao_desempenho']
     can_delete = False
 
+    def get_queryset(self, request):
+        # o tipo eh exibido (readonly) em cada linha
+        return super().get_queryset(request).select_related('tipo_item_avaliacao_desempenho')
+
     def has_add_permission(self, request, obj=None):
         return False
     
 @admin.register(AvaliacaoDesempenho)
-class AvaliacaoDesempenhoAdmin(admin.ModelAdmin):
+class AvaliacaoDesempenhoAdmin(ListagemGrandeAdmin):
     list_display = [
         'id',
         'colaborador',
@@ -34,11 +73,14 @@ class AvaliacaoDesempenhoAdmin(admin.ModelAdmin):
         'status_avaliacao',
         'nota',
     ]
+    list_select_related = ['colaborador', 'supervisor']
 
     list_filter = ['status_avaliacao', 'mes_competencia']
     search_fields = ['colaborador__nome', 'supervisor__nome']
     ordering = ['-mes_competencia', 'colaborador__nome']
     readonly_fields = ['nota', 'status_avaliacao']
+    # busca por nome (ColaboradorAdmin.search_fields) em vez de um <select> com todos os colaboradores
+    autocomplete_fields = ['colaborador', 'supervisor']
     inlines = [ItemAvaliacaoDesempenhoInline]
 
     fieldsets = (
@@ -56,35 +98,39 @@ class AvaliacaoDesempenhoAdmin(admin.ModelAdmin):
 
     actions = ['acao_iniciar', 'acao_dar_feedback', 'acao_concluir']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).com_nota()
+
     @admin.action(description='Iniciar avaliacoes selecionadas')
     def acao_iniciar(self, request, queryset):
-        for avaliacao in queryset.filter(status_avaliacao='Criada'):
-            avaliacao.iniciar()
-        self.message_user(request, 'Avaliacoes iniciadas com sucesso')
+        atualizadas = queryset.transicionar(StatusAvaliacao.EM_ELABORACAO)
+        self.message_user(request, f'{len(atualizadas)} avaliacoes iniciadas com sucesso')
 
     @admin.action(description='Dar feedback nas avaliacoes selecionadas')
     def acao_dar_feedback(self, request, queryset):
-        for avaliacao in queryset.filter(status_avaliacao='Em elaboracao'):
-            avaliacao.dar_feedback()
-        self.message_user(request, 'Feedback registrado com sucesso')
+        atualizadas = queryset.transicionar(StatusAvaliacao.EM_AVALIACAO)
+        self.message_user(request, f'Feedback registrado em {len(atualizadas)} avaliacoes')
 
     @admin.action(description='Concluir avaliacoes selecionadas')
     def acao_concluir(self, request, queryset):
-        for avaliacao in queryset.filter(status_avaliacao='Em avaliacao'):
-            avaliacao.concluir()
-        self.message_user(request, 'Avaliações concluídas com sucesso.')
+        atualizadas = queryset.transicionar(StatusAvaliacao.CONCLUIDA)
+        self.message_user(request, f'{len(atualizadas)} avaliações concluídas com sucesso.')
 
 @admin.register(ItemAvaliacaoDesempenho)
-class ItemAvaliacaoDesempenhoAdmin(admin.ModelAdmin):
+class ItemAvaliacaoDesempenhoAdmin(ListagemGrandeAdmin):
     list_display = [
         'id',
         'avaliacao_desempenho',
         'tipo_item_avaliacao_desempenho',
         'nota',
     ]
+    # o __str__ da avaliacao usa o nome do colaborador
+    list_select_related = ['avaliacao_desempenho__colaborador', 'tipo_item_avaliacao_desempenho']
     list_filter = ['tipo_item_avaliacao_desempenho__dimensao']
     search_fields = [
         'avaliacao_desempenho__colaborador__nome',
         'tipo_item_avaliacao_desempenho__tipo_item_avaliacao_desempenho',
     ]
-    ordering = ['avaliacao_desempenho', 'tipo_item_avaliacao_desempenho__dimensao']
\ No newline at end of file
+    ordering = ['avaliacao_desempenho', 'tipo_item_avaliacao_desempenho__dimensao']
+    # o <select> listaria todas as avaliacoes, com uma consulta do colaborador por opcao
+    raw_id_fields = ['avaliacao_desempenho']
@@ -0,0 +1,317 @@
+"""
+Variantes async dos endpoints de leitura, para quando a API roda com ASGI.
+
+Ficam em /api/async/ e repetem list/retrieve de avaliacoes, itens e
+colaboradores, a exportacao e os relatorios. A configuracao vem dos proprios
+viewsets do DRF, entao filtros, ordenacao, paginacao, ?fields= e ETag /
+Last-Modified se comportam igual e o corpo das respostas eh o mesmo.
+
+A parte sincrona (autenticacao, permissoes, negociacao de conteudo, montagem
+da consulta e catalogo) roda numa chamada de sync_to_async. As consultas usam
+o ORM async (aaggregate, aget, async for, aiterator). A exportacao eh um
+gerador async, entao um cliente lento baixando o arquivo nao prende uma
+thread do worker.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import require_GET
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from . import exportacao, relatorios
+from .catalogo import tipos_item_por_id, total_tipos_item
+from .filters import colunas_ordenacao
+from .metricas import medir_serializacao
+from .models import AvaliacaoDesempenho
+from .serializacao import aserializar_avaliacoes, aserializar_itens, consulta_itens
+from .serializers import (
+    ColaboradorSerializer,
+    PeriodoRelatorioSerializer,
+    RelatorioDimensaoSerializer,
+    RelatorioMesSerializer,
+    RelatorioStatusMesSerializer,
+    RelatorioSupervisorSerializer,
+    RelatorioTipoItemSerializer,
+)
+from .views import (
+    AvaliacaoDesempenhoViewSet,
+    ColaboradorViewSet,
+    ItemAvaliacaoDesempenhoViewSet,
+    RelatorioViewSet,
+)
+
+
+def _criar_view(viewset_class, acao, request, kwargs):
+    """Instancia o viewset como o router faz (ViewSetMixin.as_view), sem o dispatch sincrono"""
+    # so JSON: o renderer navegavel do DRF consulta o banco de forma sincrona
+    initkwargs = {'renderer_classes': [JSONRenderer]}
+    initkwargs.update(getattr(getattr(viewset_class, acao), 'kwargs', {}))
+    view = viewset_class(**initkwargs)
+    view.action_map = {'get': acao}
+    view.args = ()
+    view.kwargs = kwargs
+    view.request = view.initialize_request(request, **kwargs)
+    # os endpoints async so atendem GET
+    view.headers = {**view.default_response_headers, 'Allow': 'GET'}
+    return view
+
+
+def _iniciar(view, preparar):
+    view.initial(view.request, **view.kwargs)
+    return preparar(view)
+
+
+async def _atender(viewset_class, acao, request, kwargs, preparar, responder):
+    """
+    Roda preparar(view) numa thread (junto com autenticacao e permissoes) e
+    depois responder(view, preparado) no event loop. Erros viram a mesma
+    resposta que o DRF daria
+    """
+    view = _criar_view(viewset_class, acao, request, kwargs)
+    try:
+        preparado = await sync_to_async(_iniciar)(view, preparar)
+        response = await responder(view, preparado)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    response = view.finalize_response(view.request, response)
+    return response.render() if isinstance(response, Response) else response
+
+
+def _filtro_lookup(view, queryset):
+    """Filtra pelo id da URL; None se o id nao for valido para o campo"""
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        return queryset.filter(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (TypeError, ValueError, ValidationError):
+        return None
+
+
+async def _aobter(view, queryset):
+    """get_object_or_404 do DRF com aget"""
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        return await aget_object_or_404(queryset, **{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (TypeError, ValueError, ValidationError):
+        raise Http404
+
+
+async def _condicional(view, versao, gerar_resposta, exige_objeto=False):
+    """ConditionalGetMixin._responder_condicional com aaggregate"""
+    if versao is None:
+        return await gerar_resposta()
+    dados = await versao.order_by().aaggregate(**view.agregados_versao())
+    # o marcador le a versao do catalogo no cache do Django
+    marcador = await sync_to_async(view.montar_marcador)(dados)
+    if exige_objeto and not marcador[2]:
+        return await gerar_resposta()
+    resultado, referencia = view.avaliar_condicional(view.request, marcador)
+    if resultado is not None:
+        return resultado
+    return view.aplicar_marcador(await gerar_resposta(), referencia)
+
+
+async def _paginar(view, consulta, serializar):
+    if view.paginator is None:
+        return Response(await serializar([linha async for linha in consulta]))
+    linhas = await view.paginator.apaginate_queryset(consulta, view.request, view)
+    return view.paginator.get_paginated_response(await serializar(linhas))
+
+
+def _colunas(campos, ordenacao):
+    return sorted({*campos, *colunas_ordenacao(ordenacao)})
+
+
+# avaliacoes
+
+def _preparar_avaliacoes(view):
+    campos, consulta = view.consulta_rapida()
+    versao = view.get_queryset_versao()
+    versao = view.filter_queryset(versao) if view.action == 'list' else _filtro_lookup(view, versao)
+    tipos = tipos_item_por_id() if 'itens' in campos else None
+    return campos, consulta, versao, tipos
+
+
+async def _responder_avaliacoes(view, preparado):
+    campos, consulta, versao, tipos = preparado
+
+    async def serializar(linhas):
+        with medir_serializacao():
+            return await aserializar_avaliacoes(linhas, campos, tipos)
+
+    async def gerar_lista():
+        return await _paginar(view, consulta, serializar)
+
+    async def gerar_objeto():
+        return Response((await serializar([await _aobter(view, consulta)]))[0])
+
+    if view.action == 'list':
+        return await _condicional(view, versao, gerar_lista)
+    return await _condicional(view, versao, gerar_objeto, exige_objeto=True)
+
+
+@require_GET
+async def avaliacoes(request):
+    return await _atender(
+        AvaliacaoDesempenhoViewSet, 'list', request, {}, _preparar_avaliacoes, _responder_avaliacoes,
+    )
+
+
+@require_GET
+async def avaliacao(request, pk):
+    return await _atender(
+        AvaliacaoDesempenhoViewSet, 'retrieve', request, {'pk': pk}, _preparar_avaliacoes, _responder_avaliacoes,
+    )
+
+
+# itens
+
+def _preparar_itens(view):
+    queryset = view.get_queryset()
+    ordenacao = ()
+    if view.action == 'list' and view.paginator is not None:
+        ordenacao = view.paginator.get_ordering(view.request, queryset, view)
+    consulta = view.filter_queryset(consulta_itens(queryset, ordenacao))
+    versao = view.get_queryset_versao()
+    versao = view.filter_queryset(versao) if view.action == 'list' else _filtro_lookup(view, versao)
+    return consulta, versao, tipos_item_por_id()
+
+
+async def _responder_itens(view, preparado):
+    consulta, versao, tipos = preparado
+    serializar = lambda linhas: aserializar_itens(linhas, tipos)
+
+    async def gerar_lista():
+        return await _paginar(view, consulta, serializar)
+
+    async def gerar_objeto():
+        return Response((await serializar([await _aobter(view, consulta)]))[0])
+
+    if view.action == 'list':
+        return await _condicional(view, versao, gerar_lista)
+    return await _condicional(view, versao, gerar_objeto, exige_objeto=True)
+
+
+@require_GET
+async def itens(request, avaliacao_pk):
+    return await _atender(
+        ItemAvaliacaoDesempenhoViewSet, 'list', request, {'avaliacao_pk': avaliacao_pk},
+        _preparar_itens, _responder_itens,
+    )
+
+
+@require_GET
+async def item(request, avaliacao_pk, pk):
+    return await _atender(
+        ItemAvaliacaoDesempenhoViewSet, 'retrieve', request, {'avaliacao_pk': avaliacao_pk, 'pk': pk},
+        _preparar_itens, _responder_itens,
+    )
+
+
+# colaboradores
+
+def _preparar_colaboradores(view):
+    queryset = view.get_queryset()
+    ordenacao = ()
+    if view.action == 'list' and view.paginator is not None:
+        ordenacao = view.paginator.get_ordering(view.request, queryset, view)
+    campos = ColaboradorSerializer.Meta.fields
+    consulta = view.filter_queryset(queryset.values(*_colunas(campos, ordenacao)))
+    versao = view.get_queryset_versao()
+    versao = view.filter_queryset(versao) if view.action == 'list' else _filtro_lookup(view, versao)
+    return campos, consulta, versao
+
+
+async def _responder_colaboradores(view, preparado):
+    campos, consulta, versao = preparado
+
+    async def serializar(linhas):
+        return [{campo: linha[campo] for campo in campos} for linha in linhas]
+
+    async def gerar_lista():
+        return await _paginar(view, consulta, serializar)
+
+    async def gerar_objeto():
+        return Response((await serializar([await _aobter(view, consulta)]))[0])
+
+    if view.action == 'list':
+        return await _condicional(view, versao, gerar_lista)
+    return await _condicional(view, versao, gerar_objeto, exige_objeto=True)
+
+
+@require_GET
+async def colaboradores(request):
+    return await _atender(
+        ColaboradorViewSet, 'list', request, {}, _preparar_colaboradores, _responder_colaboradores,
+    )
+
+
+@require_GET
+async def colaborador(request, pk):
+    return await _atender(
+        ColaboradorViewSet, 'retrieve', request, {'pk': pk}, _preparar_colaboradores, _responder_colaboradores,
+    )
+
+
+# exportacao
+
+def _preparar_exportacao(view):
+    formato = view.request.accepted_renderer.format
+    avaliacoes = view.filter_queryset(AvaliacaoDesempenho.objects.all())
+    return formato, avaliacoes, tipos_item_por_id(), total_tipos_item()
+
+
+async def _responder_exportacao(view, preparado):
+    formato, avaliacoes, tipos, total_tipos = preparado
+    response = StreamingHttpResponse(
+        exportacao.aexportar(avaliacoes, formato, tipos, total_tipos),
+        content_type=f'{exportacao.FORMATOS[formato]}; charset=utf-8',
+    )
+    nome = exportacao.nome_arquivo(view.request.query_params.get('mes_competencia'), formato)
+    response['Content-Disposition'] = f'attachment; filename="{nome}"'
+    return response
+
+
+@require_GET
+async def exportar(request):
+    return await _atender(
+        AvaliacaoDesempenhoViewSet, 'exportar', request, {}, _preparar_exportacao, _responder_exportacao,
+    )
+
+
+# relatorios: uma consulta curta nas tabelas de resumo, feita na mesma thread da preparacao
+
+RELATORIOS = {
+    'por_mes': (relatorios.media_por_mes, RelatorioMesSerializer),
+    'por_supervisor': (relatorios.media_por_supervisor, RelatorioSupervisorSerializer),
+    'por_dimensao': (relatorios.media_por_dimensao, RelatorioDimensaoSerializer),
+    'por_tipo_item': (relatorios.media_por_tipo_item, RelatorioTipoItemSerializer),
+    'status_por_mes': (relatorios.status_por_mes, RelatorioStatusMesSerializer),
+}
+
+
+def _preparar_relatorio(view):
+    funcao, serializer_class = RELATORIOS[view.action]
+    periodo = PeriodoRelatorioSerializer(data=view.request.query_params)
+    periodo.is_valid(raise_exception=True)
+    return serializer_class(funcao(**periodo.validated_data), many=True).data
+
+
+async def _responder_relatorio(view, dados):
+    return Response(dados)
+
+
+def _view_relatorio(acao):
+    @require_GET
+    async def relatorio(request):
+        return await _atender(RelatorioViewSet, acao, request, {}, _preparar_relatorio, _responder_relatorio)
+    relatorio.__name__ = acao
+    return relatorio
+
+
+relatorio_por_mes = _view_relatorio('por_mes')
+relatorio_por_supervisor = _view_relatorio('por_supervisor')
+relatorio_por_dimensao = _view_relatorio('por_dimensao')
+relatorio_por_tipo_item = _view_relatorio('por_tipo_item')
+relatorio_status_por_mes = _view_relatorio('status_por_mes')
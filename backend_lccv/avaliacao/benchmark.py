@@ -0,0 +1,459 @@
+"""
+Massa de dados sintetica e benchmark dos principais endpoints.
+
+gerar_dados() cria colaboradores, tipos de item nas tres dimensoes e meses de
+avaliacoes com itens avaliados, tudo com bulk_create. A massa eh
+deterministica: o mesmo seed e os mesmos tamanhos geram os mesmos dados.
+
+executar_benchmark() gera a massa em cada escala e mede os endpoints pelo
+django.test.Client (dentro do processo, sem servidor HTTP), com tempos em ms e
+quantidade de consultas SQL. O resultado eh um dict serializavel em JSON para
+comparar execucoes (ver o comando benchmark). Os casos *_rapida e *_serializer
+fazem a mesma requisicao com SERIALIZACAO_RAPIDA ligada e desligada.
+
+executar_carga() compara a vazao dos endpoints sincronos (pool de threads,
+como no WSGI) com a das variantes async de /api/async/ (event loop, como no
+ASGI) com varios clientes simultaneos, opcionalmente lentos.
+"""
+import asyncio
+import platform
+import queue
+import random
+import statistics
+import threading
+import time
+from datetime import date
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .catalogo import invalidar_catalogo
+from .models import (
+    AvaliacaoDesempenho,
+    Colaborador,
+    DimensaoItemAvaliacao,
+    ItemAvaliacaoDesempenho,
+    ResumoMensal,
+    ResumoMensalItem,
+    StatusAvaliacao,
+    TipoItemAvaliacaoDesempenho,
+)
+from .resumos import reconstruir_resumos
+
+CARGOS = ['Analista', 'Desenvolvedor', 'Pesquisador', 'Tecnico', 'Estagiario', 'Designer']
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fabio', 'Gabriela', 'Heitor', 'Iara', 'Joao',
+         'Karina', 'Lucas', 'Marina', 'Nuno', 'Olivia', 'Pedro', 'Rafaela', 'Samuel', 'Tatiana', 'Vitor']
+SOBRENOMES = ['Almeida', 'Barbosa', 'Cardoso', 'Dias', 'Esteves', 'Ferreira', 'Gomes', 'Lima',
+              'Medeiros', 'Nunes', 'Oliveira', 'Pereira', 'Ramos', 'Santos', 'Teixeira', 'Vieira']
+
+SUGESTOES = [None, None, 'Manter o ritmo das entregas', 'Documentar melhor as decisoes tecnicas',
+             'Participar mais das reunioes de planejamento', 'Buscar feedback dos clientes com frequencia']
+OBSERVACOES = ['Entregou o modulo de relatorios antes do prazo', 'Boa comunicacao com a equipe',
+               'Precisa melhorar a estimativa das tarefas', 'Ajudou na integracao dos novos colegas',
+               'Atrasos pontuais por dependencias externas', 'Liderou a migracao do banco de dados']
+
+# distribuicao de status dos meses fechados e do mes mais recente
+STATUS_MESES_ANTERIORES = {
+    StatusAvaliacao.CONCLUIDA: 85,
+    StatusAvaliacao.EM_AVALIACAO: 10,
+    StatusAvaliacao.EM_ELABORACAO: 5,
+}
+STATUS_MES_ATUAL = {
+    StatusAvaliacao.CRIADA: 40,
+    StatusAvaliacao.EM_ELABORACAO: 30,
+    StatusAvaliacao.EM_AVALIACAO: 20,
+    StatusAvaliacao.CONCLUIDA: 10,
+}
+
+
+def _somar_meses(mes, quantidade):
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def limpar_dados():
+    """Apaga colaboradores, tipos, avaliacoes, itens e resumos"""
+    tabelas = [
+        modelo._meta.db_table
+        for modelo in (ResumoMensalItem, ResumoMensal, ItemAvaliacaoDesempenho,
+                       AvaliacaoDesempenho, TipoItemAvaliacaoDesempenho, Colaborador)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {", ".join(tabelas)} RESTART IDENTITY')
+    invalidar_catalogo()
+
+
+def gerar_dados(colaboradores=1000, tipos=12, meses=6, supervisores=None, seed=42,
+                primeiro_mes=date(2025, 1, 1), lote=5000):
+    """
+    Gera a massa de dados. supervisores (padrao: 1 a cada 20 colaboradores)
+    sao os primeiros colaboradores; cada um dos outros fica com um supervisor
+    fixo. Retorna as quantidades criadas
+    """
+    rng = random.Random(seed)
+    supervisores = supervisores or max(1, colaboradores // 20)
+    dimensoes = list(DimensaoItemAvaliacao)
+
+    with transaction.atomic():
+        tipos_criados = TipoItemAvaliacaoDesempenho.objects.bulk_create([
+            TipoItemAvaliacaoDesempenho(
+                dimensao=dimensoes[posicao % len(dimensoes)],
+                tipo_item_avaliacao_desempenho=f'Item {posicao + 1:02d}',
+                descricao=f'Criterio {posicao + 1} de {dimensoes[posicao % len(dimensoes)]}',
+            )
+            for posicao in range(tipos)
+        ])
+        pessoas = Colaborador.objects.bulk_create(
+            [
+                Colaborador(
+                    nome=f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {posicao:06d}',
+                    cargo='Supervisor' if posicao < supervisores else rng.choice(CARGOS),
+                )
+                for posicao in range(colaboradores)
+            ],
+            batch_size=lote,
+        )
+    invalidar_catalogo()
+
+    ids_supervisores = [pessoa.pk for pessoa in pessoas[:supervisores]]
+    chefe = {}
+    for posicao, pessoa in enumerate(pessoas):
+        if posicao < supervisores:
+            # supervisores sao avaliados pelo proximo supervisor (sem avaliacao se for o unico)
+            if supervisores > 1:
+                chefe[pessoa.pk] = ids_supervisores[(posicao + 1) % supervisores]
+        else:
+            chefe[pessoa.pk] = rng.choice(ids_supervisores)
+
+    total_avaliacoes = total_itens = 0
+    for indice in range(meses):
+        mes = _somar_meses(primeiro_mes, indice)
+        distribuicao = STATUS_MES_ATUAL if indice == meses - 1 else STATUS_MESES_ANTERIORES
+        status_possiveis, pesos = list(distribuicao), list(distribuicao.values())
+        ids = list(chefe)
+        for inicio in range(0, len(ids), lote):
+            with transaction.atomic():
+                avaliacoes = AvaliacaoDesempenho.objects.bulk_create([
+                    AvaliacaoDesempenho(
+                        colaborador_id=colaborador_id,
+                        supervisor_id=chefe[colaborador_id],
+                        mes_competencia=mes,
+                        status_avaliacao=rng.choices(status_possiveis, pesos)[0],
+                        sugestoes_supervisor=rng.choice(SUGESTOES),
+                    )
+                    for colaborador_id in ids[inicio:inicio + lote]
+                ])
+                itens = []
+                for avaliacao in avaliacoes:
+                    for tipo in tipos_criados:
+                        nota = None
+                        if avaliacao.status_avaliacao != StatusAvaliacao.CRIADA:
+                            nota = rng.randint(1, 5)
+                            if avaliacao.status_avaliacao == StatusAvaliacao.EM_ELABORACAO and rng.random() < 0.3:
+                                nota = None
+                        itens.append(ItemAvaliacaoDesempenho(
+                            avaliacao_desempenho=avaliacao,
+                            tipo_item_avaliacao_desempenho=tipo,
+                            nota=nota,
+                            observacoes=rng.choice(OBSERVACOES) if nota and rng.random() < 0.1 else None,
+                        ))
+                ItemAvaliacaoDesempenho.objects.bulk_create(itens, batch_size=lote)
+                criadas = AvaliacaoDesempenho.objects.filter(pk__in=[avaliacao.pk for avaliacao in avaliacoes])
+                criadas.recalcular_notas()
+                criadas.atualizar_busca()
+            total_avaliacoes += len(avaliacoes)
+            total_itens += len(itens)
+
+    # bulk_create nao dispara os signals que mantem os resumos
+    reconstruir_resumos()
+    return {
+        'colaboradores': colaboradores,
+        'supervisores': supervisores,
+        'tipos': tipos,
+        'meses': meses,
+        'avaliacoes': total_avaliacoes,
+        'itens': total_itens,
+    }
+
+
+def _estatisticas(tempos, consultas):
+    tempos = sorted(tempo * 1000 for tempo in tempos)
+    p95 = statistics.quantiles(tempos, n=20)[18] if len(tempos) > 1 else tempos[0]
+    return {
+        'mediana_ms': round(statistics.median(tempos), 2),
+        'p95_ms': round(p95, 2),
+        'min_ms': round(tempos[0], 2),
+        'max_ms': round(tempos[-1], 2),
+        'consultas': max(consultas),
+    }
+
+
+def _medir(requisicao, repeticoes):
+    """requisicao(i) faz a i-esima requisicao; a de indice 0 eh o aquecimento e nao conta"""
+    requisicao(0)
+    tempos, consultas = [], []
+    for indice in range(1, repeticoes + 1):
+        with CaptureQueriesContext(connection) as contexto:
+            inicio = time.perf_counter()
+            resposta = requisicao(indice)
+            tempos.append(time.perf_counter() - inicio)
+        if resposta.status_code >= 400:
+            raise RuntimeError(f'{resposta.status_code}: {resposta.content[:300]!r}')
+        consultas.append(len(contexto.captured_queries))
+    return _estatisticas(tempos, consultas)
+
+
+def _com_serializacao(rapida, requisicao):
+    """requisicao com SERIALIZACAO_RAPIDA ligada ou desligada, para comparar as duas"""
+    def medir(indice):
+        with override_settings(SERIALIZACAO_RAPIDA=rapida):
+            return requisicao(indice)
+    return medir
+
+
+def _casos(cliente, repeticoes):
+    """{nome: requisicao(i)} dos endpoints medidos"""
+    ultimo_mes = AvaliacaoDesempenho.objects.order_by('-mes_competencia').values_list(
+        'mes_competencia', flat=True,
+    ).first()
+    amostra = list(
+        AvaliacaoDesempenho.objects.filter(mes_competencia=ultimo_mes).order_by('pk')
+        .values_list('pk', flat=True)[:repeticoes + 1]
+    )
+    criadas = list(
+        AvaliacaoDesempenho.objects.filter(mes_competencia=ultimo_mes, status_avaliacao=StatusAvaliacao.CRIADA)
+        .order_by('pk').values_list('pk', flat=True)[:repeticoes + 1]
+    )
+    itens_editaveis = list(
+        ItemAvaliacaoDesempenho.objects.filter(
+            avaliacao_desempenho__mes_competencia=ultimo_mes,
+            avaliacao_desempenho__status_avaliacao=StatusAvaliacao.EM_ELABORACAO,
+        ).order_by('pk').values_list('avaliacao_desempenho_id', 'pk')[:repeticoes + 1]
+    )
+    pessoas = list(Colaborador.objects.order_by('pk').values_list('pk', flat=True)[:repeticoes + 2])
+    proximo_mes = _somar_meses(ultimo_mes, 1).isoformat()
+
+    casos = {
+        'avaliacoes_lista': lambda i: cliente.get('/api/avaliacoes/'),
+        'avaliacoes_lista_200_por_nota': lambda i: cliente.get('/api/avaliacoes/?page_size=200&ordering=-nota'),
+        'avaliacoes_lista_mes': lambda i: cliente.get(f'/api/avaliacoes/?mes_competencia={ultimo_mes}'),
+        'avaliacoes_busca': lambda i: cliente.get('/api/avaliacoes/?q=entregas prazo'),
+        'colaboradores_busca': lambda i: cliente.get('/api/colaboradores/?q=pesquisador'),
+        'avaliacao_detalhe': lambda i: cliente.get(f'/api/avaliacoes/{amostra[i % len(amostra)]}/'),
+        'relatorio_por_mes': lambda i: cliente.get('/api/relatorios/por-mes/'),
+        'admin_avaliacoes': lambda i: cliente.get('/admin/avaliacao/avaliacaodesempenho/'),
+        'admin_itens': lambda i: cliente.get('/admin/avaliacao/itemavaliacaodesempenho/'),
+    }
+    # mesma requisicao pelos dois caminhos, independente da configuracao
+    comparados = {
+        'avaliacoes_lista_200': lambda i: cliente.get('/api/avaliacoes/?page_size=200'),
+        'avaliacao_detalhe': casos['avaliacao_detalhe'],
+    }
+    for nome, requisicao in comparados.items():
+        casos[f'{nome}_rapida'] = _com_serializacao(True, requisicao)
+        casos[f'{nome}_serializer'] = _com_serializacao(False, requisicao)
+    if itens_editaveis:
+        casos['item_atualizar'] = lambda i: cliente.patch(
+            '/api/avaliacoes/{}/itens/{}/'.format(*itens_editaveis[i % len(itens_editaveis)]),
+            {'nota': i % 5 + 1},
+            content_type='application/json',
+        )
+    # transicao e cadastro consomem uma avaliacao/colaborador por repeticao
+    if len(criadas) > repeticoes:
+        casos['transicao'] = lambda i: cliente.post(
+            '/api/avaliacoes/transicao/',
+            {'ids': [criadas[i]], 'status_destino': StatusAvaliacao.EM_ELABORACAO},
+            content_type='application/json',
+        )
+    if len(pessoas) > repeticoes + 1:
+        casos['avaliacao_criar'] = lambda i: cliente.post(
+            '/api/avaliacoes/',
+            {'colaborador': pessoas[i + 1], 'supervisor': pessoas[0], 'mes_competencia': proximo_mes},
+            content_type='application/json',
+        )
+    return casos
+
+
+def _consumir(response, atraso):
+    """Le a resposta como um cliente lento: atraso (s) por bloco do corpo"""
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.status_code}: {response.content[:300]!r}')
+    for _ in response.streaming_content if response.streaming else [response.content]:
+        time.sleep(atraso)
+
+
+async def _aconsumir(response, atraso):
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.status_code}: {response.content[:300]!r}')
+    if response.streaming:
+        async for _ in response.streaming_content:
+            await asyncio.sleep(atraso)
+    else:
+        await asyncio.sleep(atraso)
+
+
+def _carga_wsgi(url, clientes, requisicoes, threads, atraso):
+    # pool fixo de threads, como um worker WSGI com --threads
+    fila = queue.Queue()
+    for _ in range(clientes * requisicoes):
+        fila.put(url)
+    tempos, erros = [], []
+
+    def worker():
+        cliente = Client()
+        try:
+            while True:
+                try:
+                    caminho = fila.get_nowait()
+                except queue.Empty:
+                    return
+                inicio = time.perf_counter()
+                _consumir(cliente.get(caminho), atraso)
+                tempos.append(time.perf_counter() - inicio)
+        except Exception as erro:
+            erros.append(erro)
+        finally:
+            connection.close()
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=worker) for _ in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    if erros:
+        raise erros[0]
+    return tempos, time.perf_counter() - inicio
+
+
+async def _carga_asgi(url, clientes, requisicoes, atraso):
+    # todos os clientes no mesmo event loop, como um worker ASGI
+    tempos = []
+
+    async def cliente():
+        cliente_async = AsyncClient()
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            await _aconsumir(await cliente_async.get(url), atraso)
+            tempos.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(clientes)))
+    return tempos, time.perf_counter() - inicio
+
+
+def _vazao(tempos, total_s):
+    tempos_ms = sorted(tempo * 1000 for tempo in tempos)
+    return {
+        'requisicoes': len(tempos),
+        'tempo_total_s': round(total_s, 3),
+        'requisicoes_por_s': round(len(tempos) / total_s, 1) if total_s else None,
+        'mediana_ms': round(statistics.median(tempos_ms), 2),
+        'p95_ms': round(statistics.quantiles(tempos_ms, n=20)[18] if len(tempos_ms) > 1 else tempos_ms[0], 2),
+    }
+
+
+def executar_carga(caminho, clientes=20, requisicoes=5, threads=4, atraso=0.0):
+    """
+    Teste de carga dentro do processo, comparando o endpoint sincrono
+    (/api/<caminho>, atendido por um pool de `threads` threads, como no WSGI)
+    com a variante async (/api/async/<caminho>, todos os clientes no mesmo
+    event loop, como no ASGI). Sao `clientes` clientes simultaneos fazendo
+    `requisicoes` GETs cada um; atraso (s) simula um cliente lento lendo cada
+    bloco da resposta. Retorna {'wsgi': {...}, 'asgi': {...}} com a vazao
+    """
+    resultado = {'wsgi': _vazao(*_carga_wsgi(f'/api/{caminho}', clientes, requisicoes, threads, atraso))}
+    # async_to_sync: as consultas do ORM async rodam nesta thread, como num worker ASGI
+    resultado['asgi'] = _vazao(*async_to_sync(_carga_asgi)(f'/api/async/{caminho}', clientes, requisicoes, atraso))
+    return resultado
+
+
+def _caminhos_carga():
+    """Endpoints do teste de carga: listagem, detalhe e a exportacao de uma equipe"""
+    avaliacao = AvaliacaoDesempenho.objects.order_by('-mes_competencia', 'pk').values(
+        'pk', 'mes_competencia', 'supervisor_id',
+    ).first()
+    return {
+        'avaliacoes_lista': 'avaliacoes/',
+        'avaliacao_detalhe': f'avaliacoes/{avaliacao["pk"]}/',
+        'exportacao_equipe': (f'avaliacoes/export/?mes_competencia={avaliacao["mes_competencia"]}'
+                              f'&supervisor={avaliacao["supervisor_id"]}'),
+    }
+
+
+def executar_benchmark(escalas, repeticoes=20, tipos=12, meses=6, seed=42, saida=None, carga=None):
+    """
+    Para cada escala (quantidade de colaboradores): limpa o banco, gera a massa
+    e mede os casos. carga (kwargs de executar_carga, sem o caminho) liga o
+    teste de carga WSGI x ASGI. saida(texto) recebe o progresso
+    """
+    saida = saida or (lambda texto: None)
+    resultado = {
+        'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': f'{connection.vendor} {connection.pg_version if connection.vendor == "postgresql" else ""}'.strip(),
+            'debug': settings.DEBUG,
+            'serializacao_rapida': getattr(settings, 'SERIALIZACAO_RAPIDA', False),
+        },
+        'parametros': {'repeticoes': repeticoes, 'tipos': tipos, 'meses': meses, 'seed': seed, 'carga': carga},
+        'escalas': [],
+    }
+    usuario = get_user_model()
+    # o Client usa o host "testserver"
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for colaboradores in escalas:
+            limpar_dados()
+            inicio = time.perf_counter()
+            massa = gerar_dados(colaboradores=colaboradores, tipos=tipos, meses=meses, seed=seed)
+            massa['tempo_geracao_s'] = round(time.perf_counter() - inicio, 2)
+            saida(f'{colaboradores} colaboradores: {massa["avaliacoes"]} avaliacoes, '
+                  f'{massa["itens"]} itens ({massa["tempo_geracao_s"]}s)')
+
+            admin = usuario.objects.filter(username='benchmark').first() or usuario.objects.create_superuser(
+                'benchmark', 'benchmark@example.com', None,
+            )
+            cliente = Client()
+            cliente.force_login(admin)
+            casos = {}
+            for nome, requisicao in _casos(cliente, repeticoes).items():
+                casos[nome] = _medir(requisicao, repeticoes)
+                saida(f'  {nome}: {casos[nome]["mediana_ms"]} ms (p95 {casos[nome]["p95_ms"]} ms, '
+                      f'{casos[nome]["consultas"]} consultas)')
+            escala = {'massa': massa, 'casos': casos}
+            if carga:
+                escala['carga'] = {}
+                for nome, caminho in _caminhos_carga().items():
+                    escala['carga'][nome] = medicao = executar_carga(caminho, **carga)
+                    saida(f'  carga {nome}: wsgi {medicao["wsgi"]["requisicoes_por_s"]} req/s, '
+                          f'asgi {medicao["asgi"]["requisicoes_por_s"]} req/s')
+            resultado['escalas'].append(escala)
+    return resultado
+
+
+def comparar(anterior, atual):
+    """Linhas de texto com a variacao da mediana de cada caso entre duas execucoes"""
+    anteriores = {escala['massa']['colaboradores']: escala['casos'] for escala in anterior['escalas']}
+    linhas = []
+    for escala in atual['escalas']:
+        colaboradores = escala['massa']['colaboradores']
+        base = anteriores.get(colaboradores)
+        if base is None:
+            continue
+        linhas.append(f'{colaboradores} colaboradores')
+        for nome, caso in escala['casos'].items():
+            if nome not in base:
+                continue
+            antes, depois = base[nome]['mediana_ms'], caso['mediana_ms']
+            variacao = (depois - antes) / antes * 100 if antes else 0
+            linhas.append(
+                f'  {nome}: {antes} -> {depois} ms ({variacao:+.1f}%), '
+                f'consultas {base[nome]["consultas"]} -> {caso["consultas"]}'
+            )
+    return linhas
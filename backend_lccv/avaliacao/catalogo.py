@@ -0,0 +1,87 @@
+"""
+Cache do catalogo de tipos de item de avaliacao.
+
+O catalogo quase nunca muda e eh lido em toda criacao de avaliacao, no calculo
+da nota e na serializacao dos itens. Fica em dois niveis: uma copia em memoria
+do processo e outra no cache do Django (compartilhado entre os workers quando o
+backend configurado for compartilhado). As duas sao indexadas por uma chave de
+versao, trocada sempre que um tipo eh salvo ou removido, entao todos os workers
+passam a ler o catalogo novo.
+
+A versao tambem fica guardada no processo por CATALOGO_VERSAO_TTL segundos,
+senao cada item serializado (e cada nota) faria um cache.get. O worker que
+invalida ve a mudanca na hora; os outros em ate CATALOGO_VERSAO_TTL segundos.
+Com mais de um worker o backend de cache precisa ser compartilhado (ver o
+check avaliacao.W001): no LocMemCache cada processo tem a propria versao e a
+invalidacao nunca chega aos outros.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CHAVE_VERSAO = 'avaliacao:catalogo:versao'
+TEMPO_CACHE = 60 * 60 * 24
+
+# (versao, tipos, tipos_por_id) do ultimo catalogo lido neste processo
+_local = (None, [], {})
+# (versao, instante da leitura em time.monotonic()) da ultima versao lida do cache
+_versao = (None, 0.0)
+
+
+def versao_catalogo():
+    global _versao
+    versao, lida_em = _versao
+    agora = time.monotonic()
+    if versao is not None and agora - lida_em < getattr(settings, 'CATALOGO_VERSAO_TTL', 5):
+        return versao
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        cache.add(CHAVE_VERSAO, time.time_ns(), None)
+        versao = cache.get(CHAVE_VERSAO)
+    _versao = (versao, agora)
+    return versao
+
+
+def _carregar(versao):
+    global _local
+    chave = f'avaliacao:catalogo:{versao}'
+    tipos = cache.get(chave)
+    if tipos is None:
+        from .models import TipoItemAvaliacaoDesempenho
+        tipos = list(
+            TipoItemAvaliacaoDesempenho.objects.values(
+                'id', 'dimensao', 'tipo_item_avaliacao_desempenho', 'descricao',
+            )
+        )
+        cache.set(chave, tipos, TEMPO_CACHE)
+    _local = (versao, tipos, {tipo['id']: tipo for tipo in tipos})
+    return _local
+
+
+def _catalogo():
+    versao = versao_catalogo()
+    local = _local
+    if local[0] != versao:
+        local = _carregar(versao)
+    return local
+
+
+def tipos_item():
+    """Lista de tipos (dicts no formato do TipoItemAvaliacaoDesempenhoSerializer)"""
+    return _catalogo()[1]
+
+
+def tipos_item_por_id():
+    return _catalogo()[2]
+
+
+def total_tipos_item():
+    return len(_catalogo()[1])
+
+
+def invalidar_catalogo():
+    global _versao
+    versao = time.time_ns()
+    cache.set(CHAVE_VERSAO, versao, None)
+    _versao = (versao, time.monotonic())
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# backends em que cada processo tem o proprio cache
+BACKENDS_LOCAIS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register()
+def cache_compartilhado(app_configs, **kwargs):
+    """
+    A versao do catalogo e a geracao dos paineis ficam no cache: com varios
+    workers e um cache por processo, a invalidacao feita num worker nao chega
+    aos outros. Em desenvolvimento (DEBUG) roda um processo so, nao avisa
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend not in BACKENDS_LOCAIS:
+        return []
+    return [Warning(
+        f'O cache padrao ({backend}) nao eh compartilhado entre processos',
+        hint=(
+            'Com mais de um worker configure CACHE_BACKEND/CACHE_LOCATION com um backend '
+            'compartilhado (arquivo, redis, memcached), senao a invalidacao do catalogo '
+            'e dos paineis nao chega aos outros workers'
+        ),
+        id='avaliacao.W001',
+    )]
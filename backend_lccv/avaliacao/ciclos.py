@@ -0,0 +1,121 @@
+from django.db import connection, transaction
+
+from .resumos import marcar_baldes
+from .models import (
+    Colaborador,
+    AvaliacaoDesempenho,
+    ItemAvaliacaoDesempenho,
+    TipoItemAvaliacaoDesempenho,
+)
+
+
+def supervisores_mes_anterior(mes_competencia):
+    """Supervisor da avaliacao mais recente de cada colaborador antes do mes informado"""
+    return dict(
+        AvaliacaoDesempenho.objects.filter(mes_competencia__lt=mes_competencia)
+        .order_by('colaborador_id', '-mes_competencia')
+        .distinct('colaborador_id')
+        .values_list('colaborador_id', 'supervisor_id')
+    )
+
+
+def abrir_ciclo(mes_competencia, supervisores=None, supervisor_padrao=None,
+                usar_mes_anterior=True, lote=1000):
+    """
+    Abre as avaliacoes do mes para todos os colaboradores.
+
+    O supervisor de cada colaborador vem, nessa ordem, do mapa `supervisores`
+    ({colaborador_id: supervisor_id}), da avaliacao mais recente do colaborador
+    (se usar_mes_anterior) ou do supervisor_padrao.
+    Avaliacoes que ja existem no mes sao ignoradas (ON CONFLICT DO NOTHING na
+    constraint unique_colaborador_mes_competencia), entao pode rodar mais de uma vez.
+    """
+    mapa = dict(supervisores or {})
+    if usar_mes_anterior:
+        mapa = {**supervisores_mes_anterior(mes_competencia), **mapa}
+
+    resultado = {'criadas': 0, 'existentes': 0, 'sem_supervisor': 0, 'itens_criados': 0}
+    colaboradores_ids = list(Colaborador.objects.order_by('pk').values_list('pk', flat=True))
+    for inicio in range(0, len(colaboradores_ids), lote):
+        _abrir_lote(
+            colaboradores_ids[inicio:inicio + lote],
+            mes_competencia, mapa, supervisor_padrao, resultado,
+        )
+    return resultado
+
+
+@transaction.atomic
+def _abrir_lote(colaboradores_ids, mes_competencia, mapa, supervisor_padrao, resultado):
+    existentes = set(
+        AvaliacaoDesempenho.objects.filter(
+            mes_competencia=mes_competencia,
+            colaborador_id__in=colaboradores_ids,
+        ).values_list('colaborador_id', flat=True)
+    )
+    resultado['existentes'] += len(existentes)
+
+    novas = []
+    for colaborador_id in colaboradores_ids:
+        if colaborador_id in existentes:
+            continue
+        supervisor_id = mapa.get(colaborador_id, supervisor_padrao)
+        if supervisor_id is None or supervisor_id == colaborador_id:
+            resultado['sem_supervisor'] += 1
+            continue
+        novas.append(AvaliacaoDesempenho(
+            colaborador_id=colaborador_id,
+            supervisor_id=supervisor_id,
+            mes_competencia=mes_competencia,
+        ))
+    if not novas:
+        return
+
+    AvaliacaoDesempenho.objects.bulk_create(novas, ignore_conflicts=True)
+    marcar_baldes({(mes_competencia, avaliacao.supervisor_id) for avaliacao in novas})
+
+    criadas, itens_criados = _criar_itens(mes_competencia, [avaliacao.colaborador_id for avaliacao in novas])
+    resultado['criadas'] += criadas
+    resultado['existentes'] += len(novas) - criadas
+    resultado['itens_criados'] += itens_criados
+
+
+def _criar_itens(mes_competencia, colaboradores_ids):
+    """
+    Cria os itens de todas as avaliacoes do lote com um unico INSERT ... SELECT,
+    sem instanciar um objeto por item. Retorna (avaliacoes, itens) criados.
+    Com ignore_conflicts o postgres nao devolve os ids das avaliacoes. As criadas
+    por outra transacao ja tem itens (sao criados na mesma transacao), entao as
+    nossas sao as do lote que ainda estao sem itens. As duas contagens saem da
+    mesma consulta que insere, com os tipos lidos do banco (o catalogo em cache
+    pode estar atrasado)
+    """
+    qn = connection.ops.quote_name
+    item = ItemAvaliacaoDesempenho._meta
+    avaliacao = AvaliacaoDesempenho._meta
+    tipo = TipoItemAvaliacaoDesempenho._meta
+    sql = f"""
+        WITH novas AS (
+            SELECT a.{qn(avaliacao.pk.column)} AS id
+            FROM {qn(avaliacao.db_table)} a
+            WHERE a.{qn(avaliacao.get_field('mes_competencia').column)} = %s
+              AND a.{qn(avaliacao.get_field('colaborador').column)} = ANY(%s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM {qn(item.db_table)} i
+                  WHERE i.{qn(item.get_field('avaliacao_desempenho').column)} = a.{qn(avaliacao.pk.column)}
+              )
+        ), inseridos AS (
+            INSERT INTO {qn(item.db_table)} (
+                {qn(item.get_field('avaliacao_desempenho').column)},
+                {qn(item.get_field('tipo_item_avaliacao_desempenho').column)},
+                {qn(item.get_field('atualizado_em').column)}
+            )
+            SELECT novas.id, t.{qn(tipo.pk.column)}, NOW()
+            FROM novas
+            CROSS JOIN {qn(tipo.db_table)} t
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM novas), (SELECT COUNT(*) FROM inseridos)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [mes_competencia, list(colaboradores_ids)])
+        return cursor.fetchone()
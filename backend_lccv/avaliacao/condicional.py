@@ -0,0 +1,109 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .catalogo import versao_catalogo
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) para list e retrieve.
+
+    O marcador sai de uma unica consulta agregada (MAX dos campos em
+    `campos_versao` + COUNT) sobre o mesmo filtro da requisicao, antes de
+    qualquer serializacao. Se o cliente ja tem essa versao a resposta eh 304.
+    Com `depende_catalogo`, a versao do cache do catalogo tambem entra no
+    marcador (a representacao usa os tipos de item do cache)
+    """
+
+    campos_versao = ['atualizado_em']
+    depende_catalogo = False
+
+    def get_queryset_versao(self):
+        return self.get_queryset()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset_versao())
+        return self._responder_condicional(
+            request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        gerar_resposta = lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        try:
+            queryset = self.get_queryset_versao().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # id em formato invalido, o retrieve normal responde 404
+            return gerar_resposta()
+        return self._responder_condicional(request, queryset, gerar_resposta, exige_objeto=True)
+
+    def agregados_versao(self):
+        """Agregados do marcador (para aggregate/aaggregate)"""
+        maximos = [Max(campo) for campo in self.campos_versao]
+        return {
+            'ultima': Greatest(*maximos) if len(maximos) > 1 else maximos[0],
+            'total': Count('pk'),
+        }
+
+    def _marcador(self, queryset):
+        return self.montar_marcador(queryset.order_by().aggregate(**self.agregados_versao()))
+
+    def montar_marcador(self, dados):
+        """(etag, ultima alteracao, total) a partir do resultado de agregados_versao"""
+        ultima = dados['ultima']
+        partes = [
+            ultima.isoformat() if ultima else '',
+            str(dados['total']),
+            self.request.get_full_path(),
+            getattr(self.request.accepted_renderer, 'format', ''),
+        ]
+        if self.depende_catalogo:
+            versao = versao_catalogo()
+            partes.append(str(versao))
+            alterado_catalogo = datetime.fromtimestamp(versao / 1e9, tz=dt_timezone.utc)
+            ultima = max(ultima, alterado_catalogo) if ultima else alterado_catalogo
+        etag = quote_etag(hashlib.sha1('|'.join(partes).encode()).hexdigest())
+        return etag, ultima, dados['total']
+
+    def _responder_condicional(self, request, queryset, gerar_resposta, exige_objeto=False):
+        marcador = self._marcador(queryset)
+        if exige_objeto and not marcador[2]:
+            return gerar_resposta()
+        resultado, referencia = self.avaliar_condicional(request, marcador)
+        if resultado is not None:
+            return resultado
+        return self.aplicar_marcador(gerar_resposta(), referencia)
+
+    def avaliar_condicional(self, request, marcador):
+        """
+        Retorna (resposta 304/412 ou None, resposta de referencia com os
+        cabecalhos ETag/Last-Modified para aplicar_marcador)
+        """
+        etag, ultima, _ = marcador
+        referencia = HttpResponse()
+        referencia['ETag'] = etag
+        if ultima:
+            referencia['Last-Modified'] = http_date(ultima.timestamp())
+        resultado = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(ultima.timestamp()) if ultima else None,
+            response=referencia,
+        )
+        return (None if resultado is referencia else resultado), referencia
+
+    def aplicar_marcador(self, response, referencia):
+        if response.status_code == 200:
+            for cabecalho in ('ETag', 'Last-Modified'):
+                if cabecalho in referencia:
+                    response[cabecalho] = referencia[cabecalho]
+        return response
@@ -0,0 +1,159 @@
+"""
+Exportacao das avaliacoes com os itens em CSV ou JSON Lines.
+
+Uma linha por item (avaliacoes sem itens saem uma vez com as colunas do item
+vazias), lida de um unico SELECT com join por um cursor no servidor
+(iterator), e o texto eh gerado em blocos. A memoria fica constante, nao
+importa quantas linhas forem exportadas.
+"""
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .catalogo import tipos_item_por_id, total_tipos_item
+
+COLUNAS = [
+    'avaliacao_id',
+    'mes_competencia',
+    'status_avaliacao',
+    'colaborador_id',
+    'colaborador_nome',
+    'colaborador_cargo',
+    'supervisor_id',
+    'supervisor_nome',
+    'nota_avaliacao',
+    'sugestoes_supervisor',
+    'observacoes_avaliado',
+    'item_id',
+    'tipo_item_id',
+    'tipo_item',
+    'dimensao',
+    'nota_item',
+    'observacoes_item',
+]
+
+FORMATOS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/jsonl',
+}
+
+TAMANHO_LOTE = 2000
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _consulta(avaliacoes, named=False):
+    return avaliacoes.order_by('pk', 'itens__pk').values_list(
+        'pk',
+        'mes_competencia',
+        'status_avaliacao',
+        'colaborador_id',
+        'colaborador__nome',
+        'colaborador__cargo',
+        'supervisor_id',
+        'supervisor__nome',
+        'soma_notas',
+        'sugestoes_supervisor',
+        'observacoes_avaliado',
+        'itens__pk',
+        'itens__tipo_item_avaliacao_desempenho_id',
+        'itens__nota',
+        'itens__observacoes',
+        named=named,
+    )
+
+
+def _formatar(linha, tipos, total_tipos):
+    (avaliacao_id, mes, status, colaborador_id, colaborador_nome, colaborador_cargo,
+     supervisor_id, supervisor_nome, soma_notas, sugestoes, observacoes_avaliado,
+     item_id, tipo_id, nota_item, observacoes_item) = linha
+    tipo = tipos.get(tipo_id, {})
+    return (
+        avaliacao_id,
+        mes,
+        status,
+        colaborador_id,
+        colaborador_nome,
+        colaborador_cargo,
+        supervisor_id,
+        supervisor_nome,
+        round(soma_notas * 100 / (total_tipos * 5), 2) if total_tipos else 0,
+        sugestoes,
+        observacoes_avaliado,
+        item_id,
+        tipo_id,
+        tipo.get('tipo_item_avaliacao_desempenho'),
+        tipo.get('dimensao'),
+        nota_item,
+        observacoes_item,
+    )
+
+
+def linhas_exportacao(avaliacoes, chunk_size=TAMANHO_LOTE):
+    """Gera as linhas (tuplas na ordem de COLUNAS) das avaliacoes do queryset"""
+    total_tipos = total_tipos_item()
+    tipos = tipos_item_por_id()
+    for linha in _consulta(avaliacoes).iterator(chunk_size=chunk_size):
+        yield _formatar(linha, tipos, total_tipos)
+
+
+def gerar_csv(linhas, cabecalho=True):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if cabecalho:
+        escritor.writerow(COLUNAS)
+    for linha in linhas:
+        escritor.writerow(linha)
+        if buffer.tell() >= TAMANHO_BLOCO:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def gerar_jsonl(linhas, cabecalho=True):
+    # JSON Lines nao tem cabecalho, o parametro eh so para ter a mesma assinatura do csv
+    bloco = []
+    tamanho = 0
+    for linha in linhas:
+        texto = json.dumps(dict(zip(COLUNAS, linha)), cls=DjangoJSONEncoder, ensure_ascii=False)
+        bloco.append(texto)
+        tamanho += len(texto) + 1
+        if tamanho >= TAMANHO_BLOCO:
+            yield '\n'.join(bloco) + '\n'
+            bloco, tamanho = [], 0
+    if bloco:
+        yield '\n'.join(bloco) + '\n'
+
+
+def nome_arquivo(mes_competencia, formato):
+    """Nome do arquivo no Content-Disposition (avaliacoes-AAAA-MM.csv quando filtrado por mes)"""
+    sufixo = (mes_competencia or '')[:7]
+    nome = f'avaliacoes-{sufixo}' if sufixo else 'avaliacoes'
+    return f'{nome}.{formato}'
+
+
+def exportar(avaliacoes, formato):
+    """Gera o arquivo exportado em blocos de texto"""
+    gerador = gerar_csv if formato == 'csv' else gerar_jsonl
+    return gerador(linhas_exportacao(avaliacoes))
+
+
+async def aexportar(avaliacoes, formato, tipos, total_tipos):
+    """
+    exportar() como gerador async, lendo com aiterator. O catalogo (tipos_item_por_id
+    e total_tipos_item) vem de fora, ja carregado. Cada lote lido vira um bloco de texto
+    """
+    gerador = gerar_csv if formato == 'csv' else gerar_jsonl
+    lote = []
+    cabecalho = True
+    # aiterator com values_list de tuplas executa a consulta no event loop
+    # (ValuesListIterable nao eh gerador), com named=True a consulta fica na thread
+    async for linha in _consulta(avaliacoes, named=True).aiterator(chunk_size=TAMANHO_LOTE):
+        lote.append(_formatar(linha, tipos, total_tipos))
+        if len(lote) >= TAMANHO_LOTE:
+            yield ''.join(gerador(lote, cabecalho))
+            lote, cabecalho = [], False
+    if lote or cabecalho:
+        yield ''.join(gerador(lote, cabecalho))
@@ -0,0 +1,161 @@
+import math
+
+import django_filters
+from django import forms
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, FloatField, OuterRef
+from django.db.models.functions import Cast
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .catalogo import total_tipos_item
+from .models import CONFIG_BUSCA, AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao
+
+# anotacao com a relevancia da busca textual, usada como ordenacao padrao com ?q=
+RELEVANCIA = 'relevancia'
+
+
+def limites_soma_notas(nota_min=None, nota_max=None):
+    """
+    Converte uma faixa de nota (0 a 100) em faixa de soma_notas,
+    que eh a coluna indexada. nota = soma_notas * 20 / total_tipos
+    """
+    total_tipos = total_tipos_item()
+    if total_tipos == 0:
+        return None, None
+    soma_min = math.ceil(nota_min * total_tipos / 20) if nota_min is not None else None
+    soma_max = math.floor(nota_max * total_tipos / 20) if nota_max is not None else None
+    return soma_min, soma_max
+
+
+class IdFilter(django_filters.NumberFilter):
+    """Id inteiro, filtrado direto na coluna da FK (sem consultar se o registro existe)"""
+
+    field_class = forms.IntegerField
+
+
+class AvaliacaoDesempenhoFilter(django_filters.FilterSet):
+    """
+    Filtros da listagem. Cada um vira um predicado sobre coluna indexada:
+    colaborador (unique colaborador + mes), supervisor e status (indices com
+    o mes), faixa de mes, faixa de nota (soma_notas) e itens sem nota
+    (EXISTS no indice parcial item_sem_nota_idx)
+    """
+
+    colaborador = IdFilter(field_name='colaborador_id', label='Colaborador')
+    supervisor = IdFilter(field_name='supervisor_id', label='Supervisor')
+    status_avaliacao = django_filters.MultipleChoiceFilter(
+        choices=StatusAvaliacao.choices,
+        method='filtrar_status',
+        label='Status (pode ser repetido)',
+    )
+    mes_inicio = django_filters.DateFilter(field_name='mes_competencia', lookup_expr='gte', label='Mes inicial')
+    mes_fim = django_filters.DateFilter(field_name='mes_competencia', lookup_expr='lte', label='Mes final')
+    nota_min = django_filters.NumberFilter(method='filtrar_nota', label='Nota minima')
+    nota_max = django_filters.NumberFilter(method='filtrar_nota', label='Nota maxima')
+    itens_pendentes = django_filters.BooleanFilter(
+        method='filtrar_itens_pendentes',
+        label='Tem itens sem nota',
+    )
+
+    class Meta:
+        model = AvaliacaoDesempenho
+        fields = [
+            'mes_competencia',
+            'colaborador',
+            'supervisor',
+            'status_avaliacao',
+            'mes_inicio',
+            'mes_fim',
+            'nota_min',
+            'nota_max',
+            'itens_pendentes',
+        ]
+
+    def filtrar_status(self, queryset, name, value):
+        # um unico IN em vez do OR de igualdades do MultipleChoiceFilter
+        return queryset.filter(status_avaliacao__in=value) if value else queryset
+
+    def filtrar_itens_pendentes(self, queryset, name, value):
+        if value is None:
+            return queryset
+        pendentes = Exists(ItemAvaliacaoDesempenho.objects.filter(
+            avaliacao_desempenho=OuterRef('pk'),
+            nota__isnull=True,
+        ))
+        return queryset.filter(pendentes if value else ~pendentes)
+
+    def filtrar_nota(self, queryset, name, value):
+        if value is None:
+            return queryset
+        if name == 'nota_min':
+            soma_min, _ = limites_soma_notas(nota_min=value)
+            return queryset.filter(soma_notas__gte=soma_min) if soma_min is not None else queryset
+        _, soma_max = limites_soma_notas(nota_max=value)
+        return queryset.filter(soma_notas__lte=soma_max) if soma_max is not None else queryset
+
+
+def termo_busca(request):
+    return request.query_params.get(BuscaTextualFilter.search_param, '').strip()
+
+
+def colunas_ordenacao(ordenacao):
+    """
+    Colunas para carregar os campos da ordenacao junto da pagina (a paginacao
+    le delas o cursor). A relevancia eh anotada pela busca, nao eh coluna
+    """
+    colunas = []
+    for campo in ordenacao:
+        campo = campo.lstrip('-')
+        if campo != RELEVANCIA:
+            colunas.append('id' if campo == 'pk' else campo)
+    return colunas
+
+
+class BuscaTextualFilter(BaseFilterBackend):
+    """
+    ?q= com a busca textual do postgres na coluna `busca` do modelo (indice
+    GIN). Aceita a sintaxe de buscadores: "frase exata", OR, -palavra.
+    Anota a relevancia (ts_rank) de cada resultado
+    """
+
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        termo = termo_busca(request)
+        if not termo:
+            return queryset
+        consulta = SearchQuery(termo, config=CONFIG_BUSCA, search_type='websearch')
+        # ts_rank eh real (float4); em double precision o valor lido volta identico no cursor
+        relevancia = Cast(SearchRank(F('busca'), consulta), FloatField())
+        return queryset.filter(busca=consulta).annotate(**{RELEVANCIA: relevancia})
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Busca textual. Sem ?ordering=, ordena pela relevancia',
+            'schema': {'type': 'string'},
+        }]
+
+
+class BuscaOrderingFilter(OrderingFilter):
+    """Com ?q= e sem ?ordering=, ordena pela relevancia da busca"""
+
+    def get_default_ordering(self, view):
+        if termo_busca(view.request):
+            return [f'-{RELEVANCIA}']
+        return super().get_default_ordering(view)
+
+
+class AvaliacaoOrderingFilter(BuscaOrderingFilter):
+    """Permite ?ordering=nota, ordenando pela coluna indexada soma_notas"""
+
+    aliases = {'nota': 'soma_notas'}
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        traduzidos = []
+        for campo in fields:
+            prefixo = '-' if campo.startswith('-') else ''
+            traduzidos.append(prefixo + self.aliases.get(campo.lstrip('-'), campo.lstrip('-')))
+        return super().remove_invalid_fields(queryset, traduzidos, view, request)
@@ -0,0 +1,116 @@
+"""
+Historico de um colaborador: nota geral e media por dimensao em cada mes de
+competencia, com media movel e variacao opcionais.
+
+Sai de uma unica consulta: uma linha por avaliacao (unique colaborador + mes,
+pelo indice da constraint), com as medias por dimensao agregadas dos itens
+(GROUP BY da avaliacao) e as funcoes de janela (LAG e AVG ... ROWS BETWEEN)
+ordenadas pelo mes. As dimensoes dos tipos vem do catalogo em cache, entao a
+consulta nao junta a tabela de tipos.
+"""
+from django.db.models import Avg, Count, F, FloatField, Func, Q, RowRange, Subquery, Value, Window
+from django.db.models.functions import Cast, Lag
+
+from .catalogo import tipos_item, total_tipos_item
+from .models import AvaliacaoDesempenho, DimensaoItemAvaliacao
+
+
+class MediaJanela(Func):
+    """AVG para usar so dentro de Window; aceita uma agregacao (o Avg do ORM recusa)"""
+
+    function = 'AVG'
+    window_compatible = True
+    output_field = FloatField()
+
+
+def _arredondar(valor):
+    return round(valor, 2) if valor is not None else None
+
+
+def _variacao(atual, anterior):
+    if atual is None or anterior is None:
+        return None
+    return round(atual - anterior, 2)
+
+
+def historico(colaborador_id, inicio=None, fim=None, janela=None, variacao=False):
+    """
+    Lista, em ordem de mes, a nota (0 a 100) e a media dos itens por dimensao
+    (1 a 5) das avaliacoes do colaborador. `janela`: tamanho da media movel em
+    meses (avaliacoes); `variacao`: diferenca para a avaliacao anterior
+    """
+    total_tipos = total_tipos_item()
+    # mesma conta de AvaliacaoDesempenho.nota
+    fator = 100 / (total_tipos * 5) if total_tipos else 0
+    tipos_por_dimensao = {}
+    for tipo in tipos_item():
+        tipos_por_dimensao.setdefault(tipo['dimensao'], []).append(tipo['id'])
+    dimensoes = [dimensao for dimensao in DimensaoItemAvaliacao.values if dimensao in tipos_por_dimensao]
+
+    ordem = F('mes_competencia').asc()
+    colunas = {'nota': Cast('soma_notas', FloatField()) * Value(fator)}
+    for posicao, dimensao in enumerate(dimensoes):
+        filtro = Q(itens__tipo_item_avaliacao_desempenho_id__in=tipos_por_dimensao[dimensao])
+        colunas[f'media_{posicao}'] = Avg('itens__nota', filter=filtro, output_field=FloatField())
+        colunas[f'avaliados_{posicao}'] = Count('itens__nota', filter=filtro)
+
+    janelas = {}
+    for coluna in ['nota'] + [f'media_{posicao}' for posicao in range(len(dimensoes))]:
+        if janela:
+            janelas[f'{coluna}_movel'] = Window(
+                MediaJanela(coluna), order_by=ordem, frame=RowRange(start=-(janela - 1), end=0),
+            )
+        if variacao:
+            # LAG no select; a subtracao fica no python (window nao entra em expressao com GROUP BY)
+            janelas[f'{coluna}_anterior'] = Window(Lag(coluna), order_by=ordem)
+
+    avaliacoes = AvaliacaoDesempenho.objects.filter(colaborador_id=colaborador_id).order_by()
+    if fim:
+        # as janelas so olham para tras, o fim pode ir para o WHERE
+        avaliacoes = avaliacoes.filter(mes_competencia__lte=fim)
+    if inicio:
+        # antes do inicio so entram as avaliacoes que a media movel e o LAG do
+        # primeiro mes enxergam: as `anteriores` ultimas (linhas, nao meses,
+        # entao um mes sem avaliacao nao encurta a janela)
+        anteriores = max(janela - 1 if janela else 0, 1 if variacao else 0)
+        periodo = Q(mes_competencia__gte=inicio)
+        if anteriores:
+            ultimas = (
+                AvaliacaoDesempenho.objects.filter(colaborador_id=colaborador_id, mes_competencia__lt=inicio)
+                .order_by('-mes_competencia')
+                .values('mes_competencia')[:anteriores]
+            )
+            periodo |= Q(mes_competencia__in=Subquery(ultimas))
+        avaliacoes = avaliacoes.filter(periodo)
+    linhas = (
+        avaliacoes
+        .annotate(**colunas)
+        .annotate(**janelas)
+        .values('id', 'mes_competencia', 'status_avaliacao', *colunas, *janelas)
+        .order_by('mes_competencia')
+    )
+
+    resultado = []
+    for linha in linhas:
+        # as linhas anteriores ao inicio so alimentam as janelas
+        if inicio and linha['mes_competencia'] < inicio:
+            continue
+        resultado.append({
+            'mes_competencia': linha['mes_competencia'],
+            'avaliacao': linha['id'],
+            'status_avaliacao': linha['status_avaliacao'],
+            'nota': _arredondar(linha['nota']),
+            'nota_media_movel': _arredondar(linha.get('nota_movel')),
+            'nota_variacao': _variacao(linha['nota'], linha.get('nota_anterior')),
+            'dimensoes': [
+                {
+                    'dimensao': dimensao,
+                    'itens_avaliados': linha[f'avaliados_{posicao}'],
+                    'nota_media': _arredondar(linha[f'media_{posicao}']),
+                    'media_movel': _arredondar(linha.get(f'media_{posicao}_movel')),
+                    'variacao': _variacao(linha[f'media_{posicao}'], linha.get(f'media_{posicao}_anterior')),
+                }
+                for posicao, dimensao in enumerate(dimensoes)
+            ],
+        })
+    return resultado
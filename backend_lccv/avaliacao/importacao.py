@@ -0,0 +1,335 @@
+"""
+Importacao de colaboradores e avaliacoes a partir de um CSV.
+
+O arquivo eh lido linha a linha e processado em lotes. Em cada lote os nomes de
+colaboradores e supervisores viram ids com uma unica consulta, os colaboradores
+que faltam sao criados e as avaliacoes/itens sao gravados com
+bulk_create(update_conflicts=True), um lote por transacao. Linhas invalidas
+entram no relatorio de erros sem interromper o resto do arquivo.
+
+Colunas (as mesmas da exportacao, as de id sao ignoradas):
+colaborador_nome (obrigatoria), colaborador_cargo, supervisor_nome,
+supervisor_cargo, mes_competencia, status_avaliacao, sugestoes_supervisor,
+observacoes_avaliado, tipo_item, nota_item, observacoes_item.
+Sem mes_competencia a linha so cadastra/atualiza o colaborador. Sem tipo_item
+so grava a avaliacao. Celulas vazias de texto e nota nao apagam o que ja esta
+gravado. Se um lote falha no banco ele eh refeito linha a linha, para o erro
+ficar na linha certa e as demais serem gravadas.
+"""
+import csv
+from collections import defaultdict
+from datetime import date
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .catalogo import tipos_item
+from .models import AvaliacaoDesempenho, Colaborador, ItemAvaliacaoDesempenho, StatusAvaliacao
+from .resumos import atualizar_resumos
+
+TAMANHO_LOTE = 1000
+MAXIMO_ERROS = 1000
+
+
+class ArquivoInvalido(ValueError):
+    pass
+
+
+def novo_resultado():
+    return {
+        'linhas': 0,
+        'colaboradores_criados': 0,
+        'colaboradores_atualizados': 0,
+        'avaliacoes_criadas': 0,
+        'avaliacoes_atualizadas': 0,
+        'itens_importados': 0,
+        'total_erros': 0,
+        'erros': [],
+    }
+
+
+def importar_csv(arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Importa um CSV (arquivo texto aberto). Retorna o resultado com os erros por linha"""
+    leitor = csv.DictReader(arquivo)
+    if not leitor.fieldnames or 'colaborador_nome' not in leitor.fieldnames:
+        raise ArquivoInvalido('O arquivo precisa de um cabecalho com a coluna colaborador_nome')
+
+    resultado = novo_resultado()
+    # os resumos mensais sao refeitos uma vez no fim, nao a cada lote
+    baldes = set()
+    lote = []
+    # a linha 1 eh o cabecalho
+    for numero, linha in enumerate(leitor, start=2):
+        lote.append((numero, linha))
+        if len(lote) >= tamanho_lote:
+            _importar_lote(lote, resultado, baldes)
+            lote = []
+    if lote:
+        _importar_lote(lote, resultado, baldes)
+    atualizar_resumos(baldes)
+    return resultado
+
+
+def _erro(resultado, numero, mensagens):
+    resultado['total_erros'] += 1
+    # guarda so os primeiros, a memoria nao cresce com o arquivo
+    if len(resultado['erros']) < MAXIMO_ERROS:
+        resultado['erros'].append({'linha': numero, 'erros': list(mensagens)})
+
+
+def _texto(linha, coluna):
+    return (linha.get(coluna) or '').strip()
+
+
+def _validar(linha, tipos_por_nome):
+    erros = []
+    dados = {
+        'colaborador_nome': _texto(linha, 'colaborador_nome'),
+        'colaborador_cargo': _texto(linha, 'colaborador_cargo'),
+        'supervisor_nome': _texto(linha, 'supervisor_nome'),
+        'supervisor_cargo': _texto(linha, 'supervisor_cargo'),
+        'mes_competencia': None,
+        'status_avaliacao': _texto(linha, 'status_avaliacao') or None,
+        'sugestoes_supervisor': _texto(linha, 'sugestoes_supervisor') or None,
+        'observacoes_avaliado': _texto(linha, 'observacoes_avaliado') or None,
+        'tipo_item_id': None,
+        'nota_item': None,
+        'observacoes_item': _texto(linha, 'observacoes_item') or None,
+    }
+    if not dados['colaborador_nome']:
+        erros.append('colaborador_nome eh obrigatorio')
+
+    mes = _texto(linha, 'mes_competencia')
+    if mes:
+        try:
+            dados['mes_competencia'] = date.fromisoformat(mes)
+        except ValueError:
+            erros.append(f'mes_competencia invalido: "{mes}" (use AAAA-MM-DD)')
+        if not dados['supervisor_nome']:
+            erros.append('supervisor_nome eh obrigatorio quando ha mes_competencia')
+        elif dados['supervisor_nome'] == dados['colaborador_nome']:
+            erros.append('Colaborador e supervisor devem ser pessoas diferentes')
+
+    if dados['status_avaliacao'] and dados['status_avaliacao'] not in StatusAvaliacao.values:
+        erros.append(f'status_avaliacao invalido: "{dados["status_avaliacao"]}"')
+
+    tipo = _texto(linha, 'tipo_item')
+    if tipo:
+        if not mes:
+            erros.append('tipo_item exige mes_competencia')
+        ids = tipos_por_nome.get(tipo, [])
+        if len(ids) != 1:
+            erros.append(f'tipo_item {"ambiguo" if ids else "inexistente"}: "{tipo}"')
+        else:
+            dados['tipo_item_id'] = ids[0]
+        nota = _texto(linha, 'nota_item')
+        if nota:
+            try:
+                dados['nota_item'] = int(nota)
+            except ValueError:
+                erros.append(f'nota_item invalida: "{nota}"')
+            else:
+                if not 1 <= dados['nota_item'] <= 5:
+                    erros.append('nota_item deve ser entre 1 e 5')
+    return dados, erros
+
+
+def _importar_lote(lote, resultado, baldes):
+    resultado['linhas'] += len(lote)
+    tipos_por_nome = defaultdict(list)
+    for tipo in tipos_item():
+        tipos_por_nome[tipo['tipo_item_avaliacao_desempenho']].append(tipo['id'])
+
+    validas = []
+    for numero, linha in lote:
+        dados, erros = _validar(linha, tipos_por_nome)
+        if erros:
+            _erro(resultado, numero, erros)
+        else:
+            validas.append((numero, dados))
+    if not validas:
+        return
+
+    try:
+        _gravar_parcial(validas, resultado, baldes)
+        return
+    except DatabaseError:
+        pass
+    # um erro do banco desfaz o lote inteiro: refaz linha a linha, cada uma no
+    # seu savepoint, para o erro cair na linha certa e as outras serem gravadas
+    for numero, dados in validas:
+        try:
+            _gravar_parcial([(numero, dados)], resultado, baldes)
+        except DatabaseError as erro:
+            _erro(resultado, numero, [f'Erro ao gravar a linha: {erro}'])
+
+
+def _gravar_parcial(validas, resultado, baldes):
+    """
+    Grava as linhas numa transacao (savepoint, se ja houver uma). Contadores e
+    baldes so entram no resultado se ela for confirmada
+    """
+    parcial = novo_resultado()
+    baldes_parcial = set()
+    with transaction.atomic():
+        _gravar(validas, parcial, baldes_parcial)
+    for chave in ('colaboradores_criados', 'colaboradores_atualizados', 'avaliacoes_criadas',
+                  'avaliacoes_atualizadas', 'itens_importados'):
+        resultado[chave] += parcial[chave]
+    for erro in parcial['erros']:
+        _erro(resultado, erro['linha'], erro['erros'])
+    baldes.update(baldes_parcial)
+
+
+def _resolver_colaboradores(validas, resultado):
+    """{nome: id}, criando os colaboradores que faltam. Nomes repetidos no banco sao ambiguos"""
+    cargos = {}
+    for _, dados in validas:
+        if dados['mes_competencia'] and not cargos.get(dados['supervisor_nome']):
+            cargos[dados['supervisor_nome']] = dados['supervisor_cargo']
+    # o cargo informado para o colaborador tem prioridade sobre o de supervisor
+    for _, dados in validas:
+        if dados['colaborador_cargo'] or dados['colaborador_nome'] not in cargos:
+            cargos[dados['colaborador_nome']] = dados['colaborador_cargo']
+
+    existentes = defaultdict(list)
+    for colaborador in Colaborador.objects.filter(nome__in=cargos).only('pk', 'nome', 'cargo'):
+        existentes[colaborador.nome].append(colaborador)
+    ambiguos = {nome for nome, encontrados in existentes.items() if len(encontrados) > 1}
+
+    novos = [
+        Colaborador(nome=nome, cargo=cargo)
+        for nome, cargo in cargos.items() if nome not in existentes
+    ]
+    Colaborador.objects.bulk_create(novos)
+    resultado['colaboradores_criados'] += len(novos)
+
+    agora = timezone.now()
+    alterados = []
+    for nome, encontrados in existentes.items():
+        colaborador = encontrados[0]
+        if nome not in ambiguos and cargos[nome] and colaborador.cargo != cargos[nome]:
+            colaborador.cargo = cargos[nome]
+            colaborador.atualizado_em = agora
+            alterados.append(colaborador)
+    Colaborador.objects.bulk_update(alterados, ['cargo', 'atualizado_em'])
+    resultado['colaboradores_atualizados'] += len(alterados)
+
+    ids = {colaborador.nome: colaborador.pk for colaborador in novos}
+    ids.update({
+        nome: encontrados[0].pk for nome, encontrados in existentes.items() if nome not in ambiguos
+    })
+    return ids, ambiguos
+
+
+def _upsert(modelo, objetos, unique_fields, update_fields, opcionais):
+    """
+    bulk_create(update_conflicts=True) que so sobrescreve os campos `opcionais`
+    preenchidos: os objetos sao agrupados pelos opcionais vazios (None) e cada
+    grupo atualiza apenas os que vieram no CSV
+    """
+    grupos = defaultdict(list)
+    for objeto in objetos:
+        vazios = frozenset(campo for campo in opcionais if getattr(objeto, campo) is None)
+        grupos[vazios].append(objeto)
+    for vazios, grupo in grupos.items():
+        modelo.objects.bulk_create(
+            grupo,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields + [campo for campo in opcionais if campo not in vazios],
+        )
+
+
+def _gravar(validas, resultado, baldes):
+    ids, ambiguos = _resolver_colaboradores(validas, resultado)
+
+    avaliacoes = {}
+    itens = {}
+    for numero, dados in validas:
+        nomes_ambiguos = {dados['colaborador_nome'], dados['supervisor_nome']} & ambiguos
+        if nomes_ambiguos:
+            _erro(resultado, numero, [
+                f'Nome ambiguo (mais de um colaborador cadastrado): "{nome}"'
+                for nome in sorted(nomes_ambiguos)
+            ])
+            continue
+        if not dados['mes_competencia']:
+            continue
+        chave = (ids[dados['colaborador_nome']], dados['mes_competencia'])
+        avaliacao = avaliacoes.setdefault(chave, {})
+        avaliacao['supervisor_id'] = ids[dados['supervisor_nome']]
+        for campo in ('status_avaliacao', 'sugestoes_supervisor', 'observacoes_avaliado'):
+            if dados[campo] is not None or campo not in avaliacao:
+                avaliacao[campo] = dados[campo]
+        if dados['tipo_item_id']:
+            itens[(chave, dados['tipo_item_id'])] = (dados['nota_item'], dados['observacoes_item'])
+    if not avaliacoes:
+        return
+
+    existentes = {
+        (linha['colaborador_id'], linha['mes_competencia']): linha
+        for linha in AvaliacaoDesempenho.objects.order_by().filter(
+            colaborador_id__in={colaborador_id for colaborador_id, _ in avaliacoes},
+            mes_competencia__in={mes for _, mes in avaliacoes},
+        ).values('colaborador_id', 'mes_competencia', 'supervisor_id', 'status_avaliacao')
+    }
+    objetos = []
+    for (colaborador_id, mes), dados in avaliacoes.items():
+        existente = existentes.get((colaborador_id, mes))
+        status = dados['status_avaliacao'] or (
+            existente['status_avaliacao'] if existente else StatusAvaliacao.CRIADA
+        )
+        objetos.append(AvaliacaoDesempenho(
+            colaborador_id=colaborador_id,
+            mes_competencia=mes,
+            supervisor_id=dados['supervisor_id'],
+            status_avaliacao=status,
+            sugestoes_supervisor=dados['sugestoes_supervisor'],
+            observacoes_avaliado=dados['observacoes_avaliado'],
+        ))
+    _upsert(
+        AvaliacaoDesempenho,
+        objetos,
+        unique_fields=['colaborador', 'mes_competencia'],
+        update_fields=['supervisor', 'status_avaliacao', 'atualizado_em'],
+        opcionais=['sugestoes_supervisor', 'observacoes_avaliado'],
+    )
+    criadas = [
+        avaliacao for avaliacao in objetos
+        if (avaliacao.colaborador_id, avaliacao.mes_competencia) not in existentes
+    ]
+    resultado['avaliacoes_criadas'] += len(criadas)
+    resultado['avaliacoes_atualizadas'] += len(objetos) - len(criadas)
+    avaliacao_id = {
+        (avaliacao.colaborador_id, avaliacao.mes_competencia): avaliacao.pk for avaliacao in objetos
+    }
+
+    resultado['itens_importados'] += len(itens)
+    # avaliacoes novas recebem um item por tipo do catalogo, como no cadastro pela API
+    for avaliacao in criadas:
+        chave = (avaliacao.colaborador_id, avaliacao.mes_competencia)
+        for tipo in tipos_item():
+            itens.setdefault((chave, tipo['id']), (None, None))
+    _upsert(
+        ItemAvaliacaoDesempenho,
+        [
+            ItemAvaliacaoDesempenho(
+                avaliacao_desempenho_id=avaliacao_id[chave],
+                tipo_item_avaliacao_desempenho_id=tipo_id,
+                nota=nota,
+                observacoes=observacoes,
+            )
+            for (chave, tipo_id), (nota, observacoes) in itens.items()
+        ],
+        unique_fields=['avaliacao_desempenho', 'tipo_item_avaliacao_desempenho'],
+        update_fields=['atualizado_em'],
+        opcionais=['nota', 'observacoes'],
+    )
+
+    importadas = AvaliacaoDesempenho.objects.filter(pk__in=avaliacao_id.values())
+    importadas.recalcular_notas()
+    importadas.atualizar_busca()
+    # baldes novos e antigos (se o supervisor mudou) dos resumos mensais
+    baldes.update((avaliacao.mes_competencia, avaliacao.supervisor_id) for avaliacao in objetos)
+    baldes.update((linha['mes_competencia'], linha['supervisor_id']) for linha in existentes.values())
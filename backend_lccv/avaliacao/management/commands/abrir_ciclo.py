@@ -0,0 +1,61 @@
+import csv
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from avaliacao.ciclos import abrir_ciclo
+from avaliacao.models import Colaborador
+
+
+class Command(BaseCommand):
+    help = 'Abre as avaliacoes do mes para todos os colaboradores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('mes_competencia', type=date.fromisoformat, help='Data no formato AAAA-MM-DD')
+        parser.add_argument(
+            '--mapa',
+            help='CSV com as colunas colaborador_id,supervisor_id',
+        )
+        parser.add_argument(
+            '--supervisor-padrao',
+            type=int,
+            help='Supervisor usado quando o colaborador nao tem outro definido',
+        )
+        parser.add_argument(
+            '--sem-mes-anterior',
+            action='store_true',
+            help='Nao reaproveita o supervisor da avaliacao anterior do colaborador',
+        )
+        parser.add_argument('--lote', type=int, default=1000, help='Avaliacoes por transacao')
+
+    def handle(self, *args, **options):
+        supervisores = {}
+        if options['mapa']:
+            try:
+                with open(options['mapa'], newline='', encoding='utf-8') as arquivo:
+                    for linha in csv.DictReader(arquivo):
+                        supervisores[int(linha['colaborador_id'])] = int(linha['supervisor_id'])
+            except (OSError, KeyError, ValueError) as erro:
+                raise CommandError(f'Mapa de supervisores invalido: {erro}')
+
+        # supervisor inexistente terminaria num IntegrityError no meio dos lotes
+        ids = set(supervisores.values())
+        if options['supervisor_padrao'] is not None:
+            ids.add(options['supervisor_padrao'])
+        faltando = sorted(ids - set(Colaborador.objects.filter(pk__in=ids).values_list('pk', flat=True)))
+        if faltando:
+            raise CommandError(f'Supervisores inexistentes: {faltando[:20]}')
+
+        resultado = abrir_ciclo(
+            options['mes_competencia'],
+            supervisores=supervisores,
+            supervisor_padrao=options['supervisor_padrao'],
+            usar_mes_anterior=not options['sem_mes_anterior'],
+            lote=options['lote'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['criadas']} avaliacoes criadas, "
+            f"{resultado['existentes']} ja existentes, "
+            f"{resultado['sem_supervisor']} sem supervisor, "
+            f"{resultado['itens_criados']} itens criados"
+        ))
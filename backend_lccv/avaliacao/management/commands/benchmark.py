@@ -0,0 +1,92 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from avaliacao.benchmark import comparar, executar_benchmark
+
+
+def _escalas(valor):
+    try:
+        escalas = [int(parte) for parte in valor.split(',') if parte.strip()]
+    except ValueError:
+        raise CommandError('--escalas deve ser uma lista de inteiros separados por virgula')
+    if not escalas or min(escalas) < 2:
+        raise CommandError('Cada escala deve ter ao menos 2 colaboradores')
+    return escalas
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede os principais endpoints (listagem, detalhe, edicao de item, transicao, cadastro, '
+        'relatorio e admin) com massas de dados de varios tamanhos, num banco de teste separado. '
+        'Com --carga-clientes, compara tambem a vazao dos endpoints sincronos e async (WSGI x ASGI)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            default='500,2000,10000',
+            help='Quantidades de colaboradores, separadas por virgula (padrao: 500,2000,10000)',
+        )
+        parser.add_argument('--repeticoes', type=int, default=20, help='Requisicoes medidas por caso')
+        parser.add_argument('--tipos', type=int, default=12)
+        parser.add_argument('--meses', type=int, default=6)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--saida', help='Arquivo JSON com os resultados')
+        parser.add_argument('--comparar', help='JSON de uma execucao anterior para comparar as medianas')
+        parser.add_argument(
+            '--carga-clientes', type=int, default=0,
+            help='Clientes simultaneos do teste de carga WSGI x ASGI (padrao: 0, sem teste de carga)',
+        )
+        parser.add_argument('--carga-requisicoes', type=int, default=5, help='Requisicoes de cada cliente')
+        parser.add_argument('--carga-threads', type=int, default=4, help='Threads do worker WSGI simulado')
+        parser.add_argument(
+            '--carga-atraso', type=float, default=0.0,
+            help='Segundos que o cliente leva para ler cada bloco da resposta (cliente lento)',
+        )
+
+    def handle(self, *args, **options):
+        escalas = _escalas(options['escalas'])
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser maior que zero')
+        carga = None
+        if options['carga_clientes'] > 0:
+            if options['carga_requisicoes'] < 1 or options['carga_threads'] < 1:
+                raise CommandError('--carga-requisicoes e --carga-threads devem ser maiores que zero')
+            if options['carga_atraso'] < 0:
+                raise CommandError('--carga-atraso nao pode ser negativo')
+            carga = {
+                'clientes': options['carga_clientes'],
+                'requisicoes': options['carga_requisicoes'],
+                'threads': options['carga_threads'],
+                'atraso': options['carga_atraso'],
+            }
+        anterior = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as arquivo:
+                anterior = json.load(arquivo)
+
+        # a massa eh gerada num banco de teste (test_<nome>), o banco configurado nao eh tocado
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            resultado = executar_benchmark(
+                escalas,
+                repeticoes=options['repeticoes'],
+                tipos=options['tipos'],
+                meses=options['meses'],
+                seed=options['seed'],
+                saida=self.stdout.write,
+                carga=carga,
+            )
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}"))
+        if anterior:
+            for linha in comparar(anterior, resultado):
+                self.stdout.write(linha)
@@ -0,0 +1,35 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from avaliacao.exportacao import FORMATOS, exportar
+from avaliacao.models import AvaliacaoDesempenho
+
+
+class Command(BaseCommand):
+    help = 'Exporta as avaliacoes com os itens (uma linha por item) em CSV ou JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=list(FORMATOS), default='csv')
+        parser.add_argument(
+            '--mes-competencia',
+            type=date.fromisoformat,
+            help='Exporta apenas esse mes (AAAA-MM-DD)',
+        )
+        parser.add_argument('--saida', help='Arquivo de saida. Se omitido, escreve na saida padrao')
+
+    def handle(self, *args, **options):
+        avaliacoes = AvaliacaoDesempenho.objects.all()
+        if options['mes_competencia']:
+            avaliacoes = avaliacoes.filter(mes_competencia=options['mes_competencia'])
+
+        if not options['saida']:
+            for bloco in exportar(avaliacoes, options['formato']):
+                sys.stdout.write(bloco)
+            return
+
+        with open(options['saida'], 'w', newline='', encoding='utf-8') as arquivo:
+            for bloco in exportar(avaliacoes, options['formato']):
+                arquivo.write(bloco)
+        self.stderr.write(self.style.SUCCESS(f"Exportacao gravada em {options['saida']}"))
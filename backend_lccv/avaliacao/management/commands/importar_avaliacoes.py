@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from avaliacao.importacao import TAMANHO_LOTE, ArquivoInvalido, importar_csv
+
+
+class Command(BaseCommand):
+    help = 'Importa colaboradores e avaliacoes (com itens) de um CSV, no mesmo formato da exportacao'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do CSV')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas por transacao')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['arquivo'], newline='', encoding='utf-8-sig') as arquivo:
+                resultado = importar_csv(arquivo, tamanho_lote=options['lote'])
+        except (OSError, UnicodeDecodeError, ArquivoInvalido) as erro:
+            raise CommandError(f'Nao foi possivel importar o arquivo: {erro}')
+
+        for erro in resultado['erros']:
+            self.stderr.write(f"Linha {erro['linha']}: {'; '.join(erro['erros'])}")
+        if resultado['total_erros'] > len(resultado['erros']):
+            self.stderr.write(f"... e mais {resultado['total_erros'] - len(resultado['erros'])} linhas com erro")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['linhas']} linhas lidas, "
+            f"{resultado['colaboradores_criados']} colaboradores criados, "
+            f"{resultado['colaboradores_atualizados']} atualizados, "
+            f"{resultado['avaliacoes_criadas']} avaliacoes criadas, "
+            f"{resultado['avaliacoes_atualizadas']} atualizadas, "
+            f"{resultado['itens_importados']} itens importados, "
+            f"{resultado['total_erros']} linhas com erro"
+        ))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from avaliacao.models import AvaliacaoDesempenho
+from avaliacao.resumos import reconstruir_resumos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula soma_notas e itens_avaliados das avaliacoes a partir dos itens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Apenas verifica e lista as avaliacoes divergentes, sem corrigir',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Quantidade de ids recalculados por transacao',
+        )
+
+    def handle(self, *args, **options):
+        if options['verificar']:
+            divergentes = list(
+                AvaliacaoDesempenho.objects.divergentes().values_list('pk', flat=True)[:100]
+            )
+            if divergentes:
+                raise CommandError(
+                    f'Avaliacoes com nota divergente (ate 100): {divergentes}'
+                )
+            self.stdout.write(self.style.SUCCESS('Nenhuma divergencia encontrada'))
+            return
+
+        limites = AvaliacaoDesempenho.objects.aggregate(inicio=Min('pk'), fim=Max('pk'))
+        if limites['inicio'] is None:
+            self.stdout.write('Nenhuma avaliacao cadastrada')
+            return
+
+        lote = options['lote']
+        atualizadas = 0
+        for inicio in range(limites['inicio'], limites['fim'] + 1, lote):
+            with transaction.atomic():
+                atualizadas += AvaliacaoDesempenho.objects.filter(
+                    pk__gte=inicio, pk__lt=inicio + lote,
+                ).recalcular_notas()
+
+        self.stdout.write(self.style.SUCCESS(f'{atualizadas} avaliacoes recalculadas'))
+
+        # os resumos mensais somam a soma_notas das avaliacoes
+        resumos, _ = reconstruir_resumos()
+        self.stdout.write(self.style.SUCCESS(f'{resumos} resumos mensais recalculados'))
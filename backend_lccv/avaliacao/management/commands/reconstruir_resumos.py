@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from avaliacao.resumos import reconstruir_resumos
+
+
+class Command(BaseCommand):
+    help = 'Apaga e recalcula todas as tabelas de resumo mensal usadas pelos relatorios'
+
+    def handle(self, *args, **options):
+        resumos, resumos_itens = reconstruir_resumos()
+        self.stdout.write(self.style.SUCCESS(
+            f'{resumos} resumos mensais e {resumos_itens} resumos por tipo de item recalculados'
+        ))
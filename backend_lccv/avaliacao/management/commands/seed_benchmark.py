@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from avaliacao.benchmark import gerar_dados, limpar_dados
+from avaliacao.models import AvaliacaoDesempenho, Colaborador, TipoItemAvaliacaoDesempenho
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera uma massa de dados sintetica e deterministica (colaboradores, tipos de item '
+        'e meses de avaliacoes com itens avaliados) para testes de desempenho'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colaboradores', type=int, default=1000)
+        parser.add_argument('--tipos', type=int, default=12, help='Tipos de item, distribuidos nas tres dimensoes')
+        parser.add_argument('--meses', type=int, default=6, help='Meses de competencia com avaliacoes')
+        parser.add_argument(
+            '--supervisores',
+            type=int,
+            help='Quantos colaboradores sao supervisores. Padrao: 1 a cada 20',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--primeiro-mes',
+            type=date.fromisoformat,
+            default=date(2025, 1, 1),
+            help='Primeiro mes de competencia (AAAA-MM-DD)',
+        )
+        parser.add_argument(
+            '--limpar',
+            action='store_true',
+            help='Apaga colaboradores, tipos, avaliacoes e resumos existentes antes de gerar',
+        )
+
+    def handle(self, *args, **options):
+        if options['colaboradores'] < 2 or options['tipos'] < 1 or options['meses'] < 1:
+            raise CommandError('Informe ao menos 2 colaboradores, 1 tipo de item e 1 mes')
+        if options['primeiro_mes'].day != 1:
+            raise CommandError('--primeiro-mes deve ser o primeiro dia do mes')
+
+        existentes = (
+            Colaborador.objects.exists()
+            or TipoItemAvaliacaoDesempenho.objects.exists()
+            or AvaliacaoDesempenho.objects.exists()
+        )
+        if existentes:
+            if not options['limpar']:
+                raise CommandError('O banco ja tem dados. Use --limpar para apaga-los antes de gerar')
+            limpar_dados()
+
+        massa = gerar_dados(
+            colaboradores=options['colaboradores'],
+            tipos=options['tipos'],
+            meses=options['meses'],
+            supervisores=options['supervisores'],
+            seed=options['seed'],
+            primeiro_mes=options['primeiro_mes'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{massa['colaboradores']} colaboradores ({massa['supervisores']} supervisores), "
+            f"{massa['tipos']} tipos de item, {massa['avaliacoes']} avaliacoes e {massa['itens']} itens criados"
+        ))
@@ -0,0 +1,208 @@
+"""
+Metricas por requisicao: quantidade de consultas SQL, tempo no banco, tempo
+de serializacao, tempo total e tamanho da resposta. A serializacao soma a
+renderizacao da resposta (JSON/CSV) e os blocos da view marcados com
+medir_serializacao() (montagem dos dicts, fora o tempo de banco dentro deles).
+
+As consultas sao contadas por um execute_wrapper instalado em toda conexao
+(signal connection_created) que soma num coletor guardado em ContextVar,
+entao funciona tanto no WSGI quanto nas views async (o contexto acompanha o
+sync_to_async). O MetricasMiddleware:
+
+- devolve os numeros no cabecalho Server-Timing;
+- escreve uma linha JSON no logger 'avaliacao.metricas' (nivel INFO, desligado
+  pelo nivel padrao WARNING de METRICAS_LOG_NIVEL);
+- acumula histogramas por rota (nome da view), servidos em /api/_metrics/.
+
+Os histogramas ficam na memoria de cada processo. Em respostas em streaming
+(exportacao) so entra o que aconteceu ate o inicio do envio.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('avaliacao.metricas')
+
+# limites superiores (inclusive) das faixas dos histogramas; acima do ultimo cai em '+Inf'
+FAIXAS_LATENCIA_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+FAIXAS_CONSULTAS = [0, 1, 2, 3, 5, 10, 20, 50, 100]
+
+_coletor = ContextVar('avaliacao_metricas', default=None)
+_histogramas = {}
+_trava = threading.Lock()
+
+
+class Coletor:
+    __slots__ = ('consultas', 'tempo_banco', 'tempo_serializacao', 'inicio', 'fim_view')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_banco = 0.0
+        self.tempo_serializacao = 0.0
+        self.inicio = time.perf_counter()
+        self.fim_view = None
+
+
+def _registrar_consulta(execute, sql, params, many, context):
+    coletor = _coletor.get()
+    if coletor is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        coletor.consultas += 1
+        coletor.tempo_banco += time.perf_counter() - inicio
+
+
+@contextmanager
+def medir_serializacao():
+    """
+    Conta o bloco como serializacao da requisicao atual. As consultas feitas
+    dentro dele (ex: FKs lidas pelo serializer) ficam so no tempo de banco
+    """
+    coletor = _coletor.get()
+    if coletor is None:
+        yield
+        return
+    inicio, banco = time.perf_counter(), coletor.tempo_banco
+    try:
+        yield
+    finally:
+        coletor.tempo_serializacao += time.perf_counter() - inicio - (coletor.tempo_banco - banco)
+
+
+def instrumentar_conexao(connection):
+    """Instala o contador de consultas na conexao (chamado no connection_created)"""
+    if _registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_registrar_consulta)
+
+
+def _faixa(faixas, valor):
+    posicao = bisect_left(faixas, valor)
+    return str(faixas[posicao]) if posicao < len(faixas) else '+Inf'
+
+
+def _novo_histograma(faixas):
+    return {'faixas': {**{str(limite): 0 for limite in faixas}, '+Inf': 0}, 'soma': 0}
+
+
+def registrar(rota, metricas):
+    with _trava:
+        historico = _histogramas.get(rota)
+        if historico is None:
+            historico = _histogramas[rota] = {
+                'requisicoes': 0,
+                'erros': 0,
+                'latencia_ms': _novo_histograma(FAIXAS_LATENCIA_MS),
+                'consultas': _novo_histograma(FAIXAS_CONSULTAS),
+                'banco_ms': 0,
+                'serializacao_ms': 0,
+                'bytes': 0,
+            }
+        historico['requisicoes'] += 1
+        if metricas['status'] >= 500:
+            historico['erros'] += 1
+        for nome, faixas, valor in (
+            ('latencia_ms', FAIXAS_LATENCIA_MS, metricas['total_ms']),
+            ('consultas', FAIXAS_CONSULTAS, metricas['consultas']),
+        ):
+            historico[nome]['faixas'][_faixa(faixas, valor)] += 1
+            historico[nome]['soma'] += valor
+        historico['banco_ms'] += metricas['banco_ms']
+        historico['serializacao_ms'] += metricas['serializacao_ms']
+        historico['bytes'] += metricas['bytes'] or 0
+
+
+def histogramas():
+    """Copia dos histogramas por rota (para /api/_metrics/)"""
+    with _trava:
+        return json.loads(json.dumps(_histogramas))
+
+
+def limpar_histogramas():
+    with _trava:
+        _histogramas.clear()
+
+
+class MetricasMiddleware:
+    """
+    Mede cada requisicao (ver o docstring do modulo). Desligado com
+    METRICAS_HABILITADAS=False
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICAS_HABILITADAS:
+            return self.get_response(request)
+        coletor = Coletor()
+        token = _coletor.set(coletor)
+        try:
+            response = self.get_response(request)
+        finally:
+            _coletor.reset(token)
+        return self._finalizar(request, response, coletor)
+
+    async def __acall__(self, request):
+        if not settings.METRICAS_HABILITADAS:
+            return await self.get_response(request)
+        coletor = Coletor()
+        token = _coletor.set(coletor)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _coletor.reset(token)
+        return self._finalizar(request, response, coletor)
+
+    def process_template_response(self, request, response):
+        # chamado depois da view e antes do render: o que vem depois eh serializacao
+        coletor = _coletor.get()
+        if coletor is not None:
+            coletor.fim_view = time.perf_counter()
+        return response
+
+    def _finalizar(self, request, response, coletor):
+        fim = time.perf_counter()
+        total_ms = (fim - coletor.inicio) * 1000
+        renderizacao = fim - coletor.fim_view if coletor.fim_view else 0.0
+        serializacao_ms = (coletor.tempo_serializacao + renderizacao) * 1000
+        match = getattr(request, 'resolver_match', None)
+        rota = f'{request.method} {match.view_name if match else "(sem rota)"}'
+        metricas = {
+            'rota': rota,
+            'caminho': request.path,
+            'status': response.status_code,
+            'consultas': coletor.consultas,
+            'banco_ms': round(coletor.tempo_banco * 1000, 2),
+            'serializacao_ms': round(serializacao_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'bytes': None if response.streaming else len(response.content),
+        }
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metricas["banco_ms"]};desc="{coletor.consultas} consultas"',
+            f'serializacao;dur={metricas["serializacao_ms"]}',
+            f'total;dur={metricas["total_ms"]}',
+        ])
+        # usado pelos orcamentos de consultas dos testes (ver testing.py)
+        response.metricas = metricas
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(metricas))
+        if match:
+            registrar(rota, metricas)
+        return response
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:23
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def preencher_soma_notas(apps, schema_editor):
+    AvaliacaoDesempenho = apps.get_model('avaliacao', 'AvaliacaoDesempenho')
+    ItemAvaliacaoDesempenho = apps.get_model('avaliacao', 'ItemAvaliacaoDesempenho')
+    itens = ItemAvaliacaoDesempenho.objects.filter(
+        avaliacao_desempenho=OuterRef('pk'),
+        nota__isnull=False,
+    ).order_by().values('avaliacao_desempenho')
+    AvaliacaoDesempenho.objects.update(
+        soma_notas=Coalesce(Subquery(itens.annotate(soma=Sum('nota')).values('soma')), 0),
+        itens_avaliados=Coalesce(Subquery(itens.annotate(qtd=Count('pk')).values('qtd')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacao', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avaliacaodesempenho',
+            name='itens_avaliados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Itens avaliados'),
+        ),
+        migrations.AddField(
+            model_name='avaliacaodesempenho',
+            name='soma_notas',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Soma das notas'),
+        ),
+        migrations.RunPython(preencher_soma_notas, migrations.RunPython.noop),
+    ]
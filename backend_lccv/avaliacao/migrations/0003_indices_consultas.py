@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:28
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacao', '0002_soma_notas_avaliacao'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='avaliacaodesempenho',
+            index=models.Index(fields=['status_avaliacao', '-mes_competencia'], name='avaliacao_status_mes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='avaliacaodesempenho',
+            index=models.Index(fields=['supervisor', '-mes_competencia'], name='avaliacao_supervisor_mes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='avaliacaodesempenho',
+            index=models.Index(fields=['-mes_competencia', 'colaborador'], name='avaliacao_mes_colaborador_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('nome', models.TextField())), name='gin_trgm_ops'), name='colaborador_nome_trgm_idx'),
+        ),
+    ]
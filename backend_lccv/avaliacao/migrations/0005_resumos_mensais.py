@@ -0,0 +1,109 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+STATUS = {
+    'Criada': 'criada',
+    'Em elaboracao': 'em_elaboracao',
+    'Em avaliacao': 'em_avaliacao',
+    'Concluida': 'concluida',
+}
+
+
+def preencher_resumos(apps, schema_editor):
+    AvaliacaoDesempenho = apps.get_model('avaliacao', 'AvaliacaoDesempenho')
+    ItemAvaliacaoDesempenho = apps.get_model('avaliacao', 'ItemAvaliacaoDesempenho')
+    ResumoMensal = apps.get_model('avaliacao', 'ResumoMensal')
+    ResumoMensalItem = apps.get_model('avaliacao', 'ResumoMensalItem')
+
+    contagens = {campo: Count('id', filter=Q(status_avaliacao=status)) for status, campo in STATUS.items()}
+    linhas = (
+        AvaliacaoDesempenho.objects.order_by()
+        .values('mes_competencia', 'supervisor_id')
+        .annotate(total=Count('id'), soma=Sum('soma_notas'), avaliados=Sum('itens_avaliados'), **contagens)
+    )
+    ResumoMensal.objects.bulk_create([
+        ResumoMensal(
+            mes_competencia=linha['mes_competencia'],
+            supervisor_id=linha['supervisor_id'],
+            total_avaliacoes=linha['total'],
+            soma_notas=linha['soma'] or 0,
+            itens_avaliados=linha['avaliados'] or 0,
+            **{campo: linha[campo] for campo in STATUS.values()},
+        )
+        for linha in linhas
+    ], batch_size=1000)
+
+    linhas = (
+        ItemAvaliacaoDesempenho.objects.order_by()
+        .values(
+            'avaliacao_desempenho__mes_competencia',
+            'avaliacao_desempenho__supervisor_id',
+            'tipo_item_avaliacao_desempenho_id',
+        )
+        .annotate(total=Count('id'), avaliados=Count('nota'), soma=Sum('nota'))
+    )
+    ResumoMensalItem.objects.bulk_create([
+        ResumoMensalItem(
+            mes_competencia=linha['avaliacao_desempenho__mes_competencia'],
+            supervisor_id=linha['avaliacao_desempenho__supervisor_id'],
+            tipo_item_avaliacao_desempenho_id=linha['tipo_item_avaliacao_desempenho_id'],
+            total_itens=linha['total'],
+            itens_avaliados=linha['avaliados'],
+            soma_notas=linha['soma'] or 0,
+        )
+        for linha in linhas
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacao', '0004_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes_competencia', models.DateField(verbose_name='Mes de competencia')),
+                ('total_avaliacoes', models.PositiveIntegerField(default=0, verbose_name='Avaliacoes')),
+                ('soma_notas', models.PositiveIntegerField(default=0, verbose_name='Soma das notas')),
+                ('itens_avaliados', models.PositiveIntegerField(default=0, verbose_name='Itens avaliados')),
+                ('criada', models.PositiveIntegerField(default=0, verbose_name='Criadas')),
+                ('em_elaboracao', models.PositiveIntegerField(default=0, verbose_name='Em elaboracao')),
+                ('em_avaliacao', models.PositiveIntegerField(default=0, verbose_name='Em avaliacao')),
+                ('concluida', models.PositiveIntegerField(default=0, verbose_name='Concluidas')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('supervisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='avaliacao.colaborador', verbose_name='Supervisor')),
+            ],
+            options={
+                'verbose_name': 'Resumo mensal',
+                'verbose_name_plural': 'Resumos mensais',
+                'constraints': [models.UniqueConstraint(fields=('mes_competencia', 'supervisor'), name='unique_resumo_mes_supervisor')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumoMensalItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes_competencia', models.DateField(verbose_name='Mes de competencia')),
+                ('total_itens', models.PositiveIntegerField(default=0, verbose_name='Itens')),
+                ('itens_avaliados', models.PositiveIntegerField(default=0, verbose_name='Itens avaliados')),
+                ('soma_notas', models.PositiveIntegerField(default=0, verbose_name='Soma das notas')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('supervisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='avaliacao.colaborador', verbose_name='Supervisor')),
+                ('tipo_item_avaliacao_desempenho', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='avaliacao.tipoitemavaliacaodesempenho', verbose_name='Tipo de item')),
+            ],
+            options={
+                'verbose_name': 'Resumo mensal por tipo de item',
+                'verbose_name_plural': 'Resumos mensais por tipo de item',
+                'constraints': [models.UniqueConstraint(fields=('mes_competencia', 'supervisor', 'tipo_item_avaliacao_desempenho'), name='unique_resumo_item_mes_supervisor_tipo')],
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:48
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+
+def remover_itens_duplicados(apps, schema_editor):
+    """
+    Deixa um item por (avaliacao, tipo) antes da constraint: fica o que tem nota,
+    depois o editado por ultimo. As somas das avaliacoes afetadas e os resumos
+    sao refeitos sem os itens apagados
+    """
+    AvaliacaoDesempenho = apps.get_model('avaliacao', 'AvaliacaoDesempenho')
+    ItemAvaliacaoDesempenho = apps.get_model('avaliacao', 'ItemAvaliacaoDesempenho')
+    ResumoMensal = apps.get_model('avaliacao', 'ResumoMensal')
+    ResumoMensalItem = apps.get_model('avaliacao', 'ResumoMensalItem')
+
+    duplicados = (
+        ItemAvaliacaoDesempenho.objects.order_by()
+        .annotate(posicao=Window(
+            RowNumber(),
+            partition_by=[F('avaliacao_desempenho_id'), F('tipo_item_avaliacao_desempenho_id')],
+            order_by=[
+                Case(When(nota__isnull=True, then=Value(1)), default=Value(0)).asc(),
+                F('atualizado_em').desc(),
+                F('pk').desc(),
+            ],
+        ))
+        .filter(posicao__gt=1)
+        .values_list('pk', 'avaliacao_desempenho_id')
+    )
+    duplicados = list(duplicados)
+    if not duplicados:
+        return
+    ItemAvaliacaoDesempenho.objects.filter(pk__in=[pk for pk, _ in duplicados]).delete()
+
+    itens = ItemAvaliacaoDesempenho.objects.filter(
+        avaliacao_desempenho=OuterRef('pk'),
+        nota__isnull=False,
+    ).order_by().values('avaliacao_desempenho')
+    AvaliacaoDesempenho.objects.filter(pk__in={avaliacao_id for _, avaliacao_id in duplicados}).update(
+        soma_notas=Coalesce(Subquery(itens.annotate(soma=Sum('nota')).values('soma')), 0),
+        itens_avaliados=Coalesce(Subquery(itens.annotate(qtd=Count('pk')).values('qtd')), 0),
+    )
+    ResumoMensal.objects.all().delete()
+    ResumoMensalItem.objects.all().delete()
+    import_module('.0005_resumos_mensais', __package__).preencher_resumos(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacao', '0005_resumos_mensais'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_itens_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='itemavaliacaodesempenho',
+            constraint=models.UniqueConstraint(fields=('avaliacao_desempenho', 'tipo_item_avaliacao_desempenho'), name='unique_item_avaliacao_tipo'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.11 on 2026-10-18 09:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def preencher_busca(apps, schema_editor):
+    AvaliacaoDesempenho = apps.get_model('avaliacao', 'AvaliacaoDesempenho')
+    ItemAvaliacaoDesempenho = apps.get_model('avaliacao', 'ItemAvaliacaoDesempenho')
+    observacoes_itens = ItemAvaliacaoDesempenho.objects.filter(
+        avaliacao_desempenho=OuterRef('pk'),
+    ).order_by().values('avaliacao_desempenho').annotate(
+        texto=StringAgg('observacoes', delimiter=' '),
+    ).values('texto')
+    AvaliacaoDesempenho.objects.update(
+        busca=(
+            SearchVector('sugestoes_supervisor', weight='A', config='portuguese')
+            + SearchVector('observacoes_avaliado', weight='B', config='portuguese')
+            + SearchVector(Subquery(observacoes_itens), weight='C', config='portuguese')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacao', '0006_item_unico_por_tipo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avaliacaodesempenho',
+            name='busca',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # antes do indice, para nao atualizar o GIN linha a linha
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='colaborador',
+            name='busca',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('nome', config='portuguese', weight='A'), '||', django.contrib.postgres.search.SearchVector('cargo', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='avaliacaodesempenho',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busca'], name='avaliacao_busca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busca'], name='colaborador_busca_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacao', '0007_busca_textual'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemavaliacaodesempenho',
+            index=models.Index(condition=models.Q(('nota__isnull', True)), fields=['avaliacao_desempenho'], name='item_sem_nota_idx'),
+        ),
+    ]
@@ -1,4 +1,13 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models import F, Func, OuterRef, Subquery, Sum, Count, FloatField, Case, When, Value
+from django.db.models.functions import Cast, Coalesce, Now, Upper
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from .catalogo import total_tipos_item
+from .resumos import marcar_avaliacoes, mover_status, somar_notas
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class StatusAvaliacao(models.TextChoices):
@@ -7,6 +16,16 @@ class StatusAvaliacao(models.TextChoices):
     EM_AVALIACAO = 'Em avaliacao', 'Em alvaiacao'
     CONCLUIDA = 'Concluida', 'Concluida'
 
+# status de destino -> status de origem exigido pela transicao
+ORIGEM_TRANSICAO = {
+    StatusAvaliacao.EM_ELABORACAO: StatusAvaliacao.CRIADA,
+    StatusAvaliacao.EM_AVALIACAO: StatusAvaliacao.EM_ELABORACAO,
+    StatusAvaliacao.CONCLUIDA: StatusAvaliacao.EM_AVALIACAO,
+}
+
+# configuracao da busca textual (stemming e stopwords em portugues)
+CONFIG_BUSCA = 'portuguese'
+
 class DimensaoItemAvaliacao(models.TextChoices):
     COMPORTAMENTO = 'Comportamento', 'Comportamento'
     ENTREGAS = 'Entregas', 'Entregas'
@@ -15,11 +34,29 @@ class DimensaoItemAvaliacao(models.TextChoices):
 class Colaborador(models.Model):
     nome = models.CharField(max_length=255, verbose_name='Nome')
     cargo = models.CharField(max_length=255, verbose_name='Cargo')
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    # vetor da busca textual (?q=), calculado pelo postgres a cada escrita
+    busca = models.GeneratedField(
+        expression=(
+            SearchVector('nome', weight='A', config=CONFIG_BUSCA)
+            + SearchVector('cargo', weight='B', config=CONFIG_BUSCA)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = 'Colaborador'
         verbose_name_plural = 'Colaboradores'
         ordering = ['nome']
+        indexes = [
+            # busca por nome (icontains gera UPPER(nome::text) LIKE ...)
+            GinIndex(
+                OpClass(Upper(Cast('nome', models.TextField())), name='gin_trgm_ops'),
+                name='colaborador_nome_trgm_idx',
+            ),
+            GinIndex(fields=['busca'], name='colaborador_busca_idx'),
+        ]
     
     def __str__(self):
         return f'{self.nome} | {self.cargo}'
@@ -33,6 +70,7 @@ class TipoItemAvaliacaoDesempenho(models.Model):
     )
     tipo_item_avaliacao_desempenho = models.CharField(max_length=255,verbose_name='Tipo de item')
     descricao = models.TextField(verbose_name='Descricao')
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
 
     class Meta:
         verbose_name = 'Tipo de item de avaliacao'
@@ -41,7 +79,129 @@ class TipoItemAvaliacaoDesempenho(models.Model):
 
     def __str__(self):
         return f'{self.dimensao} | {self.tipo_item_avaliacao_desempenho}'
-    
+
+
+class AvaliacaoDesempenhoQuerySet(models.QuerySet):
+    def com_nota(self):
+        """
+        Anota a nota calculada no banco (nota_calculada) a partir da soma_notas.
+        O total de tipos de item vem de uma subconsulta sem correlacao,
+        entao o postgres calcula uma unica vez por consulta
+        """
+        total_tipos = Subquery(
+            TipoItemAvaliacaoDesempenho.objects.order_by()
+            .annotate(total=Func(F('pk'), function='COUNT'))
+            .values('total')
+        )
+        return self.alias(
+            total_tipos=total_tipos,
+        ).annotate(
+            nota_calculada=Case(
+                When(total_tipos=0, then=Value(0.0)),
+                default=Cast('soma_notas', FloatField()) / (F('total_tipos') * 5) * 100,
+                output_field=FloatField(),
+            )
+        )
+
+    def com_totais_itens(self):
+        """Anota soma e quantidade de itens avaliados calculadas direto dos itens"""
+        itens = ItemAvaliacaoDesempenho.objects.filter(
+            avaliacao_desempenho=OuterRef('pk'),
+            nota__isnull=False,
+        ).order_by().values('avaliacao_desempenho')
+        return self.annotate(
+            soma_itens=Coalesce(
+                Subquery(itens.annotate(soma=Sum('nota')).values('soma')), 0
+            ),
+            qtd_itens_avaliados=Coalesce(
+                Subquery(itens.annotate(qtd=Count('pk')).values('qtd')), 0
+            ),
+        )
+
+    def recalcular_notas(self):
+        """Recalcula soma_notas e itens_avaliados a partir dos itens em um unico UPDATE"""
+        itens = ItemAvaliacaoDesempenho.objects.filter(
+            avaliacao_desempenho=OuterRef('pk'),
+            nota__isnull=False,
+        ).order_by().values('avaliacao_desempenho')
+        return self.update(
+            soma_notas=Coalesce(
+                Subquery(itens.annotate(soma=Sum('nota')).values('soma')), 0
+            ),
+            itens_avaliados=Coalesce(
+                Subquery(itens.annotate(qtd=Count('pk')).values('qtd')), 0
+            ),
+            atualizado_em=Now(),
+        )
+
+    def atualizar_busca(self):
+        """Recalcula o vetor da busca textual (textos da avaliacao e dos itens) em um unico UPDATE"""
+        return self.update(busca=vetor_busca())
+
+    def divergentes(self):
+        """Avaliacoes cuja soma_notas/itens_avaliados nao batem com os itens"""
+        return self.com_totais_itens().exclude(
+            soma_notas=F('soma_itens'),
+            itens_avaliados=F('qtd_itens_avaliados'),
+        )
+
+    def transicionar(self, destino, lote=1000):
+        """
+        Move as avaliacoes do queryset que estao no status de origem da transicao
+        para `destino`. Cada lote trava as linhas e roda um unico
+        UPDATE ... WHERE status_avaliacao = <origem>. Retorna os ids atualizados.
+        As contagens de status dos resumos mudam no mesmo lote (mover_status)
+        """
+        origem = ORIGEM_TRANSICAO[destino]
+        candidatos = list(
+            self.order_by().filter(status_avaliacao=origem).values_list('pk', flat=True)
+        )
+        atualizados = []
+        for inicio in range(0, len(candidatos), lote):
+            with transaction.atomic():
+                linhas = list(
+                    self.model.objects.select_for_update()
+                    .order_by()
+                    .filter(pk__in=candidatos[inicio:inicio + lote], status_avaliacao=origem)
+                    .values_list('pk', 'mes_competencia', 'supervisor_id')
+                )
+                ids = [pk for pk, _, _ in linhas]
+                self.model.objects.filter(
+                    pk__in=ids, status_avaliacao=origem,
+                ).update(status_avaliacao=destino, atualizado_em=Now())
+                contagens = defaultdict(int)
+                for _, mes, supervisor_id in linhas:
+                    contagens[(mes, supervisor_id)] += 1
+                mover_status(contagens, origem, destino)
+            atualizados.extend(ids)
+        return atualizados
+
+
+def vetor_busca():
+    """
+    Vetor da busca textual da avaliacao: sugestoes do supervisor (peso A),
+    observacoes do avaliado (B) e observacoes dos itens (C)
+    """
+    observacoes_itens = ItemAvaliacaoDesempenho.objects.filter(
+        avaliacao_desempenho=OuterRef('pk'),
+    ).order_by().values('avaliacao_desempenho').annotate(
+        texto=StringAgg('observacoes', delimiter=' '),
+    ).values('texto')
+    return (
+        SearchVector('sugestoes_supervisor', weight='A', config=CONFIG_BUSCA)
+        + SearchVector('observacoes_avaliado', weight='B', config=CONFIG_BUSCA)
+        + SearchVector(Subquery(observacoes_itens), weight='C', config=CONFIG_BUSCA)
+    )
+
+# campos da avaliacao que entram no vetor da busca
+CAMPOS_BUSCA = {'sugestoes_supervisor', 'observacoes_avaliado'}
+
+# colunas desnormalizadas e o status: so mudam por UPDATE no banco (_aplicar_delta,
+# recalcular_notas, atualizar_busca, transicionar), nunca pelo save() de uma
+# avaliacao existente
+CAMPOS_NAO_GRAVADOS = {'soma_notas', 'itens_avaliados', 'busca', 'status_avaliacao'}
+
+
 class AvaliacaoDesempenho(models.Model):
     colaborador = models.ForeignKey(
         Colaborador,
@@ -72,6 +232,24 @@ class AvaliacaoDesempenho(models.Model):
         null=True,
         verbose_name='Observacoes do avaliado'
     )
+    # campos desnormalizados, mantidos pelos itens (ver ItemAvaliacaoDesempenho.save)
+    soma_notas = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        verbose_name='Soma das notas',
+    )
+    itens_avaliados = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Itens avaliados',
+    )
+    # tambem muda quando algum item da avaliacao eh editado (ETag/Last-Modified)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name='Atualizado em')
+    # busca textual (?q=), mantido pelo save() e pela edicao dos itens (ver vetor_busca)
+    busca = SearchVectorField(null=True, editable=False)
+
+    objects = AvaliacaoDesempenhoQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Avaliacao de desempenho'
@@ -83,33 +261,184 @@ class AvaliacaoDesempenho(models.Model):
                 name='unique_colaborador_mes_competencia',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['status_avaliacao', '-mes_competencia'],
+                name='avaliacao_status_mes_idx',
+            ),
+            models.Index(
+                fields=['supervisor', '-mes_competencia'],
+                name='avaliacao_supervisor_mes_idx',
+            ),
+            models.Index(
+                fields=['-mes_competencia', 'colaborador'],
+                name='avaliacao_mes_colaborador_idx',
+            ),
+            GinIndex(fields=['busca'], name='avaliacao_busca_idx'),
+        ]
 
     def __str__(self):
         return (
             f'Avaliacao de {self.colaborador.nome} no mes {self.mes_competencia.strftime("%m/%Y")}'
         )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # balde do resumo mensal como veio do banco, para atualizar o antigo se mudar
+        instance._balde_original = (
+            instance.__dict__.get('mes_competencia'),
+            instance.__dict__.get('supervisor_id'),
+        )
+        return instance
+
+    @classmethod
+    def campos_gravados(cls, update_fields=None):
+        """
+        Colunas que o save() de uma avaliacao existente grava. Sem update_fields,
+        todas menos as mantidas por UPDATEs proprios; pedir uma dessas
+        explicitamente eh erro, em vez de um save() que nao grava nada
+        """
+        if update_fields is None:
+            return [
+                campo.name for campo in cls._meta.concrete_fields
+                if not campo.primary_key and not campo.generated and campo.name not in CAMPOS_NAO_GRAVADOS
+            ]
+        proibidos = CAMPOS_NAO_GRAVADOS & set(update_fields)
+        if proibidos:
+            raise ValueError(
+                f'{", ".join(sorted(proibidos))} nao sao gravados pelo save(): use transicionar() '
+                'para o status e recalcular_notas() para soma_notas/itens_avaliados/busca'
+            )
+        return list(update_fields)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            # os valores em memoria podem estar velhos; um save() completo
+            # desfaria os deltas e as transicoes gravados por outras requisicoes
+            kwargs['update_fields'] = self.campos_gravados(kwargs.get('update_fields'))
+        update_fields = kwargs.get('update_fields')
+        # avaliacao nova sem texto: os itens ainda nao existem, nao ha o que indexar
+        sem_texto = self._state.adding and not (self.sugestoes_supervisor or self.observacoes_avaliado)
+        altera_texto = update_fields is None or bool(CAMPOS_BUSCA & set(update_fields))
+        if sem_texto or not altera_texto:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            type(self).objects.filter(pk=self.pk).atualizar_busca()
     
     @property
     def nota(self):
-        total_itens = TipoItemAvaliacaoDesempenho.objects.count()
+        # usa o valor anotado por com_nota() quando disponivel
+        if hasattr(self, 'nota_calculada'):
+            return self.nota_calculada
+        total_itens = total_tipos_item()
         if total_itens == 0:
             return 0
-        soma = sum(
-            item.nota for item in self.itens.all() if item.nota is not None
-        )
-        return (soma / (total_itens * 5)) * 100
+        return (self.soma_notas / (total_itens * 5)) * 100
     
+    def transicionar(self, destino):
+        """
+        Compare-and-set: o UPDATE so acontece se o status no banco ainda for o
+        de origem da transicao, entao duas requisicoes concorrentes nao passam
+        as duas. Retorna False se a avaliacao nao estava no status esperado
+        """
+        origem = ORIGEM_TRANSICAO[destino]
+        with transaction.atomic():
+            atualizadas = type(self).objects.filter(
+                pk=self.pk,
+                status_avaliacao=origem,
+            ).update(status_avaliacao=destino, atualizado_em=Now())
+            if atualizadas:
+                # o balde relido com a linha ja travada pelo UPDATE, nao o da memoria
+                balde = type(self).objects.filter(pk=self.pk).values_list('mes_competencia', 'supervisor_id').get()
+                mover_status({balde: 1}, origem, destino)
+        if atualizadas:
+            self.status_avaliacao = destino
+        return bool(atualizadas)
+
     def iniciar(self):
-        self.status_avaliacao = StatusAvaliacao.EM_ELABORACAO
-        self.save(update_fields=['status_avaliacao'])
+        return self.transicionar(StatusAvaliacao.EM_ELABORACAO)
 
     def dar_feedback(self):
-        self.status_avaliacao = StatusAvaliacao.EM_AVALIACAO
-        self.save(update_fields=['status_avaliacao'])
+        return self.transicionar(StatusAvaliacao.EM_AVALIACAO)
 
     def concluir(self):
-        self.status_avaliacao = StatusAvaliacao.CONCLUIDA
-        self.save(update_fields=['status_avaliacao'])
+        return self.transicionar(StatusAvaliacao.CONCLUIDA)
+
+# balde (mes_competencia, supervisor_id) do item, lido junto com a nota atual
+CAMPOS_BALDE_ITEM = ('avaliacao_desempenho__mes_competencia', 'avaliacao_desempenho__supervisor_id')
+
+
+class ItemAvaliacaoDesempenhoQuerySet(models.QuerySet):
+    def atualizar_notas(self, itens, fields=('nota', 'observacoes'), batch_size=None):
+        """
+        bulk_update dos itens mantendo soma_notas/itens_avaliados das avaliacoes.
+        As notas atuais sao lidas com lock para o delta ficar correto
+        mesmo com edicoes concorrentes
+        """
+        itens = list(itens)
+        with transaction.atomic():
+            atuais = {
+                pk: (nota, balde)
+                for pk, nota, *balde in ItemAvaliacaoDesempenho.objects.select_for_update(of=('self',))
+                .order_by()
+                .filter(pk__in=[item.pk for item in itens])
+                .values_list('pk', 'nota', *CAMPOS_BALDE_ITEM)
+            }
+            agora = timezone.now()
+            for item in itens:
+                item.atualizado_em = agora
+            self.model.objects.bulk_update(itens, [*fields, 'atualizado_em'], batch_size=batch_size)
+            deltas = defaultdict(lambda: [0, 0])
+            deltas_resumos = []
+            for item in itens:
+                if 'nota' in fields and item.pk in atuais:
+                    nota_anterior, balde = atuais[item.pk]
+                    soma, qtd = _delta_nota(nota_anterior, item.nota)
+                    deltas_resumos.append((tuple(balde), item.tipo_item_avaliacao_desempenho_id, soma, qtd, 0))
+                else:
+                    soma, qtd = 0, 0
+                deltas[item.avaliacao_desempenho_id][0] += soma
+                deltas[item.avaliacao_desempenho_id][1] += qtd
+            for avaliacao_id, (soma, qtd) in deltas.items():
+                _aplicar_delta(avaliacao_id, soma, qtd, busca='observacoes' in fields)
+            somar_notas(deltas_resumos)
+        return len(itens)
+
+
+def _delta_nota(nota_anterior, nota_nova):
+    soma = (nota_nova or 0) - (nota_anterior or 0)
+    qtd = (nota_nova is not None) - (nota_anterior is not None)
+    return soma, qtd
+
+
+def _aplicar_delta(avaliacao_id, soma, qtd, busca=False):
+    # sempre atualiza atualizado_em: a avaliacao muda junto com qualquer item
+    campos = {
+        'soma_notas': F('soma_notas') + soma,
+        'itens_avaliados': F('itens_avaliados') + qtd,
+        'atualizado_em': Now(),
+    }
+    if busca:
+        # observacoes dos itens alteradas, o vetor eh recalculado no mesmo UPDATE
+        campos['busca'] = vetor_busca()
+    AvaliacaoDesempenho.objects.filter(pk=avaliacao_id).update(**campos)
+
+
+def descontar_item(item):
+    """Tira da avaliacao e dos resumos a nota (e o texto, na busca) de um item apagado"""
+    soma, qtd = _delta_nota(item.nota, None)
+    with transaction.atomic():
+        _aplicar_delta(item.avaliacao_desempenho_id, soma, qtd, busca=bool(item.observacoes))
+        balde = (
+            AvaliacaoDesempenho.objects.filter(pk=item.avaliacao_desempenho_id)
+            .values_list('mes_competencia', 'supervisor_id')
+            .first()
+        )
+        if balde:
+            somar_notas([(balde, item.tipo_item_avaliacao_desempenho_id, soma, qtd, -1)])
+
 
 class ItemAvaliacaoDesempenho(models.Model):
     avaliacao_desempenho = models.ForeignKey(
@@ -135,6 +464,9 @@ class ItemAvaliacaoDesempenho(models.Model):
         blank=True,
         verbose_name='Observacoes'
     )
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+
+    objects = ItemAvaliacaoDesempenhoQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Item de avaliacao'
@@ -147,10 +479,124 @@ class ItemAvaliacaoDesempenho(models.Model):
                     | (models.Q(nota__gte=1) & models.Q(nota__lte=5))
                 ),
                 name='nota_item_entre_1_e_5'
-            )
+            ),
+            # um item por tipo em cada avaliacao (usado no upsert da importacao)
+            models.UniqueConstraint(
+                fields=['avaliacao_desempenho', 'tipo_item_avaliacao_desempenho'],
+                name='unique_item_avaliacao_tipo',
+            ),
+        ]
+        indexes = [
+            # filtro ?itens_pendentes= (EXISTS de item sem nota); so guarda os itens pendentes
+            models.Index(
+                fields=['avaliacao_desempenho'],
+                condition=models.Q(nota__isnull=True),
+                name='item_sem_nota_idx',
+            ),
         ]
 
     def __str__(self):
         return (
             f'{self.tipo_item_avaliacao_desempenho} | Nota: {self.nota or "sem avaliacao"}'
-        )
\ No newline at end of file
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        altera_nota = update_fields is None or 'nota' in update_fields
+        altera_texto = update_fields is None or 'observacoes' in update_fields
+        novo = self._state.adding
+        with transaction.atomic():
+            # sem alterar a nota o delta eh zero (mas atualizado_em da avaliacao muda)
+            nota_anterior = None if altera_nota else self.nota
+            balde = None
+            if altera_nota and not novo:
+                atual = (
+                    ItemAvaliacaoDesempenho.objects.select_for_update(of=('self',))
+                    .filter(pk=self.pk)
+                    .order_by()
+                    .values_list('nota', *CAMPOS_BALDE_ITEM)
+                    .first()
+                )
+                if atual:
+                    nota_anterior, *balde = atual
+            super().save(*args, **kwargs)
+            soma, qtd = _delta_nota(nota_anterior, self.nota)
+            _aplicar_delta(self.avaliacao_desempenho_id, soma, qtd, busca=altera_texto)
+            if novo:
+                # item novo muda total_itens do tipo: o balde eh recalculado no commit
+                marcar_avaliacoes([self.avaliacao_desempenho_id])
+            elif balde:
+                somar_notas([(tuple(balde), self.tipo_item_avaliacao_desempenho_id, soma, qtd, 0)])
+
+
+class ResumoMensal(models.Model):
+    """
+    Totais das avaliacoes de um mes para um supervisor, mantidos por resumos.py.
+    Os relatorios leem daqui em vez de agrupar o historico inteiro
+    """
+    mes_competencia = models.DateField(verbose_name='Mes de competencia')
+    supervisor = models.ForeignKey(
+        Colaborador,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Supervisor',
+    )
+    total_avaliacoes = models.PositiveIntegerField(default=0, verbose_name='Avaliacoes')
+    soma_notas = models.PositiveIntegerField(default=0, verbose_name='Soma das notas')
+    itens_avaliados = models.PositiveIntegerField(default=0, verbose_name='Itens avaliados')
+    # quantidade de avaliacoes em cada status (ver resumos.campos_status)
+    criada = models.PositiveIntegerField(default=0, verbose_name='Criadas')
+    em_elaboracao = models.PositiveIntegerField(default=0, verbose_name='Em elaboracao')
+    em_avaliacao = models.PositiveIntegerField(default=0, verbose_name='Em avaliacao')
+    concluida = models.PositiveIntegerField(default=0, verbose_name='Concluidas')
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+
+    class Meta:
+        verbose_name = 'Resumo mensal'
+        verbose_name_plural = 'Resumos mensais'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mes_competencia', 'supervisor'],
+                name='unique_resumo_mes_supervisor',
+            )
+        ]
+
+    def __str__(self):
+        return f'Resumo {self.mes_competencia.strftime("%m/%Y")} | supervisor {self.supervisor_id}'
+
+
+class ResumoMensalItem(models.Model):
+    """Totais dos itens de um tipo nas avaliacoes de um mes para um supervisor"""
+    mes_competencia = models.DateField(verbose_name='Mes de competencia')
+    supervisor = models.ForeignKey(
+        Colaborador,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Supervisor',
+    )
+    tipo_item_avaliacao_desempenho = models.ForeignKey(
+        TipoItemAvaliacaoDesempenho,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Tipo de item',
+    )
+    total_itens = models.PositiveIntegerField(default=0, verbose_name='Itens')
+    itens_avaliados = models.PositiveIntegerField(default=0, verbose_name='Itens avaliados')
+    soma_notas = models.PositiveIntegerField(default=0, verbose_name='Soma das notas')
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+
+    class Meta:
+        verbose_name = 'Resumo mensal por tipo de item'
+        verbose_name_plural = 'Resumos mensais por tipo de item'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mes_competencia', 'supervisor', 'tipo_item_avaliacao_desempenho'],
+                name='unique_resumo_item_mes_supervisor_tipo',
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f'Resumo {self.mes_competencia.strftime("%m/%Y")} | supervisor {self.supervisor_id} '
+            f'| tipo {self.tipo_item_avaliacao_desempenho_id}'
+        )
@@ -0,0 +1,195 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def codificar_cursor(valores, anterior=False):
+    dados = {'v': [_serializar_valor(valor) for valor in valores]}
+    if anterior:
+        dados['r'] = 1
+    texto = json.dumps(dados, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        dados = json.loads(texto)
+        valores = dados['v']
+    except (TypeError, ValueError, KeyError, binascii.Error):
+        raise NotFound('Cursor invalido')
+    # o cliente pode editar o cursor: so lista de valores simples (os campos de ordenacao nao sao nulos)
+    if not isinstance(valores, list) or not all(isinstance(valor, (str, int, float)) for valor in valores):
+        raise NotFound('Cursor invalido')
+    return valores, bool(dados.get('r'))
+
+
+def _serializar_valor(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def valor_do_campo(linha, campo):
+    """Le o valor de um campo de ordenacao (aceita relacoes com __) em instancias ou dicts"""
+    if isinstance(linha, dict):
+        return linha['id'] if campo == 'pk' and 'pk' not in linha else linha[campo]
+    for parte in campo.split('__'):
+        linha = getattr(linha, 'pk' if parte == 'pk' else parte)
+    return linha
+
+
+def filtro_keyset(ordenacao, valores, anterior=False):
+    """
+    Monta o predicado "depois da linha com esses valores" para uma ordenacao
+    composta: (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    O primeiro campo tambem entra como faixa simples para o indice ser usado
+    """
+    filtro = Q()
+    anteriores = Q()
+    for campo, valor in zip(ordenacao, valores):
+        decrescente = campo.startswith('-') != anterior
+        nome = campo.lstrip('-')
+        filtro |= anteriores & Q(**{f'{nome}__{"lt" if decrescente else "gt"}': valor})
+        anteriores &= Q(**{nome: valor})
+    primeiro = ordenacao[0]
+    decrescente = primeiro.startswith('-') != anterior
+    faixa = Q(**{f'{primeiro.lstrip("-")}__{"lte" if decrescente else "gte"}': valores[0]})
+    return faixa & filtro
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginacao por cursor (keyset) para ordenacoes compostas.
+
+    O cursor guarda os valores da ultima linha da pagina e a proxima pagina
+    eh buscada com WHERE (ordenacao) > (valores), entao paginas profundas
+    custam o mesmo que a primeira, sem OFFSET. A chave primaria eh sempre
+    adicionada no fim da ordenacao para desempate. Os campos de ordenacao
+    nao podem ser nulos.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+        self.max_page_size = getattr(settings, 'PAGINACAO_TAMANHO_MAXIMO', 200)
+
+    def get_page_size(self, request):
+        try:
+            tamanho = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if tamanho <= 0:
+            return self.page_size
+        return min(tamanho, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        ordenacao = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordenacao = backend().get_ordering(request, queryset, view)
+                break
+        if not ordenacao:
+            ordenacao = (
+                getattr(view, 'ordering', None)
+                or queryset.query.order_by
+                or queryset.model._meta.ordering
+            )
+        ordenacao = [campo for campo in ordenacao if campo.lstrip('-') not in ('pk', 'id')]
+        desempate = '-pk' if ordenacao and ordenacao[-1].startswith('-') else 'pk'
+        return [*ordenacao, desempate]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.concluir_pagina(list(self.consulta_pagina(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset lendo as linhas com o ORM async"""
+        return self.concluir_pagina([linha async for linha in self.consulta_pagina(queryset, request, view)])
+
+    def consulta_pagina(self, queryset, request, view=None):
+        """Monta a consulta da pagina (uma linha a mais para saber se ha proxima), sem executar"""
+        self.request = request
+        self.page_size_atual = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.base_url = request.build_absolute_uri()
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        valores, self.anterior = decodificar_cursor(cursor) if cursor else (None, False)
+        if valores is not None and len(valores) != len(self.ordering):
+            raise NotFound('Cursor invalido')
+        self.tem_cursor = valores is not None
+
+        ordenacao = self.ordering
+        if self.anterior:
+            ordenacao = [campo[1:] if campo.startswith('-') else f'-{campo}' for campo in ordenacao]
+        queryset = queryset.order_by(*ordenacao)
+        if valores is not None:
+            try:
+                queryset = queryset.filter(filtro_keyset(self.ordering, valores, self.anterior))
+            except (TypeError, ValueError, ValidationError):
+                # valor de tipo errado para o campo (ex: numero no lugar de uma data)
+                raise NotFound('Cursor invalido')
+        return queryset[:self.page_size_atual + 1]
+
+    def concluir_pagina(self, resultados):
+        self.tem_mais = len(resultados) > self.page_size_atual
+        resultados = resultados[:self.page_size_atual]
+        if self.anterior:
+            resultados.reverse()
+        self.pagina = resultados
+        return resultados
+
+    def _url(self, linha, anterior):
+        if linha is None:
+            return None
+        valores = [valor_do_campo(linha, campo.lstrip('-')) for campo in self.ordering]
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, codificar_cursor(valores, anterior)
+        )
+
+    def get_next_link(self):
+        if not self.pagina:
+            return None
+        if self.anterior or self.tem_mais:
+            return self._url(self.pagina[-1], anterior=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.pagina or not self.tem_cursor:
+            return None
+        if self.anterior and not self.tem_mais:
+            return None
+        return self._url(self.pagina[0], anterior=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
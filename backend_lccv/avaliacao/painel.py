@@ -0,0 +1,119 @@
+"""
+Painel do supervisor: as avaliacoes que ele supervisiona num mes, com nota,
+itens pendentes, contagem por status e media da equipe.
+
+O painel sai de duas consultas (linhas e agregados, pelo indice de
+supervisor + mes) e fica no cache do Django por supervisor e mes. A chave eh
+apagada quando os resumos mensais do balde (mes, supervisor) sao
+recalculados, o que acontece no commit de toda edicao de item, transicao de
+status ou cadastro/edicao de avaliacao (ver resumos.py). A versao do
+catalogo entra na chave (a nota depende do total de tipos) e uma geracao
+global invalida todos os paineis de uma vez (reconstrucao dos resumos e
+edicao de colaboradores, cujos nomes aparecem no painel).
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .catalogo import versao_catalogo
+from .models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao
+from .relatorios import nota_media
+
+CHAVE_GERACAO = 'avaliacao:painel:geracao'
+# curto, para limitar o tempo de um painel montado com dados lidos antes de um commit concorrente
+TEMPO_CACHE = 60 * 5
+
+
+def _geracao():
+    geracao = cache.get(CHAVE_GERACAO)
+    if geracao is None:
+        cache.add(CHAVE_GERACAO, time.time_ns(), None)
+        geracao = cache.get(CHAVE_GERACAO)
+    return geracao
+
+
+def _chave(supervisor_id, mes):
+    # o mes dos baldes pode vir como texto ('AAAA-MM-DD') de um objects.create()
+    return f'avaliacao:painel:{_geracao()}:{versao_catalogo()}:{supervisor_id}:{mes}'
+
+
+def invalidar_paineis(baldes=None):
+    """Apaga os paineis dos baldes (mes_competencia, supervisor_id); sem baldes, todos"""
+    if baldes is None:
+        cache.set(CHAVE_GERACAO, time.time_ns(), None)
+        return
+    cache.delete_many([_chave(supervisor_id, mes) for mes, supervisor_id in baldes])
+
+
+def ultimo_mes(supervisor_id):
+    """Mes de competencia mais recente das avaliacoes do supervisor (ciclo atual)"""
+    return AvaliacaoDesempenho.objects.filter(supervisor_id=supervisor_id).aggregate(
+        mes=Max('mes_competencia'),
+    )['mes']
+
+
+def montar_painel(supervisor_id, mes):
+    avaliacoes = AvaliacaoDesempenho.objects.order_by().filter(supervisor_id=supervisor_id, mes_competencia=mes)
+
+    # usa o indice parcial item_sem_nota_idx
+    pendentes = ItemAvaliacaoDesempenho.objects.filter(
+        avaliacao_desempenho=OuterRef('pk'),
+        nota__isnull=True,
+    ).order_by().values('avaliacao_desempenho').annotate(total=Count('pk')).values('total')
+    linhas = list(
+        avaliacoes.com_nota()
+        .annotate(pendentes=Coalesce(Subquery(pendentes, output_field=IntegerField()), 0))
+        .values(
+            'id', 'colaborador_id', 'colaborador__nome', 'status_avaliacao',
+            'nota_calculada', 'itens_avaliados', 'pendentes',
+        )
+        .order_by('colaborador__nome', 'id')
+    )
+
+    totais = avaliacoes.aggregate(
+        total=Count('id'),
+        soma=Sum('soma_notas'),
+        **{status.name: Count('id', filter=Q(status_avaliacao=status)) for status in StatusAvaliacao},
+    )
+    return {
+        'mes_competencia': mes.isoformat(),
+        'total_avaliacoes': totais['total'],
+        'status': {status.value: totais[status.name] for status in StatusAvaliacao},
+        'media_equipe': nota_media(totais['soma'], totais['total']),
+        'itens_pendentes': sum(linha['pendentes'] for linha in linhas),
+        'avaliacoes': [
+            {
+                'id': linha['id'],
+                'colaborador': linha['colaborador_id'],
+                'colaborador_nome': linha['colaborador__nome'],
+                'status_avaliacao': linha['status_avaliacao'],
+                'nota': linha['nota_calculada'],
+                'itens_avaliados': linha['itens_avaliados'],
+                'itens_pendentes': linha['pendentes'],
+            }
+            for linha in linhas
+        ],
+    }
+
+
+def painel(supervisor_id, mes=None):
+    """Painel do mes (padrao: ultimo mes com avaliacoes do supervisor), do cache se houver"""
+    mes = mes or ultimo_mes(supervisor_id)
+    if mes is None:
+        # supervisor sem nenhuma avaliacao
+        return {
+            'mes_competencia': None,
+            'total_avaliacoes': 0,
+            'status': {status.value: 0 for status in StatusAvaliacao},
+            'media_equipe': 0,
+            'itens_pendentes': 0,
+            'avaliacoes': [],
+        }
+    chave = _chave(supervisor_id, mes)
+    dados = cache.get(chave)
+    if dados is None:
+        dados = montar_painel(supervisor_id, mes)
+        cache.set(chave, dados, TEMPO_CACHE)
+    return dados
@@ -0,0 +1,136 @@
+"""
+Relatorios agregados, lidos das tabelas de resumo mensal (ver resumos.py).
+
+Cada consulta agrupa as linhas de ResumoMensal/ResumoMensalItem do periodo,
+entao o custo depende da quantidade de meses x supervisores (x tipos), nao do
+historico de itens. Nome e dimensao dos tipos vem do catalogo em cache.
+"""
+from collections import defaultdict
+
+from django.db.models import Sum
+
+from .catalogo import tipos_item, total_tipos_item
+from .models import ResumoMensal, ResumoMensalItem
+from .resumos import campos_status
+
+
+def _periodo(queryset, inicio=None, fim=None):
+    queryset = queryset.order_by()
+    if inicio:
+        queryset = queryset.filter(mes_competencia__gte=inicio)
+    if fim:
+        queryset = queryset.filter(mes_competencia__lte=fim)
+    return queryset
+
+
+def nota_media(soma_notas, total_avaliacoes):
+    """Soma das soma_notas -> media da nota (0 a 100), mesma conta de AvaliacaoDesempenho.nota"""
+    total_tipos = total_tipos_item()
+    if not soma_notas or not total_avaliacoes or not total_tipos:
+        return 0
+    return round(soma_notas / total_avaliacoes * 100 / (total_tipos * 5), 2)
+
+
+def _media_itens(soma, avaliados):
+    return round(soma / avaliados, 2) if avaliados else None
+
+
+def media_por_mes(inicio=None, fim=None):
+    linhas = (
+        _periodo(ResumoMensal.objects, inicio, fim)
+        .values('mes_competencia')
+        .annotate(total=Sum('total_avaliacoes'), soma=Sum('soma_notas'))
+        .order_by('mes_competencia')
+    )
+    return [
+        {
+            'mes_competencia': linha['mes_competencia'],
+            'total_avaliacoes': linha['total'],
+            'nota_media': nota_media(linha['soma'], linha['total']),
+        }
+        for linha in linhas
+    ]
+
+
+def media_por_supervisor(inicio=None, fim=None):
+    linhas = (
+        _periodo(ResumoMensal.objects, inicio, fim)
+        .values('supervisor_id', 'supervisor__nome')
+        .annotate(total=Sum('total_avaliacoes'), soma=Sum('soma_notas'))
+        .order_by('supervisor__nome', 'supervisor_id')
+    )
+    return [
+        {
+            'supervisor': linha['supervisor_id'],
+            'supervisor_nome': linha['supervisor__nome'],
+            'total_avaliacoes': linha['total'],
+            'nota_media': nota_media(linha['soma'], linha['total']),
+        }
+        for linha in linhas
+    ]
+
+
+def _totais_por_tipo(inicio=None, fim=None):
+    """{tipo_id: (soma das notas, itens avaliados, total de itens)}"""
+    linhas = (
+        _periodo(ResumoMensalItem.objects, inicio, fim)
+        .values('tipo_item_avaliacao_desempenho_id')
+        .annotate(soma=Sum('soma_notas'), avaliados=Sum('itens_avaliados'), total=Sum('total_itens'))
+    )
+    return {
+        linha['tipo_item_avaliacao_desempenho_id']: (linha['soma'] or 0, linha['avaliados'], linha['total'])
+        for linha in linhas
+    }
+
+
+def media_por_tipo_item(inicio=None, fim=None):
+    totais = _totais_por_tipo(inicio, fim)
+    resultado = []
+    for tipo in tipos_item():
+        soma, avaliados, total = totais.get(tipo['id'], (0, 0, 0))
+        resultado.append({
+            'tipo_item_avaliacao_desempenho': tipo['id'],
+            'tipo_item_avaliacao_desempenho_nome': tipo['tipo_item_avaliacao_desempenho'],
+            'dimensao': tipo['dimensao'],
+            'total_itens': total,
+            'itens_avaliados': avaliados,
+            'nota_media': _media_itens(soma, avaliados),
+        })
+    return resultado
+
+
+def media_por_dimensao(inicio=None, fim=None):
+    totais = _totais_por_tipo(inicio, fim)
+    por_dimensao = defaultdict(lambda: [0, 0, 0])
+    for tipo in tipos_item():
+        acumulado = por_dimensao[tipo['dimensao']]
+        for posicao, valor in enumerate(totais.get(tipo['id'], (0, 0, 0))):
+            acumulado[posicao] += valor
+    return [
+        {
+            'dimensao': dimensao,
+            'total_itens': por_dimensao[dimensao][2],
+            'itens_avaliados': por_dimensao[dimensao][1],
+            'nota_media': _media_itens(por_dimensao[dimensao][0], por_dimensao[dimensao][1]),
+        }
+        for dimensao in sorted(por_dimensao)
+    ]
+
+
+def status_por_mes(inicio=None, fim=None):
+    # o alias nao pode ter o mesmo nome do campo somado
+    contagens = {f'qtd_{campo}': Sum(campo) for campo in campos_status().values()}
+    linhas = (
+        _periodo(ResumoMensal.objects, inicio, fim)
+        .values('mes_competencia')
+        .annotate(total=Sum('total_avaliacoes'), **contagens)
+        .order_by('mes_competencia')
+    )
+    return [
+        {
+            'mes_competencia': linha['mes_competencia'],
+            'total_avaliacoes': linha['total'],
+            **{campo: linha[f'qtd_{campo}'] for campo in campos_status().values()},
+        }
+        for linha in linhas
+    ]
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Habilita ?format=csv. A exportacao responde com StreamingHttpResponse,
+    entao o render so eh usado nas respostas de erro
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(data.keys())
+        escritor.writerow(
+            '; '.join(str(valor) for valor in valores) if isinstance(valores, list) else valores
+            for valores in data.values()
+        )
+        return buffer.getvalue().encode(self.charset)
+
+
+class JSONLinesRenderer(BaseRenderer):
+    """Habilita ?format=jsonl (ver CSVRenderer)"""
+    media_type = 'application/jsonl'
+    format = 'jsonl'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode(self.charset)
@@ -0,0 +1,325 @@
+"""
+Tabelas de resumo mensal (ResumoMensal e ResumoMensalItem).
+
+Guardam os totais por (mes_competencia, supervisor) e por tipo de item, entao
+os relatorios leem O(baldes) linhas em vez de agrupar todo o historico de itens.
+
+A atualizacao eh incremental:
+- notas dos itens e transicoes de status aplicam o delta nas linhas do balde com
+  UPDATE ... SET x = x + delta, na mesma transacao da edicao (somar_notas e
+  mover_status);
+- cadastro, troca de mes/supervisor, importacao e abertura de ciclo marcam a
+  avaliacao (ou o balde) como pendente e, no commit da transacao, so os baldes
+  afetados sao recalculados, todos juntos em um unico recalculo por transacao.
+O comando reconstruir_resumos refaz tudo do zero.
+"""
+import threading
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Now
+
+# pendencias da transacao atual (por thread), ver _marcar()
+_pendentes = threading.local()
+
+# chave dos advisory locks do recalculo (pg_advisory_xact_lock(CHAVE_TRAVA, mes))
+CHAVE_TRAVA = 7301
+
+
+def campos_status():
+    """{status: nome do campo de contagem no ResumoMensal}"""
+    from .models import StatusAvaliacao
+    return {status: status.name.lower() for status in StatusAvaliacao}
+
+
+class Pendencias:
+    """Avaliacoes e baldes marcados numa transacao, descarregados no commit dela"""
+
+    def __init__(self):
+        self.avaliacoes = set()
+        self.baldes = set()
+        self.descarregada = False
+
+    def descarregar(self):
+        from .models import AvaliacaoDesempenho
+        self.descarregada = True
+        baldes = set(self.baldes)
+        if self.avaliacoes:
+            baldes |= set(
+                AvaliacaoDesempenho.objects.order_by()
+                .filter(pk__in=self.avaliacoes)
+                .values_list('mes_competencia', 'supervisor_id')
+                .distinct()
+            )
+        atualizar_resumos(baldes)
+
+
+def _marcar(avaliacoes=(), baldes=()):
+    """
+    Junta as marcacoes nas pendencias da transacao atual. Cada Pendencias
+    registra um unico on_commit; se a transacao (ou o savepoint que registrou o
+    callback) for desfeita, o django descarta o callback e a proxima marcacao
+    comeca do zero, sem levar os baldes desfeitos para o proximo commit
+    """
+    pendencias = getattr(_pendentes, 'pendencias', None)
+    registradas = [funcao for _, funcao, _ in transaction.get_connection().run_on_commit]
+    nova = (
+        pendencias is None
+        or pendencias.descarregada
+        or pendencias.descarregar not in registradas
+    )
+    if nova:
+        pendencias = _pendentes.pendencias = Pendencias()
+    pendencias.avaliacoes.update(avaliacoes)
+    pendencias.baldes.update(baldes)
+    if nova:
+        # fora de transacao o on_commit roda na hora, por isso vem depois
+        transaction.on_commit(pendencias.descarregar)
+
+
+def marcar_avaliacoes(ids):
+    """Agenda a atualizacao dos baldes dessas avaliacoes para o commit da transacao"""
+    ids = [avaliacao_id for avaliacao_id in ids if avaliacao_id is not None]
+    if ids:
+        _marcar(avaliacoes=ids)
+
+
+def marcar_baldes(baldes):
+    """Agenda a atualizacao dos baldes (mes_competencia, supervisor_id) para o commit"""
+    baldes = [balde for balde in baldes if None not in balde]
+    if baldes:
+        _marcar(baldes=baldes)
+
+
+def somar_notas(deltas):
+    """
+    Aplica nos resumos os deltas de itens editados ou apagados, sem recalcular
+    o balde: deltas = [(balde, tipo_id, soma, avaliados, itens)], com
+    balde = (mes_competencia, supervisor_id). Um UPDATE com F() no resumo do
+    balde e um nos resumos dos tipos dele. Balde ainda sem resumo (ex: criado
+    na mesma transacao) cai no recalculo do commit
+    """
+    # {balde: {tipo_id: [soma, avaliados, itens]}}
+    por_balde = defaultdict(lambda: defaultdict(lambda: [0, 0, 0]))
+    for balde, tipo_id, *valores in deltas:
+        linha = por_balde[balde][tipo_id]
+        for posicao, valor in enumerate(valores):
+            linha[posicao] += valor
+    por_balde = {
+        balde: {tipo_id: linha for tipo_id, linha in tipos.items() if any(linha)}
+        for balde, tipos in por_balde.items()
+    }
+    por_balde = {balde: tipos for balde, tipos in por_balde.items() if tipos}
+    if not por_balde:
+        return
+    from .models import ResumoMensal, ResumoMensalItem
+
+    _travar_deltas({mes for mes, _ in por_balde})
+    faltando = set()
+    # sempre na mesma ordem, para duas transacoes nao se travarem
+    for (mes, supervisor_id), tipos in sorted(por_balde.items()):
+        soma = sum(linha[0] for linha in tipos.values())
+        avaliados = sum(linha[1] for linha in tipos.values())
+        if (soma or avaliados) and not ResumoMensal.objects.filter(
+            mes_competencia=mes, supervisor_id=supervisor_id,
+        ).update(
+            soma_notas=F('soma_notas') + soma,
+            itens_avaliados=F('itens_avaliados') + avaliados,
+            atualizado_em=Now(),
+        ):
+            faltando.add((mes, supervisor_id))
+        # todos os tipos do balde no mesmo UPDATE, o delta de cada um num CASE
+        por_tipo = lambda posicao: Case(
+            *(When(tipo_item_avaliacao_desempenho_id=tipo_id, then=Value(linha[posicao]))
+              for tipo_id, linha in tipos.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        atualizados = ResumoMensalItem.objects.filter(
+            mes_competencia=mes, supervisor_id=supervisor_id, tipo_item_avaliacao_desempenho_id__in=list(tipos),
+        ).update(
+            soma_notas=F('soma_notas') + por_tipo(0),
+            itens_avaliados=F('itens_avaliados') + por_tipo(1),
+            total_itens=F('total_itens') + por_tipo(2),
+            atualizado_em=Now(),
+        )
+        if atualizados < len(tipos):
+            faltando.add((mes, supervisor_id))
+        if any(linha[2] < 0 for linha in tipos.values()):
+            # como no recalculo, tipo sem nenhum item no balde nao tem resumo
+            ResumoMensalItem.objects.filter(
+                mes_competencia=mes, supervisor_id=supervisor_id, tipo_item_avaliacao_desempenho_id__in=list(tipos),
+                total_itens=0,
+            ).delete()
+    _depois_dos_deltas(set(por_balde), faltando)
+
+
+def mover_status(contagens, origem, destino):
+    """
+    Aplica uma transicao nos resumos, sem recalcular o balde:
+    contagens = {balde: avaliacoes movidas de `origem` para `destino`}
+    """
+    contagens = {balde: n for balde, n in contagens.items() if n}
+    if not contagens:
+        return
+    from .models import ResumoMensal
+
+    campos = campos_status()
+    _travar_deltas({mes for mes, _ in contagens})
+    faltando = set()
+    for (mes, supervisor_id), n in sorted(contagens.items()):
+        if not ResumoMensal.objects.filter(mes_competencia=mes, supervisor_id=supervisor_id).update(**{
+            campos[origem]: F(campos[origem]) - n,
+            campos[destino]: F(campos[destino]) + n,
+            'atualizado_em': Now(),
+        }):
+            faltando.add((mes, supervisor_id))
+    _depois_dos_deltas(set(contagens), faltando)
+
+
+def _depois_dos_deltas(baldes, faltando):
+    from .painel import invalidar_paineis
+    marcar_baldes(faltando)
+    # invalida no commit: antes dele outro worker guardaria no cache o painel velho
+    transaction.on_commit(lambda: invalidar_paineis(baldes))
+
+
+def atualizar_resumos(baldes):
+    """
+    Recalcula os resumos dos meses x supervisores dos baldes informados.
+    O filtro eh por mes IN (...) AND supervisor IN (...), entao pode recalcular
+    alguns baldes a mais, nunca a menos
+    """
+    baldes = set(baldes)
+    if not baldes:
+        return
+    meses = {mes for mes, _ in baldes}
+    supervisores = {supervisor for _, supervisor in baldes}
+    _recalcular({'mes_competencia__in': meses, 'supervisor_id__in': supervisores}, meses)
+    # os paineis dos supervisores usam os mesmos baldes
+    from .painel import invalidar_paineis
+    invalidar_paineis(baldes)
+
+
+def reconstruir_resumos():
+    """Apaga e recalcula todos os resumos. Retorna (resumos, resumos por tipo)"""
+    from .painel import invalidar_paineis
+    totais = _recalcular({})
+    invalidar_paineis()
+    return totais
+
+
+def _travar(meses=None):
+    """
+    Serializa os recalculos de um mesmo mes: dois commits concorrentes apagando
+    e regravando os mesmos resumos entravam em deadlock. A reconstrucao completa
+    (meses=None) pega a trava geral exclusiva; os recalculos parciais pegam a
+    geral compartilhada e a de cada mes, sempre na mesma ordem
+    """
+    with connection.cursor() as cursor:
+        if meses is None:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, 0)', [CHAVE_TRAVA])
+            return
+        cursor.execute('SELECT pg_advisory_xact_lock_shared(%s, 0)', [CHAVE_TRAVA])
+        for numero in _numeros_meses(meses):
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [CHAVE_TRAVA, numero])
+
+
+def _travar_deltas(meses):
+    """
+    Os deltas pegam as travas dos meses compartilhadas: rodam em paralelo entre
+    si, mas esperam um recalculo do mesmo mes terminar (e vice-versa). Sem isso o
+    recalculo podia regravar o balde com totais lidos antes de um delta
+    concorrente ser confirmado, perdendo o delta
+    """
+    numeros = _numeros_meses(meses)
+    sql = ', '.join(['pg_advisory_xact_lock_shared(%s, %s)'] * (len(numeros) + 1))
+    parametros = [CHAVE_TRAVA, 0]
+    for numero in numeros:
+        parametros += [CHAVE_TRAVA, numero]
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {sql}', parametros)
+
+
+def _numeros_meses(meses):
+    # os baldes podem trazer o mes como texto (ex: importacao)
+    return sorted({int(str(mes)[:4]) * 12 + int(str(mes)[5:7]) for mes in meses})
+
+
+@transaction.atomic
+def _recalcular(filtro, meses=None):
+    from .models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, ResumoMensal, ResumoMensalItem
+
+    _travar(meses)
+    campos = campos_status()
+    ResumoMensal.objects.filter(**filtro).delete()
+    ResumoMensalItem.objects.filter(**filtro).delete()
+
+    contagens = {
+        campo: Count('id', filter=Q(status_avaliacao=status))
+        for status, campo in campos.items()
+    }
+    linhas = (
+        AvaliacaoDesempenho.objects.order_by()
+        .filter(**filtro)
+        .values('mes_competencia', 'supervisor_id')
+        .annotate(
+            total=Count('id'),
+            soma=Sum('soma_notas'),
+            avaliados=Sum('itens_avaliados'),
+            **contagens,
+        )
+    )
+    resumos = [
+        ResumoMensal(
+            mes_competencia=linha['mes_competencia'],
+            supervisor_id=linha['supervisor_id'],
+            total_avaliacoes=linha['total'],
+            soma_notas=linha['soma'] or 0,
+            itens_avaliados=linha['avaliados'] or 0,
+            **{campo: linha[campo] for campo in campos.values()},
+        )
+        for linha in linhas
+    ]
+    ResumoMensal.objects.bulk_create(
+        resumos,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['mes_competencia', 'supervisor'],
+        update_fields=[
+            'total_avaliacoes', 'soma_notas', 'itens_avaliados',
+            *campos.values(), 'atualizado_em',
+        ],
+    )
+
+    filtro_itens = {f'avaliacao_desempenho__{campo}': valor for campo, valor in filtro.items()}
+    linhas = (
+        ItemAvaliacaoDesempenho.objects.order_by()
+        .filter(**filtro_itens)
+        .values(
+            'avaliacao_desempenho__mes_competencia',
+            'avaliacao_desempenho__supervisor_id',
+            'tipo_item_avaliacao_desempenho_id',
+        )
+        .annotate(total=Count('id'), avaliados=Count('nota'), soma=Sum('nota'))
+    )
+    resumos_itens = [
+        ResumoMensalItem(
+            mes_competencia=linha['avaliacao_desempenho__mes_competencia'],
+            supervisor_id=linha['avaliacao_desempenho__supervisor_id'],
+            tipo_item_avaliacao_desempenho_id=linha['tipo_item_avaliacao_desempenho_id'],
+            total_itens=linha['total'],
+            itens_avaliados=linha['avaliados'],
+            soma_notas=linha['soma'] or 0,
+        )
+        for linha in linhas
+    ]
+    ResumoMensalItem.objects.bulk_create(
+        resumos_itens,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['mes_competencia', 'supervisor', 'tipo_item_avaliacao_desempenho'],
+        update_fields=['total_itens', 'itens_avaliados', 'soma_notas', 'atualizado_em'],
+    )
+    return len(resumos), len(resumos_itens)
@@ -0,0 +1,220 @@
+"""
+Serializacao rapida das avaliacoes (list e retrieve).
+
+As linhas sao lidas com .values() e os dicts da resposta sao montados direto,
+sem instanciar modelos e sem passar pelos campos do ModelSerializer, que eram
+a maior parte do tempo das listagens. A saida tem que ser identica a de
+AvaliacaoDesempenhoListSerializer / AvaliacaoDesempenhoDetailSerializer
+(mesmas chaves, na mesma ordem, com os mesmos valores). Ao mudar um desses
+serializers, mude tambem CAMPOS_RAPIDOS.
+
+Ligada pela configuracao SERIALIZACAO_RAPIDA.
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from .catalogo import tipos_item_por_id
+from .filters import colunas_ordenacao
+from .metricas import medir_serializacao
+from .models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao, TipoItemAvaliacaoDesempenho
+
+ROTULOS_STATUS = dict(StatusAvaliacao.choices)
+
+
+def _pessoa(prefixo):
+    id_, nome, cargo = f'{prefixo}_id', f'{prefixo}__nome', f'{prefixo}__cargo'
+    return lambda linha: {'id': linha[id_], 'nome': linha[nome], 'cargo': linha[cargo]}
+
+
+# campo da resposta -> (colunas do values(), funcao linha -> valor).
+# 'nota' usa a anotacao de com_nota() e 'itens' eh preenchido a parte
+CAMPOS_RAPIDOS = {
+    'id': (['id'], itemgetter('id')),
+    'colaborador': (['colaborador_id'], itemgetter('colaborador_id')),
+    'colaborador_nome': (['colaborador__nome'], itemgetter('colaborador__nome')),
+    'colaborador_detail': (
+        ['colaborador_id', 'colaborador__nome', 'colaborador__cargo'], _pessoa('colaborador'),
+    ),
+    'supervisor': (['supervisor_id'], itemgetter('supervisor_id')),
+    'supervisor_nome': (['supervisor__nome'], itemgetter('supervisor__nome')),
+    'supervisor_detail': (
+        ['supervisor_id', 'supervisor__nome', 'supervisor__cargo'], _pessoa('supervisor'),
+    ),
+    'mes_competencia': (['mes_competencia'], lambda linha: linha['mes_competencia'].isoformat()),
+    'status_avaliacao': (['status_avaliacao'], itemgetter('status_avaliacao')),
+    'status_avaliacao_display': (
+        ['status_avaliacao'],
+        lambda linha: ROTULOS_STATUS.get(linha['status_avaliacao'], linha['status_avaliacao']),
+    ),
+    'nota': ([], itemgetter('nota_calculada')),
+    'sugestoes_supervisor': (['sugestoes_supervisor'], itemgetter('sugestoes_supervisor')),
+    'observacoes_avaliado': (['observacoes_avaliado'], itemgetter('observacoes_avaliado')),
+    'itens': (['id'], itemgetter('itens')),
+}
+
+
+def consulta_valores(campos, ordenacao=()):
+    """
+    Queryset de dicts com as colunas dos campos pedidos. As colunas da
+    ordenacao entram com o mesmo nome, a paginacao le delas o cursor
+    """
+    colunas = {'id', *colunas_ordenacao(ordenacao)}
+    for campo in campos:
+        colunas.update(CAMPOS_RAPIDOS[campo][0])
+    queryset = AvaliacaoDesempenho.objects.values(*sorted(colunas))
+    if 'nota' in campos:
+        queryset = queryset.com_nota()
+    return queryset
+
+
+COLUNAS_ITEM = ['id', 'avaliacao_desempenho_id', 'tipo_item_avaliacao_desempenho_id', 'nota', 'observacoes']
+COLUNAS_TIPO = ['id', 'dimensao', 'tipo_item_avaliacao_desempenho', 'descricao']
+
+
+def consulta_itens(itens, ordenacao=()):
+    """Queryset de dicts dos itens, com as colunas da ordenacao (cursor da paginacao)"""
+    return itens.values(*sorted({*COLUNAS_ITEM, *colunas_ordenacao(ordenacao)}))
+
+
+def serializar_itens(linhas, tipos):
+    """
+    Itens no formato do ItemAvaliacaoDesempenhoSerializer, com o tipo vindo do
+    catalogo (tipos_item_por_id). Tipos fora do catalogo ficam None, ver completar_tipos
+    """
+    return [
+        {
+            'id': linha['id'],
+            'tipo_item_avaliacao_desempenho': linha['tipo_item_avaliacao_desempenho_id'],
+            'tipo_item_avaliacao_desempenho_detail': tipos.get(linha['tipo_item_avaliacao_desempenho_id']),
+            'nota': linha['nota'],
+            'observacoes': linha['observacoes'],
+        }
+        for linha in linhas
+    ]
+
+
+def tipos_faltando(itens):
+    return {
+        item['tipo_item_avaliacao_desempenho']
+        for item in itens
+        if item['tipo_item_avaliacao_desempenho_detail'] is None
+    }
+
+
+def consulta_tipos(ids):
+    # catalogo do cache desatualizado, le os tipos que faltam do banco
+    return TipoItemAvaliacaoDesempenho.objects.filter(pk__in=ids).values(*COLUNAS_TIPO)
+
+
+def completar_tipos(itens, linhas_tipos):
+    tipos = {tipo['id']: tipo for tipo in linhas_tipos}
+    for item in itens:
+        if item['tipo_item_avaliacao_desempenho_detail'] is None:
+            item['tipo_item_avaliacao_desempenho_detail'] = tipos[item['tipo_item_avaliacao_desempenho']]
+    return itens
+
+
+def agrupar_itens(linhas, itens):
+    """{avaliacao_id: [itens]}"""
+    por_avaliacao = defaultdict(list)
+    for linha, item in zip(linhas, itens):
+        por_avaliacao[linha['avaliacao_desempenho_id']].append(item)
+    return por_avaliacao
+
+
+def _itens_por_avaliacao(ids):
+    linhas = list(consulta_itens(ItemAvaliacaoDesempenho.objects.filter(avaliacao_desempenho_id__in=ids)))
+    itens = serializar_itens(linhas, tipos_item_por_id())
+    faltando = tipos_faltando(itens)
+    if faltando:
+        completar_tipos(itens, consulta_tipos(faltando))
+    return agrupar_itens(linhas, itens)
+
+
+async def aserializar_itens(linhas, tipos):
+    """serializar_itens + completar_tipos com o ORM async (tipos ja carregado do catalogo)"""
+    itens = serializar_itens(linhas, tipos)
+    faltando = tipos_faltando(itens)
+    if faltando:
+        completar_tipos(itens, [tipo async for tipo in consulta_tipos(faltando)])
+    return itens
+
+
+def serializar_avaliacoes(linhas, campos, itens=None):
+    """
+    Monta os dicts da resposta (na ordem de campos) a partir das linhas de
+    consulta_valores. itens ({avaliacao_id: [itens]}) eh consultado se nao vier
+    """
+    mapeadores = [(campo, CAMPOS_RAPIDOS[campo][1]) for campo in campos]
+    if 'itens' in campos:
+        if itens is None:
+            itens = _itens_por_avaliacao([linha['id'] for linha in linhas])
+        for linha in linhas:
+            linha['itens'] = itens.get(linha['id'], [])
+    return [{campo: valor(linha) for campo, valor in mapeadores} for linha in linhas]
+
+
+async def aserializar_avaliacoes(linhas, campos, tipos):
+    """serializar_avaliacoes com o ORM async (tipos = tipos_item_por_id(), ja carregado)"""
+    itens = None
+    if 'itens' in campos:
+        consulta = consulta_itens(
+            ItemAvaliacaoDesempenho.objects.filter(avaliacao_desempenho_id__in=[linha['id'] for linha in linhas])
+        )
+        linhas_itens = [linha async for linha in consulta]
+        itens = agrupar_itens(linhas_itens, await aserializar_itens(linhas_itens, tipos))
+    return serializar_avaliacoes(linhas, campos, itens)
+
+
+class SerializacaoRapidaMixin:
+    """
+    Troca o ModelSerializer de list e retrieve pela serializacao rapida quando
+    SERIALIZACAO_RAPIDA esta ligada. A view precisa de campos_requisitados().
+    Nos dois caminhos a montagem dos dados entra no tempo de serializacao das metricas
+    """
+
+    def _campos_rapidos(self):
+        # mesma ordem do serializer, independente da ordem em ?fields=
+        campos = self.get_serializer_class().Meta.fields
+        requisitados = self.campos_requisitados()
+        if requisitados:
+            return [campo for campo in campos if campo in requisitados]
+        return campos
+
+    def consulta_rapida(self):
+        """(campos, queryset de dicts ja filtrado) do list/retrieve"""
+        campos = self._campos_rapidos()
+        ordenacao = ()
+        if self.action == 'list' and self.paginator is not None:
+            ordenacao = self.paginator.get_ordering(self.request, AvaliacaoDesempenho.objects.all(), self)
+        return campos, self.filter_queryset(consulta_valores(campos, ordenacao))
+
+    def list(self, request, *args, **kwargs):
+        if settings.SERIALIZACAO_RAPIDA:
+            campos, queryset = self.consulta_rapida()
+            serializar = lambda linhas: serializar_avaliacoes(linhas, campos)
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+            serializar = lambda linhas: self.get_serializer(linhas, many=True).data
+        pagina = self.paginate_queryset(queryset)
+        linhas = pagina if pagina is not None else list(queryset)
+        with medir_serializacao():
+            dados = serializar(linhas)
+        if pagina is not None:
+            return self.get_paginated_response(dados)
+        return Response(dados)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.SERIALIZACAO_RAPIDA:
+            instancia = self.get_object()
+            with medir_serializacao():
+                return Response(self.get_serializer(instancia).data)
+        campos, queryset = self.consulta_rapida()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        linha = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        with medir_serializacao():
+            return Response(serializar_avaliacoes([linha], campos)[0])
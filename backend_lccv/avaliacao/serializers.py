@@ -1,5 +1,8 @@
+from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from .models import Colaborador, TipoItemAvaliacaoDesempenho, AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao
+from .catalogo import tipos_item, tipos_item_por_id
+from .models import Colaborador, TipoItemAvaliacaoDesempenho, AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao, ORIGEM_TRANSICAO
 
 
 class ColaboradorSerializer(serializers.ModelSerializer):
@@ -13,23 +16,77 @@ class TipoItemAvaliacaoDesempenhoSerializer(serializers.ModelSerializer):
         fields = ['id', 'dimensao', 'tipo_item_avaliacao_desempenho', 'descricao']
 
 class ItemAvaliacaoDesempenhoSerializer(serializers.ModelSerializer):
-    tipo_item_avaliacao_desempenho_detail = TipoItemAvaliacaoDesempenhoSerializer(
-        source='tipo_item_avaliacao_desempenho',
-        read_only=True,
-    )
+    # vem do cache do catalogo, sem join com a tabela de tipos
+    tipo_item_avaliacao_desempenho_detail = serializers.SerializerMethodField()
 
     class Meta:
         model = ItemAvaliacaoDesempenho
         fields = ['id', 'tipo_item_avaliacao_desempenho', 'tipo_item_avaliacao_desempenho_detail', 'nota', 'observacoes']
+
+    @extend_schema_field(TipoItemAvaliacaoDesempenhoSerializer)
+    def get_tipo_item_avaliacao_desempenho_detail(self, item):
+        tipo = tipos_item_por_id().get(item.tipo_item_avaliacao_desempenho_id)
+        if tipo is None:
+            return TipoItemAvaliacaoDesempenhoSerializer(item.tipo_item_avaliacao_desempenho).data
+        return tipo
     
     def validate_nota(self, value):
         if value is not None and not (1 <= value <= 5):
             raise serializers.ValidationError('A nota deve ser entre 1 e 5')
         return value
     
+class ItemNotaLoteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    nota = serializers.IntegerField(required=False, allow_null=True)
+    observacoes = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+    def validate_nota(self, value):
+        if value is not None and not (1 <= value <= 5):
+            raise serializers.ValidationError('A nota deve ser entre 1 e 5')
+        return value
+
+class CamposDinamicosMixin:
+    """
+    Sparse fieldsets: mantem so os campos recebidos no contexto em 'campos'
+    (vindos de ?fields=). Sem 'campos' no contexto, todos os campos ficam
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = self.context.get('campos')
+        if campos:
+            for nome in set(self.fields) - set(campos):
+                self.fields.pop(nome)
+
+
+# o que cada campo das avaliacoes precisa da consulta: colunas (only),
+# select_related, prefetch_related e se usa a nota anotada (com_nota)
+CONSULTA_CAMPOS_AVALIACAO = {
+    'id': {},
+    'colaborador': {'only': ['colaborador']},
+    'colaborador_nome': {'only': ['colaborador', 'colaborador__nome'], 'select': ['colaborador']},
+    'colaborador_detail': {
+        'only': ['colaborador', 'colaborador__nome', 'colaborador__cargo'],
+        'select': ['colaborador'],
+    },
+    'supervisor': {'only': ['supervisor']},
+    'supervisor_nome': {'only': ['supervisor', 'supervisor__nome'], 'select': ['supervisor']},
+    'supervisor_detail': {
+        'only': ['supervisor', 'supervisor__nome', 'supervisor__cargo'],
+        'select': ['supervisor'],
+    },
+    'mes_competencia': {'only': ['mes_competencia']},
+    'status_avaliacao': {'only': ['status_avaliacao']},
+    'status_avaliacao_display': {'only': ['status_avaliacao']},
+    'nota': {'nota': True},
+    'sugestoes_supervisor': {'only': ['sugestoes_supervisor']},
+    'observacoes_avaliado': {'only': ['observacoes_avaliado']},
+    'itens': {'prefetch': ['itens']},
+}
+
 #Serializer para listagem
 
-class AvaliacaoDesempenhoListSerializer(serializers.ModelSerializer):
+class AvaliacaoDesempenhoListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     colaborador_nome = serializers.CharField(source='colaborador.nome', read_only=True)
     supervisor_nome = serializers.CharField(source='supervisor.nome', read_only=True)
     status_avaliacao_display = serializers.CharField(
@@ -51,7 +108,7 @@ class AvaliacaoDesempenhoListSerializer(serializers.ModelSerializer):
             'nota',
         ]
 
-class AvaliacaoDesempenhoDetailSerializer(serializers.ModelSerializer):
+class AvaliacaoDesempenhoDetailSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     colaborador_detail = ColaboradorSerializer(source='colaborador', read_only=True)
     supervisor_detail = ColaboradorSerializer(source='supervisor', read_only=True)
     itens = ItemAvaliacaoDesempenhoSerializer(many=True, read_only=True)
@@ -87,14 +144,18 @@ class AvaliacaoDesempenhoDetailSerializer(serializers.ModelSerializer):
             )
         return data
     
+    @transaction.atomic
     def create(self, validated_data):
         avaliacao = AvaliacaoDesempenho.objects.create(**validated_data)
-        tipos = TipoItemAvaliacaoDesempenho.objects.all()
-        for tipo in tipos:
-            ItemAvaliacaoDesempenho.objects.create(
+        itens = ItemAvaliacaoDesempenho.objects.bulk_create([
+            ItemAvaliacaoDesempenho(
                 avaliacao_desempenho=avaliacao,
-                tipo_item_avaliacao_desempenho=tipo,
+                tipo_item_avaliacao_desempenho_id=tipo['id'],
             )
+            for tipo in tipos_item()
+        ])
+        # itens ja estao em memoria, evita reconsultar na resposta
+        avaliacao._prefetched_objects_cache = {'itens': itens}
         return avaliacao
     
 class AvaliacaoDesempenhoEditarSerializer(serializers.ModelSerializer):
@@ -112,4 +173,217 @@ class AvaliacaoDesempenhoEditarSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Nao eh possivel editar essa avalicacoa no momento'
             )
-        return data
\ No newline at end of file
+        return data
+
+
+class AbrirCicloSerializer(serializers.Serializer):
+    mes_competencia = serializers.DateField()
+    supervisores = serializers.DictField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text='Mapa {id do colaborador: id do supervisor}',
+    )
+    supervisor_padrao = serializers.PrimaryKeyRelatedField(
+        queryset=Colaborador.objects.all(),
+        required=False,
+        allow_null=True,
+    )
+    usar_mes_anterior = serializers.BooleanField(
+        default=True,
+        help_text='Usa o supervisor da avaliacao mais recente de cada colaborador',
+    )
+
+    def validate_supervisores(self, value):
+        try:
+            mapa = {int(colaborador): supervisor for colaborador, supervisor in value.items()}
+        except ValueError:
+            raise serializers.ValidationError('As chaves devem ser ids de colaboradores')
+        ids = set(mapa) | set(mapa.values())
+        existentes = set(Colaborador.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        faltando = sorted(ids - existentes)
+        if faltando:
+            raise serializers.ValidationError(f'Colaboradores inexistentes: {faltando[:20]}')
+        return mapa
+
+
+class CicloResultadoSerializer(serializers.Serializer):
+    criadas = serializers.IntegerField()
+    existentes = serializers.IntegerField()
+    sem_supervisor = serializers.IntegerField()
+    itens_criados = serializers.IntegerField()
+
+
+class TransicaoLoteSerializer(serializers.Serializer):
+    status_destino = serializers.ChoiceField(choices=[
+        (status, StatusAvaliacao(status).label) for status in ORIGEM_TRANSICAO
+    ])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        max_length=5000,
+        help_text='Avaliacoes a transicionar. Se omitido, usa os filtros',
+    )
+    mes_competencia = serializers.DateField(required=False)
+    supervisor = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if not data.get('ids') and not (data.get('mes_competencia') or data.get('supervisor')):
+            raise serializers.ValidationError(
+                'Informe os ids ou ao menos um filtro (mes_competencia, supervisor)'
+            )
+        return data
+
+
+class FalhaTransicaoSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    detail = serializers.CharField()
+
+
+class TransicaoResultadoSerializer(serializers.Serializer):
+    status_destino = serializers.CharField()
+    sucesso = serializers.ListField(child=serializers.IntegerField())
+    falhas = FalhaTransicaoSerializer(many=True)
+
+
+class PeriodoRelatorioSerializer(serializers.Serializer):
+    inicio = serializers.DateField(required=False, help_text='Primeiro mes de competencia (inclusive)')
+    fim = serializers.DateField(required=False, help_text='Ultimo mes de competencia (inclusive)')
+
+    def validate(self, data):
+        if data.get('inicio') and data.get('fim') and data['inicio'] > data['fim']:
+            raise serializers.ValidationError('inicio deve ser anterior ou igual a fim')
+        return data
+
+
+class RelatorioMesSerializer(serializers.Serializer):
+    mes_competencia = serializers.DateField()
+    total_avaliacoes = serializers.IntegerField()
+    nota_media = serializers.FloatField()
+
+
+class RelatorioSupervisorSerializer(serializers.Serializer):
+    supervisor = serializers.IntegerField()
+    supervisor_nome = serializers.CharField()
+    total_avaliacoes = serializers.IntegerField()
+    nota_media = serializers.FloatField()
+
+
+class RelatorioDimensaoSerializer(serializers.Serializer):
+    dimensao = serializers.CharField()
+    total_itens = serializers.IntegerField()
+    itens_avaliados = serializers.IntegerField()
+    nota_media = serializers.FloatField(allow_null=True, help_text='Media das notas dos itens (1 a 5)')
+
+
+class RelatorioTipoItemSerializer(serializers.Serializer):
+    tipo_item_avaliacao_desempenho = serializers.IntegerField()
+    tipo_item_avaliacao_desempenho_nome = serializers.CharField()
+    dimensao = serializers.CharField()
+    total_itens = serializers.IntegerField()
+    itens_avaliados = serializers.IntegerField()
+    nota_media = serializers.FloatField(allow_null=True, help_text='Media das notas dos itens (1 a 5)')
+
+
+class RelatorioStatusMesSerializer(serializers.Serializer):
+    mes_competencia = serializers.DateField()
+    total_avaliacoes = serializers.IntegerField()
+    criada = serializers.IntegerField()
+    em_elaboracao = serializers.IntegerField()
+    em_avaliacao = serializers.IntegerField()
+    concluida = serializers.IntegerField()
+
+
+class PainelFiltroSerializer(serializers.Serializer):
+    mes = serializers.DateField(
+        required=False,
+        help_text='Mes de competencia. Se omitido, usa o ultimo mes com avaliacoes do supervisor',
+    )
+
+
+class PainelAvaliacaoSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    colaborador = serializers.IntegerField()
+    colaborador_nome = serializers.CharField()
+    status_avaliacao = serializers.CharField()
+    nota = serializers.FloatField()
+    itens_avaliados = serializers.IntegerField()
+    itens_pendentes = serializers.IntegerField(help_text='Itens ainda sem nota')
+
+
+class PainelStatusSerializer(serializers.Serializer):
+    def get_fields(self):
+        return {status.value: serializers.IntegerField() for status in StatusAvaliacao}
+
+
+class PainelSerializer(serializers.Serializer):
+    supervisor = ColaboradorSerializer()
+    mes_competencia = serializers.DateField(allow_null=True)
+    total_avaliacoes = serializers.IntegerField()
+    status = PainelStatusSerializer(help_text='Quantidade de avaliacoes por status')
+    media_equipe = serializers.FloatField(help_text='Nota media das avaliacoes do mes (0 a 100)')
+    itens_pendentes = serializers.IntegerField()
+    avaliacoes = PainelAvaliacaoSerializer(many=True)
+
+
+class HistoricoFiltroSerializer(PeriodoRelatorioSerializer):
+    janela = serializers.IntegerField(
+        required=False,
+        min_value=2,
+        max_value=36,
+        help_text='Tamanho da media movel, em meses. Se omitido, a media movel nao eh calculada',
+    )
+    variacao = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Calcula a variacao em relacao a avaliacao anterior',
+    )
+
+
+class HistoricoDimensaoSerializer(serializers.Serializer):
+    dimensao = serializers.CharField()
+    itens_avaliados = serializers.IntegerField()
+    nota_media = serializers.FloatField(allow_null=True, help_text='Media dos itens avaliados (1 a 5)')
+    media_movel = serializers.FloatField(allow_null=True)
+    variacao = serializers.FloatField(allow_null=True)
+
+
+class HistoricoMesSerializer(serializers.Serializer):
+    mes_competencia = serializers.DateField()
+    avaliacao = serializers.IntegerField()
+    status_avaliacao = serializers.CharField()
+    nota = serializers.FloatField(help_text='Nota da avaliacao (0 a 100)')
+    nota_media_movel = serializers.FloatField(allow_null=True)
+    nota_variacao = serializers.FloatField(allow_null=True)
+    dimensoes = HistoricoDimensaoSerializer(many=True)
+
+
+class HistoricoSerializer(serializers.Serializer):
+    colaborador = ColaboradorSerializer()
+    janela = serializers.IntegerField(allow_null=True)
+    meses = HistoricoMesSerializer(many=True)
+
+
+class ImportacaoSerializer(serializers.Serializer):
+    arquivo = serializers.FileField(
+        help_text=(
+            'CSV com cabecalho. Colunas: colaborador_nome (obrigatoria), colaborador_cargo, '
+            'supervisor_nome, supervisor_cargo, mes_competencia, status_avaliacao, '
+            'sugestoes_supervisor, observacoes_avaliado, tipo_item, nota_item, observacoes_item'
+        ),
+    )
+
+
+class ErroImportacaoSerializer(serializers.Serializer):
+    linha = serializers.IntegerField()
+    erros = serializers.ListField(child=serializers.CharField())
+
+
+class ImportacaoResultadoSerializer(serializers.Serializer):
+    linhas = serializers.IntegerField()
+    colaboradores_criados = serializers.IntegerField()
+    colaboradores_atualizados = serializers.IntegerField()
+    avaliacoes_criadas = serializers.IntegerField()
+    avaliacoes_atualizadas = serializers.IntegerField()
+    itens_importados = serializers.IntegerField()
+    total_erros = serializers.IntegerField()
+    erros = ErroImportacaoSerializer(many=True, help_text='Primeiras linhas com erro (ate 1000)')
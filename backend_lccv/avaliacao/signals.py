@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogo import invalidar_catalogo
+from .metricas import instrumentar_conexao
+from .models import (
+    AvaliacaoDesempenho,
+    Colaborador,
+    ItemAvaliacaoDesempenho,
+    TipoItemAvaliacaoDesempenho,
+    descontar_item,
+)
+from .painel import invalidar_paineis
+from .resumos import marcar_baldes
+
+
+@receiver([post_save, post_delete], sender=TipoItemAvaliacaoDesempenho)
+def tipo_item_alterado(sender, **kwargs):
+    # invalida agora e de novo no commit, para nenhum worker guardar
+    # no cache a versao lida antes da transacao terminar
+    invalidar_catalogo()
+    transaction.on_commit(invalidar_catalogo)
+
+
+@receiver([post_save, post_delete], sender=AvaliacaoDesempenho)
+def avaliacao_alterada(sender, instance, **kwargs):
+    # atualiza o resumo do balde atual e do anterior, se o mes ou supervisor mudou
+    marcar_baldes([
+        (instance.mes_competencia, instance.supervisor_id),
+        getattr(instance, '_balde_original', (None, None)),
+    ])
+
+
+@receiver(post_delete, sender=ItemAvaliacaoDesempenho)
+def item_apagado(sender, instance, origin=None, **kwargs):
+    # item apagado junto com a avaliacao (cascade): nao ha o que descontar
+    if isinstance(origin, AvaliacaoDesempenho) or getattr(origin, 'model', None) is AvaliacaoDesempenho:
+        return
+    # admin, delete_selected ou queryset.delete(): mantem soma_notas, busca e resumos
+    descontar_item(instance)
+
+
+@receiver(post_save, sender=Colaborador)
+def colaborador_alterado(sender, **kwargs):
+    # o nome dos colaboradores aparece nos paineis dos supervisores
+    transaction.on_commit(invalidar_paineis)
+
+
+@receiver(connection_created)
+def conexao_criada(sender, connection, **kwargs):
+    # conta as consultas de cada requisicao (ver metricas.py)
+    instrumentar_conexao(connection)
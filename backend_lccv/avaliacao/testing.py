@@ -0,0 +1,75 @@
+"""
+Ajudas para testes: orcamento de consultas SQL por endpoint.
+
+Uso num TestCase:
+
+    class AvaliacaoTests(OrcamentoConsultasMixin, TestCase):
+        orcamentos = {
+            'GET avaliacao-list': 2,
+            'GET avaliacao-detail': 3,
+        }
+
+        def test_listagem(self):
+            self.client.get('/api/avaliacoes/')   # falha se passar de 2 consultas
+
+Toda resposta do self.client para uma rota com orcamento eh conferida (a
+contagem vem do MetricasMiddleware, a mesma dos cabecalhos Server-Timing). Um
+N+1 que volte a aparecer faz o teste falhar com a lista das consultas.
+Para trechos de codigo fora de uma requisicao ha o orcamento_consultas().
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+def _descrever(consultas):
+    return '\n'.join(f'{posicao}. {consulta["sql"]}' for posicao, consulta in enumerate(consultas, start=1))
+
+
+@contextmanager
+def orcamento_consultas(maximo, using=DEFAULT_DB_ALIAS):
+    """Falha (AssertionError) se o bloco executar mais que `maximo` consultas"""
+    with CaptureQueriesContext(connections[using]) as contexto:
+        yield contexto
+    total = len(contexto.captured_queries)
+    if total > maximo:
+        raise AssertionError(
+            f'{total} consultas executadas, orcamento de {maximo}:\n{_descrever(contexto.captured_queries)}'
+        )
+
+
+class OrcamentoConsultasMixin:
+    """
+    Confere as respostas do self.client contra `orcamentos`
+    ({'METODO nome-da-rota': maximo de consultas})
+    """
+
+    orcamentos = {}
+
+    def setUp(self):
+        super().setUp()
+        self._capturas = CaptureQueriesContext(connections[DEFAULT_DB_ALIAS])
+        self._capturas.__enter__()
+        self.addCleanup(self._capturas.__exit__, None, None, None)
+        self.client.request = self._conferir_orcamento(self.client.request)
+
+    def _conferir_orcamento(self, request):
+        def conferir(**kwargs):
+            inicio = len(self._capturas.captured_queries)
+            response = request(**kwargs)
+            self.assertOrcamentoConsultas(response, self._capturas.captured_queries[inicio:])
+            return response
+        return conferir
+
+    def assertOrcamentoConsultas(self, response, consultas=None):
+        metricas = getattr(response, 'metricas', None)
+        if metricas is None or metricas['rota'] not in self.orcamentos:
+            return
+        maximo = self.orcamentos[metricas['rota']]
+        if metricas['consultas'] > maximo:
+            detalhe = f':\n{_descrever(consultas)}' if consultas else ''
+            self.fail(
+                f'{metricas["rota"]} ({metricas["caminho"]}) executou {metricas["consultas"]} '
+                f'consultas, orcamento de {maximo}{detalhe}'
+            )
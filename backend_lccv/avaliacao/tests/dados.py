@@ -0,0 +1,83 @@
+"""
+Massa de dados dos testes: catalogo, colaboradores e avaliacoes com itens.
+
+Os dados sao gravados pelo ORM (sem passar pela API), com soma_notas e
+itens_avaliados recalculados dos itens, como faria o recalcular_notas.
+"""
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..catalogo import invalidar_catalogo
+from ..models import (
+    AvaliacaoDesempenho,
+    Colaborador,
+    DimensaoItemAvaliacao,
+    ItemAvaliacaoDesempenho,
+    StatusAvaliacao,
+    TipoItemAvaliacaoDesempenho,
+)
+
+MES = date(2026, 1, 1)
+
+
+def criar_tipos(por_dimensao=1):
+    """Tipos de item nas tres dimensoes, em ordem de id"""
+    return [
+        TipoItemAvaliacaoDesempenho.objects.create(
+            dimensao=dimensao,
+            tipo_item_avaliacao_desempenho=f'{dimensao} {numero}',
+            descricao=f'Descricao de {dimensao} {numero}',
+        )
+        for dimensao in DimensaoItemAvaliacao.values
+        for numero in range(1, por_dimensao + 1)
+    ]
+
+
+def criar_colaboradores(quantidade, prefixo='Colaborador', cargo='Analista'):
+    return [
+        Colaborador.objects.create(nome=f'{prefixo} {numero:03d}', cargo=cargo)
+        for numero in range(1, quantidade + 1)
+    ]
+
+
+def criar_avaliacao(colaborador, supervisor, mes=MES, notas=(), status=StatusAvaliacao.CRIADA, **campos):
+    """
+    Avaliacao com um item por tipo do catalogo (em ordem de id). `notas` eh
+    aplicada na mesma ordem; os itens que sobrarem ficam sem nota
+    """
+    avaliacao = AvaliacaoDesempenho.objects.create(
+        colaborador=colaborador,
+        supervisor=supervisor,
+        mes_competencia=mes,
+        status_avaliacao=status,
+        **campos,
+    )
+    tipos = TipoItemAvaliacaoDesempenho.objects.order_by('pk')
+    notas = list(notas)
+    ItemAvaliacaoDesempenho.objects.bulk_create([
+        ItemAvaliacaoDesempenho(
+            avaliacao_desempenho=avaliacao,
+            tipo_item_avaliacao_desempenho=tipo,
+            nota=notas[posicao] if posicao < len(notas) else None,
+        )
+        for posicao, tipo in enumerate(tipos)
+    ])
+    AvaliacaoDesempenho.objects.filter(pk=avaliacao.pk).recalcular_notas()
+    avaliacao.refresh_from_db()
+    return avaliacao
+
+
+class AvaliacaoTestCase(TestCase):
+    """
+    TestCase com o cache limpo a cada teste: o catalogo, os paineis e as
+    versoes guardadas no cache (e a versao do catalogo guardada no processo)
+    nao passam de um teste para o outro
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        invalidar_catalogo()
+        self.addCleanup(cache.clear)
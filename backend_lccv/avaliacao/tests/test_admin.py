@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..admin import PaginadorContagemEstimada
+from ..models import AvaliacaoDesempenho, Colaborador
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class AdminTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, = criar_colaboradores(1, prefixo='Supervisor')
+        self.avaliacoes = [
+            criar_avaliacao(colaborador, self.supervisor, notas=[5, 4])
+            for colaborador in criar_colaboradores(5)
+        ]
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.client.force_login(admin)
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(contexto.captured_queries)
+
+    def mais_avaliacoes(self, quantidade):
+        for colaborador in criar_colaboradores(quantidade, prefixo='Outro'):
+            criar_avaliacao(colaborador, self.supervisor, notas=[3])
+
+    def test_changelist_de_avaliacoes_com_consultas_constantes(self):
+        url = '/admin/avaliacao/avaliacaodesempenho/'
+        response, poucas = self.consultas(url)
+        self.assertContains(response, 'Colaborador 001')
+        # nota anotada: (5 + 4) / (3 tipos * 5) * 100
+        self.assertContains(response, '60,0')
+        self.mais_avaliacoes(30)
+        response, muitas = self.consultas(url)
+        self.assertContains(response, 'Outro 030')
+        self.assertEqual(poucas, muitas)
+
+    def test_changelist_de_itens_com_consultas_constantes(self):
+        url = '/admin/avaliacao/itemavaliacaodesempenho/'
+        response, poucas = self.consultas(url)
+        self.assertContains(response, 'Colaborador 001')
+        self.mais_avaliacoes(30)
+        _, muitas = self.consultas(url)
+        self.assertEqual(poucas, muitas)
+
+    def test_formularios_sem_select_de_todos_os_colaboradores(self):
+        criar_colaboradores(50, prefixo='Extra')
+        avaliacao = self.avaliacoes[0]
+        response, _ = self.consultas(f'/admin/avaliacao/avaliacaodesempenho/{avaliacao.pk}/change/')
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Extra 050')
+        response, _ = self.consultas(f'/admin/avaliacao/itemavaliacaodesempenho/{avaliacao.itens.first().pk}/change/')
+        self.assertContains(response, 'vForeignKeyRawIdAdminField')
+
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'avaliacao', 'model_name': 'avaliacaodesempenho', 'field_name': 'colaborador',
+            'term': 'Extra 050',
+        })
+        self.assertEqual([resultado['text'] for resultado in response.json()['results']], ['Extra 050 | Analista'])
+
+    def test_changelist_filtrada_e_busca(self):
+        response, _ = self.consultas('/admin/avaliacao/avaliacaodesempenho/?q=Colaborador+003')
+        self.assertContains(response, 'Colaborador 003')
+        self.assertNotContains(response, 'Colaborador 004')
+
+
+class PaginadorContagemEstimadaTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_colaboradores(8)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Colaborador._meta.db_table}')
+        # a estimativa so muda no proximo ANALYZE
+        Colaborador.objects.filter(nome__in=['Colaborador 001', 'Colaborador 002']).delete()
+
+    def test_usa_a_estimativa_sem_filtro(self):
+        with mock.patch.object(PaginadorContagemEstimada, 'minimo_estimativa', 1):
+            self.assertEqual(PaginadorContagemEstimada(Colaborador.objects.all(), 10).count, 8)
+            # filtrada, conta de verdade
+            self.assertEqual(PaginadorContagemEstimada(Colaborador.objects.filter(cargo='Analista'), 10).count, 6)
+
+    def test_tabela_pequena_conta_de_verdade(self):
+        self.assertEqual(PaginadorContagemEstimada(Colaborador.objects.all(), 10).count, 6)
+        self.assertEqual(PaginadorContagemEstimada(AvaliacaoDesempenho.objects.all(), 10).count, 0)
@@ -0,0 +1,107 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from django.test.client import AsyncClient
+from rest_framework.test import APIClient
+
+from ..benchmark import _caminhos_carga, executar_carga
+from ..catalogo import invalidar_catalogo
+from ..models import StatusAvaliacao
+from ..resumos import reconstruir_resumos
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+async def obter(url, headers=None):
+    """(response, corpo) da variante async, lendo o corpo dos streams"""
+    response = await AsyncClient().get(url, headers=headers)
+    if response.streaming:
+        return response, b''.join([bloco async for bloco in response.streaming_content])
+    return response, response.content
+
+
+class EndpointsAsyncTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, self.colaborador, self.outro = criar_colaboradores(3)
+        self.avaliacao = criar_avaliacao(
+            self.colaborador, self.supervisor, notas=[5, 3], status=StatusAvaliacao.EM_ELABORACAO,
+            sugestoes_supervisor='Manter as entregas',
+        )
+        criar_avaliacao(self.outro, self.supervisor, notas=[1])
+        reconstruir_resumos()
+        self.client = APIClient()
+
+    def assertMesmaResposta(self, caminho):
+        sincrona = self.client.get(f'/api/{caminho}')
+        corpo_sincrono = b''.join(sincrona.streaming_content) if sincrona.streaming else sincrona.content
+        response, corpo = async_to_sync(obter)(f'/api/async/{caminho}')
+        self.assertEqual(response.status_code, sincrona.status_code, caminho)
+        self.assertEqual(corpo, corpo_sincrono, caminho)
+        return response
+
+    def test_leituras_iguais_as_sincronas(self):
+        item = self.avaliacao.itens.first()
+        caminhos = [
+            'avaliacoes/',
+            'avaliacoes/?fields=id,nota&ordering=-nota',
+            'avaliacoes/?q=entregas',
+            f'avaliacoes/?colaborador={self.outro.pk}&page_size=1',
+            f'avaliacoes/{self.avaliacao.pk}/',
+            f'avaliacoes/{self.avaliacao.pk}/?fields=id,itens',
+            f'avaliacoes/{self.avaliacao.pk}/itens/',
+            f'avaliacoes/{self.avaliacao.pk}/itens/{item.pk}/',
+            'colaboradores/',
+            f'colaboradores/{self.outro.pk}/',
+            'relatorios/por-mes/',
+            'relatorios/por-supervisor/',
+            'relatorios/por-dimensao/',
+            'relatorios/por-tipo-item/',
+            'relatorios/status-por-mes/',
+        ]
+        for caminho in caminhos:
+            self.assertMesmaResposta(caminho)
+
+    def test_exportacao_em_stream(self):
+        for caminho in ('avaliacoes/export/', 'avaliacoes/export/?format=jsonl&mes_competencia=2026-01-01'):
+            response = self.assertMesmaResposta(caminho)
+            self.assertTrue(response.streaming)
+            self.assertIn('attachment;', response['Content-Disposition'])
+
+    def test_get_condicional(self):
+        url = f'/api/async/avaliacoes/{self.avaliacao.pk}/'
+        response = self.assertMesmaResposta(f'avaliacoes/{self.avaliacao.pk}/')
+        self.assertIn('Last-Modified', response)
+        response, corpo = async_to_sync(obter)(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual((response.status_code, corpo), (304, b''))
+        self.client.patch(f'/api/avaliacoes/{self.avaliacao.pk}/', {'sugestoes_supervisor': 'Nova'}, format='json')
+        response, _ = async_to_sync(obter)(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 200)
+
+    def test_erros(self):
+        for caminho in ('avaliacoes/999999/', 'avaliacoes/abc/', f'avaliacoes/{self.avaliacao.pk}/itens/999999/'):
+            self.assertEqual(self.assertMesmaResposta(caminho).status_code, 404)
+        self.assertEqual(self.assertMesmaResposta('relatorios/por-mes/?inicio=janeiro').status_code, 400)
+        response = async_to_sync(AsyncClient().post)('/api/async/avaliacoes/')
+        self.assertEqual(response.status_code, 405)
+
+
+class CargaTests(TransactionTestCase):
+    """Threads do WSGI simulado abrem conexoes proprias, entao os dados precisam estar commitados"""
+
+    def setUp(self):
+        cache.clear()
+        invalidar_catalogo()
+        criar_tipos()
+        supervisor, *colaboradores = criar_colaboradores(4)
+        for colaborador in colaboradores:
+            criar_avaliacao(colaborador, supervisor, notas=[4, 5])
+
+    def test_compara_wsgi_e_asgi(self):
+        for nome, caminho in _caminhos_carga().items():
+            with self.subTest(nome):
+                resultado = executar_carga(caminho, clientes=3, requisicoes=2, threads=2, atraso=0.001)
+                for modo in ('wsgi', 'asgi'):
+                    self.assertEqual(resultado[modo]['requisicoes'], 6)
+                    self.assertGreater(resultado[modo]['requisicoes_por_s'], 0)
+                    self.assertLessEqual(resultado[modo]['mediana_ms'], resultado[modo]['p95_ms'])
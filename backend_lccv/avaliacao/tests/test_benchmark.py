@@ -0,0 +1,132 @@
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TransactionTestCase
+
+from ..benchmark import comparar, gerar_dados, limpar_dados
+from ..catalogo import invalidar_catalogo
+from ..models import (
+    AvaliacaoDesempenho,
+    Colaborador,
+    DimensaoItemAvaliacao,
+    ItemAvaliacaoDesempenho,
+    ResumoMensal,
+    StatusAvaliacao,
+    TipoItemAvaliacaoDesempenho,
+)
+from .dados import AvaliacaoTestCase
+
+
+def retrato():
+    """Conteudo da massa sem depender dos ids"""
+    return (
+        list(Colaborador.objects.order_by('pk').values_list('nome', 'cargo')),
+        list(TipoItemAvaliacaoDesempenho.objects.order_by('pk').values_list('dimensao', 'tipo_item_avaliacao_desempenho')),
+        list(AvaliacaoDesempenho.objects.order_by('pk').values_list(
+            'colaborador__nome', 'supervisor__nome', 'mes_competencia', 'status_avaliacao',
+            'sugestoes_supervisor', 'soma_notas',
+        )),
+        list(ItemAvaliacaoDesempenho.objects.order_by('pk').values_list('nota', 'observacoes')),
+    )
+
+
+class GerarDadosTests(AvaliacaoTestCase):
+    def test_quantidades(self):
+        massa = gerar_dados(colaboradores=40, tipos=6, meses=3, lote=25)
+        self.assertEqual(massa, {
+            'colaboradores': 40, 'supervisores': 2, 'tipos': 6, 'meses': 3, 'avaliacoes': 120, 'itens': 720,
+        })
+        self.assertEqual(Colaborador.objects.filter(cargo='Supervisor').count(), 2)
+        self.assertEqual(
+            set(TipoItemAvaliacaoDesempenho.objects.values_list('dimensao', flat=True)),
+            set(DimensaoItemAvaliacao.values),
+        )
+        self.assertEqual(
+            list(AvaliacaoDesempenho.objects.order_by('mes_competencia').values_list('mes_competencia', flat=True)
+                 .distinct()),
+            [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)],
+        )
+        # supervisores sao avaliados por outro supervisor
+        self.assertFalse(AvaliacaoDesempenho.objects.exclude(supervisor__cargo='Supervisor').exists())
+
+    def test_notas_e_resumos_consistentes(self):
+        gerar_dados(colaboradores=60, tipos=4, meses=2)
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+        self.assertFalse(ItemAvaliacaoDesempenho.objects.filter(
+            avaliacao_desempenho__status_avaliacao=StatusAvaliacao.CRIADA, nota__isnull=False,
+        ).exists())
+        self.assertFalse(ItemAvaliacaoDesempenho.objects.filter(
+            avaliacao_desempenho__status_avaliacao=StatusAvaliacao.CONCLUIDA, nota__isnull=True,
+        ).exists())
+        # so o ultimo mes tem avaliacoes criadas
+        self.assertEqual(
+            set(AvaliacaoDesempenho.objects.filter(status_avaliacao=StatusAvaliacao.CRIADA)
+                .values_list('mes_competencia', flat=True)),
+            {date(2025, 2, 1)},
+        )
+        self.assertEqual(
+            ResumoMensal.objects.aggregate(total=Sum('total_avaliacoes'))['total'],
+            AvaliacaoDesempenho.objects.count(),
+        )
+        self.assertTrue(AvaliacaoDesempenho.objects.filter(busca__isnull=False).exists())
+
+
+class LimpezaTests(TransactionTestCase):
+    """limpar_dados usa TRUNCATE, que nao roda com FKs pendentes dentro da transacao do TestCase"""
+
+    def setUp(self):
+        cache.clear()
+        invalidar_catalogo()
+
+    def test_mesmo_seed_mesma_massa(self):
+        gerar_dados(colaboradores=30, tipos=3, meses=2, seed=7)
+        primeira = retrato()
+        limpar_dados()
+        self.assertFalse(Colaborador.objects.exists())
+        gerar_dados(colaboradores=30, tipos=3, meses=2, seed=7)
+        self.assertEqual(retrato(), primeira)
+        limpar_dados()
+        gerar_dados(colaboradores=30, tipos=3, meses=2, seed=8)
+        self.assertNotEqual(retrato(), primeira)
+
+    def test_seed_benchmark(self):
+        saida = StringIO()
+        call_command('seed_benchmark', '--colaboradores', '20', '--tipos', '3', '--meses', '1',
+                     '--primeiro-mes', '2026-03-01', stdout=saida)
+        self.assertIn('20 colaboradores (1 supervisores), 3 tipos de item, 19 avaliacoes e 57 itens', saida.getvalue())
+        self.assertEqual(set(AvaliacaoDesempenho.objects.values_list('mes_competencia', flat=True)), {date(2026, 3, 1)})
+
+        with self.assertRaisesMessage(CommandError, '--limpar'):
+            call_command('seed_benchmark', '--colaboradores', '20', stdout=StringIO())
+        call_command('seed_benchmark', '--colaboradores', '10', '--tipos', '2', '--meses', '1', '--limpar',
+                     stdout=StringIO())
+        self.assertEqual(Colaborador.objects.count(), 10)
+
+
+class ComandosBenchmarkTests(AvaliacaoTestCase):
+    def test_seed_benchmark_parametros_invalidos(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', '--colaboradores', '1', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, 'primeiro dia do mes'):
+            call_command('seed_benchmark', '--primeiro-mes', '2026-03-15', stdout=StringIO())
+
+    def test_benchmark_parametros_invalidos(self):
+        # validados antes de criar o banco de teste
+        for argumentos in (['--escalas', 'muitos'], ['--escalas', '1'], ['--repeticoes', '0']):
+            with self.subTest(argumentos), self.assertRaises(CommandError):
+                call_command('benchmark', *argumentos, stdout=StringIO())
+
+    def test_comparar(self):
+        def execucao(mediana, consultas):
+            return {'escalas': [{
+                'massa': {'colaboradores': 500},
+                'casos': {'avaliacoes_lista': {'mediana_ms': mediana, 'consultas': consultas}},
+            }]}
+        self.assertEqual(comparar(execucao(20.0, 3), execucao(15.0, 2)), [
+            '500 colaboradores',
+            '  avaliacoes_lista: 20.0 -> 15.0 ms (-25.0%), consultas 3 -> 2',
+        ])
+        self.assertEqual(comparar(execucao(20.0, 3), {'escalas': [{'massa': {'colaboradores': 10}, 'casos': {}}]}), [])
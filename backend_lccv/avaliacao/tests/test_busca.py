@@ -0,0 +1,110 @@
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection, transaction
+from rest_framework.test import APIClient
+
+from ..models import CONFIG_BUSCA, AvaliacaoDesempenho, Colaborador, StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class BuscaAvaliacoesTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        supervisor, *colaboradores = criar_colaboradores(5)
+        self.sugestao = criar_avaliacao(colaboradores[0], supervisor,
+                                        sugestoes_supervisor='Documentar melhor as entregas do projeto')
+        self.observacao = criar_avaliacao(colaboradores[1], supervisor,
+                                          observacoes_avaliado='Fiz as entregas no prazo combinado')
+        self.item = criar_avaliacao(colaboradores[2], supervisor)
+        item = self.item.itens.first()
+        item.observacoes = 'Muitas entregas atrasadas por dependencias externas'
+        item.save()
+        self.sem_texto = criar_avaliacao(colaboradores[3], supervisor, status=StatusAvaliacao.EM_ELABORACAO)
+        self.client = APIClient()
+
+    def buscar(self, termo, **parametros):
+        response = self.client.get('/api/avaliacoes/', {'q': termo, **parametros})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [linha['id'] for linha in response.json()['results']]
+
+    def test_busca_nos_tres_textos_com_stemming(self):
+        # "entrega" casa com "entregas" (mesmo radical em portugues)
+        self.assertEqual(set(self.buscar('entrega')), {self.sugestao.pk, self.observacao.pk, self.item.pk})
+        self.assertEqual(self.buscar('dependencia'), [self.item.pk])
+        self.assertEqual(self.buscar('inexistente'), [])
+
+    def test_ordena_pela_relevancia(self):
+        # sugestoes tem peso A, observacoes do avaliado B e itens C
+        self.assertEqual(self.buscar('entregas'), [self.sugestao.pk, self.observacao.pk, self.item.pk])
+        self.assertEqual(
+            self.buscar('entregas', ordering='colaborador__nome'),
+            [self.sugestao.pk, self.observacao.pk, self.item.pk],
+        )
+        self.assertEqual(self.buscar('entregas', ordering='-colaborador__nome')[0], self.item.pk)
+
+    def test_sintaxe_de_buscador(self):
+        self.assertEqual(self.buscar('"prazo combinado"'), [self.observacao.pk])
+        self.assertEqual(self.buscar('"combinado prazo"'), [])
+        self.assertEqual(set(self.buscar('entregas -projeto')), {self.observacao.pk, self.item.pk})
+        self.assertEqual(set(self.buscar('projeto OR dependencias')), {self.sugestao.pk, self.item.pk})
+
+    def test_paginacao_pela_relevancia(self):
+        primeira = self.client.get('/api/avaliacoes/', {'q': 'entregas', 'page_size': 2}).json()
+        self.assertEqual([linha['id'] for linha in primeira['results']], [self.sugestao.pk, self.observacao.pk])
+        segunda = self.client.get(primeira['next']).json()
+        self.assertEqual([linha['id'] for linha in segunda['results']], [self.item.pk])
+        self.assertIsNone(segunda['next'])
+
+    def test_vetor_acompanha_as_edicoes(self):
+        response = self.client.patch(f'/api/avaliacoes/{self.sem_texto.pk}/', {'sugestoes_supervisor': 'Otimo mentor'},
+                                     format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.buscar('mentor'), [self.sem_texto.pk])
+
+        item = self.sem_texto.itens.last()
+        self.client.patch(f'/api/avaliacoes/{self.sem_texto.pk}/itens/{item.pk}/',
+                          {'observacoes': 'Apresentou a arquitetura'}, format='json')
+        self.assertEqual(self.buscar('arquitetura'), [self.sem_texto.pk])
+
+        # editar a nota nao pode apagar o texto dos itens do vetor
+        self.client.patch(f'/api/avaliacoes/{self.sem_texto.pk}/itens/{item.pk}/', {'nota': 3}, format='json')
+        self.assertEqual(self.buscar('arquitetura'), [self.sem_texto.pk])
+
+        self.client.patch(f'/api/avaliacoes/{self.sem_texto.pk}/', {'sugestoes_supervisor': ''}, format='json')
+        self.assertEqual(self.buscar('mentor'), [])
+        self.assertEqual(self.buscar('arquitetura'), [self.sem_texto.pk])
+
+    def test_combina_com_filtros(self):
+        self.assertEqual(self.buscar('entregas', colaborador=self.observacao.colaborador_id), [self.observacao.pk])
+
+    def test_usa_o_indice_gin(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            consulta = SearchQuery('entregas', config=CONFIG_BUSCA, search_type='websearch')
+            # sem a ordenacao padrao (JOIN com o colaborador) o plano nao depende das
+            # estatisticas da tabela: o unico caminho sem seqscan eh o indice GIN
+            plano = AvaliacaoDesempenho.objects.order_by().filter(busca=consulta).explain()
+        self.assertIn('avaliacao_busca_idx', plano)
+
+
+class BuscaColaboradoresTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pesquisadora = Colaborador.objects.create(nome='Marina Pesquisa', cargo='Analista')
+        self.pesquisadores = Colaborador.objects.create(nome='Lucas Dias', cargo='Pesquisador')
+        Colaborador.objects.create(nome='Ana Lima', cargo='Designer')
+        self.client = APIClient()
+
+    def buscar(self, termo):
+        response = self.client.get('/api/colaboradores/', {'q': termo})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [linha['id'] for linha in response.json()['results']]
+
+    def test_nome_pesa_mais_que_o_cargo(self):
+        self.assertEqual(self.buscar('pesquisa'), [self.pesquisadora.pk, self.pesquisadores.pk])
+        self.assertEqual(self.buscar('lucas'), [self.pesquisadores.pk])
+
+    def test_vetor_gerado_pelo_banco(self):
+        Colaborador.objects.filter(pk=self.pesquisadores.pk).update(cargo='Engenheiro')
+        self.assertEqual(self.buscar('pesquisa'), [self.pesquisadora.pk])
+        self.assertEqual(self.buscar('engenheira'), [self.pesquisadores.pk])
@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class CamposEsparsosTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, = criar_colaboradores(1, prefixo='Supervisor')
+        self.avaliacoes = [
+            criar_avaliacao(colaborador, self.supervisor, notas=[5], status=StatusAvaliacao.EM_ELABORACAO)
+            for colaborador in criar_colaboradores(3)
+        ]
+        self.client = APIClient()
+        # carrega o catalogo antes das contagens
+        self.client.get('/api/avaliacoes/')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [consulta['sql'] for consulta in contexto.captured_queries]
+
+    def nas_duas_serializacoes(self, teste):
+        for rapida in (True, False):
+            with self.subTest(serializacao_rapida=rapida), override_settings(SERIALIZACAO_RAPIDA=rapida):
+                teste()
+
+    def test_listagem_enxuta(self):
+        def teste():
+            dados, consultas = self.get('/api/avaliacoes/?fields=id,mes_competencia&ordering=-mes_competencia')
+            self.assertEqual([sorted(linha) for linha in dados['results']], [['id', 'mes_competencia']] * 3)
+            sql = consultas[-1]
+            self.assertNotIn('JOIN', sql)
+            # a ordenacao padrao usa o nome do colaborador: so esse join entra
+            _, consultas = self.get('/api/avaliacoes/?fields=id,mes_competencia')
+            self.assertEqual(consultas[-1].count('JOIN'), 1)
+            self.assertIn('JOIN "avaliacao_colaborador"', consultas[-1])
+            self.assertNotIn('"sugestoes_supervisor"', sql)
+            self.assertNotIn('nota_calculada', sql)
+            self.assertFalse([consulta for consulta in consultas if 'avaliacao_itemavaliacaodesempenho' in consulta])
+        self.nas_duas_serializacoes(teste)
+
+    def test_campos_com_join_e_nota(self):
+        def teste():
+            dados, consultas = self.get('/api/avaliacoes/?fields=id,colaborador_nome,nota')
+            linha = dados['results'][0]
+            self.assertEqual(sorted(linha), ['colaborador_nome', 'id', 'nota'])
+            self.assertAlmostEqual(linha['nota'], 5 * 100 / 15)
+            sql = consultas[-1]
+            self.assertIn('JOIN "avaliacao_colaborador"', sql)
+            self.assertNotIn('"supervisor_id" = ', sql)
+        self.nas_duas_serializacoes(teste)
+
+    def test_detalhe_com_itens(self):
+        avaliacao = self.avaliacoes[0]
+
+        def teste():
+            dados, consultas = self.get(f'/api/avaliacoes/{avaliacao.pk}/?fields=id,itens')
+            self.assertEqual(sorted(dados), ['id', 'itens'])
+            self.assertEqual(len(dados['itens']), 3)
+            self.assertTrue([consulta for consulta in consultas if 'avaliacao_itemavaliacaodesempenho' in consulta])
+            dados, consultas = self.get(f'/api/avaliacoes/{avaliacao.pk}/?fields=id,status_avaliacao_display')
+            self.assertEqual(dados, {'id': avaliacao.pk, 'status_avaliacao_display': 'Em elaboracao'})
+            self.assertFalse([consulta for consulta in consultas if 'avaliacao_itemavaliacaodesempenho' in consulta])
+        self.nas_duas_serializacoes(teste)
+
+    def test_ordenacao_por_campo_fora_de_fields(self):
+        def teste():
+            dados, _ = self.get('/api/avaliacoes/?fields=id&ordering=-colaborador__nome')
+            self.assertEqual(
+                [linha['id'] for linha in dados['results']],
+                [avaliacao.pk for avaliacao in reversed(self.avaliacoes)],
+            )
+        self.nas_duas_serializacoes(teste)
+
+    def test_campo_invalido(self):
+        response = self.client.get('/api/avaliacoes/?fields=id,senha')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('senha', response.json()['fields'])
+        # itens so existe no detalhe
+        self.assertEqual(self.client.get('/api/avaliacoes/?fields=itens').status_code, 400)
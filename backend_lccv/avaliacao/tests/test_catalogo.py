@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .. import catalogo
+from ..checks import cache_compartilhado
+from ..models import DimensaoItemAvaliacao, TipoItemAvaliacaoDesempenho
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+ARQUIVO = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/x'}}
+
+
+class CatalogoTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos(por_dimensao=2)
+        self.client = APIClient()
+
+    def tipo_de_outro_worker(self):
+        # bulk_create nao dispara sinais: o catalogo so muda quando a versao
+        # compartilhada for trocada, como faria a invalidacao em outro processo
+        TipoItemAvaliacaoDesempenho.objects.bulk_create([TipoItemAvaliacaoDesempenho(
+            dimensao=DimensaoItemAvaliacao.values[0], tipo_item_avaliacao_desempenho='Novo', descricao='Novo',
+        )])
+        cache.set(catalogo.CHAVE_VERSAO, 1, None)
+
+    def test_leituras_seguidas_nao_vao_ao_cache_compartilhado(self):
+        catalogo.total_tipos_item()
+        with mock.patch.object(catalogo.cache, 'get') as get:
+            for _ in range(100):
+                self.assertEqual(catalogo.total_tipos_item(), 6)
+                catalogo.tipos_item_por_id()
+        get.assert_not_called()
+
+    def test_listagem_de_itens_sem_consultar_o_catalogo(self):
+        supervisor, colaborador = criar_colaboradores(2)
+        avaliacao = criar_avaliacao(colaborador, supervisor)
+        self.client.get(f'/api/avaliacoes/{avaliacao.pk}/itens/')
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(f'/api/avaliacoes/{avaliacao.pk}/itens/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 6)
+        self.assertFalse([
+            consulta for consulta in contexto.captured_queries
+            if 'FROM "avaliacao_tipoitemavaliacaodesempenho"' in consulta['sql']
+        ])
+
+    def test_alteracao_pela_api_vale_na_hora(self):
+        self.assertEqual(catalogo.total_tipos_item(), 6)
+        response = self.client.post('/api/tipos-item-avaliacao/', {
+            'dimensao': DimensaoItemAvaliacao.values[1],
+            'tipo_item_avaliacao_desempenho': 'Pontualidade',
+            'descricao': 'Chega no horario',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(catalogo.total_tipos_item(), 7)
+        response = self.client.patch(
+            f'/api/tipos-item-avaliacao/{self.tipos[0].pk}/', {'descricao': 'Nova descricao'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(catalogo.tipos_item_por_id()[self.tipos[0].pk]['descricao'], 'Nova descricao')
+
+    def test_remocao_pelo_admin_vale_na_hora(self):
+        self.assertEqual(catalogo.total_tipos_item(), 6)
+        # o admin remove pelo delete() do model, que dispara o post_delete
+        self.tipos[0].delete()
+        self.assertEqual(catalogo.total_tipos_item(), 5)
+        self.assertNotIn(self.tipos[0].pk, catalogo.tipos_item_por_id())
+
+    @override_settings(CATALOGO_VERSAO_TTL=60)
+    def test_outro_worker_ve_a_mudanca_depois_do_ttl(self):
+        self.assertEqual(catalogo.total_tipos_item(), 6)
+        self.tipo_de_outro_worker()
+        self.assertEqual(catalogo.total_tipos_item(), 6)
+        agora = catalogo.time.monotonic()
+        with mock.patch.object(catalogo.time, 'monotonic', return_value=agora + 61):
+            self.assertEqual(catalogo.total_tipos_item(), 7)
+
+    @override_settings(CATALOGO_VERSAO_TTL=0)
+    def test_sem_ttl_le_a_versao_toda_vez(self):
+        self.assertEqual(catalogo.total_tipos_item(), 6)
+        self.tipo_de_outro_worker()
+        self.assertEqual(catalogo.total_tipos_item(), 7)
+
+    def test_aviso_de_cache_por_processo(self):
+        with override_settings(DEBUG=False, CACHES=LOCMEM):
+            avisos = cache_compartilhado(None)
+        self.assertEqual([aviso.id for aviso in avisos], ['avaliacao.W001'])
+        with override_settings(DEBUG=True, CACHES=LOCMEM):
+            self.assertEqual(cache_compartilhado(None), [])
+        with override_settings(DEBUG=False, CACHES=ARQUIVO):
+            self.assertEqual(cache_compartilhado(None), [])
@@ -0,0 +1,117 @@
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from rest_framework.test import APIClient
+
+from ..catalogo import tipos_item
+from ..ciclos import abrir_ciclo
+from ..models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, TipoItemAvaliacaoDesempenho
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+FEVEREIRO = date(2026, 2, 1)
+
+
+class AbrirCicloTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos()
+        self.supervisor, self.outro_supervisor = criar_colaboradores(2, prefixo='Supervisor')
+        self.colaboradores = criar_colaboradores(5)
+
+    def supervisores(self, mes=FEVEREIRO):
+        return dict(
+            AvaliacaoDesempenho.objects.filter(mes_competencia=mes).values_list('colaborador_id', 'supervisor_id')
+        )
+
+    def test_cria_avaliacoes_e_itens_de_todos(self):
+        resultado = abrir_ciclo(FEVEREIRO, supervisor_padrao=self.supervisor.pk)
+        # o proprio supervisor fica sem avaliacao (seria o supervisor dele mesmo)
+        self.assertEqual(resultado, {'criadas': 6, 'existentes': 0, 'sem_supervisor': 1, 'itens_criados': 18})
+        self.assertEqual(ItemAvaliacaoDesempenho.objects.count(), 18)
+        for avaliacao in AvaliacaoDesempenho.objects.all():
+            self.assertEqual(avaliacao.itens.count(), len(self.tipos))
+
+    def test_rodar_de_novo_ignora_existentes(self):
+        criar_avaliacao(self.colaboradores[0], self.outro_supervisor, mes=FEVEREIRO)
+        abrir_ciclo(FEVEREIRO, supervisor_padrao=self.supervisor.pk)
+        resultado = abrir_ciclo(FEVEREIRO, supervisor_padrao=self.supervisor.pk)
+        self.assertEqual(resultado['criadas'], 0)
+        self.assertEqual(resultado['existentes'], 6)
+        # a avaliacao que ja existia nao foi alterada nem ganhou itens repetidos
+        self.assertEqual(self.supervisores()[self.colaboradores[0].pk], self.outro_supervisor.pk)
+        self.assertEqual(ItemAvaliacaoDesempenho.objects.count(), 18)
+
+    def test_ordem_do_supervisor(self):
+        # mes anterior > padrao; mapa explicito > mes anterior
+        criar_avaliacao(self.colaboradores[0], self.outro_supervisor)
+        criar_avaliacao(self.colaboradores[1], self.outro_supervisor)
+        abrir_ciclo(
+            FEVEREIRO,
+            supervisores={self.colaboradores[1].pk: self.supervisor.pk},
+            supervisor_padrao=self.supervisor.pk,
+        )
+        supervisores = self.supervisores()
+        self.assertEqual(supervisores[self.colaboradores[0].pk], self.outro_supervisor.pk)
+        self.assertEqual(supervisores[self.colaboradores[1].pk], self.supervisor.pk)
+        self.assertEqual(supervisores[self.colaboradores[2].pk], self.supervisor.pk)
+
+    def test_sem_supervisor_nao_cria(self):
+        resultado = abrir_ciclo(FEVEREIRO)
+        self.assertEqual(resultado['criadas'], 0)
+        self.assertEqual(resultado['sem_supervisor'], 7)
+
+    def test_lotes_pequenos(self):
+        resultado = abrir_ciclo(FEVEREIRO, supervisor_padrao=self.supervisor.pk, lote=2)
+        self.assertEqual(resultado['criadas'], 6)
+        self.assertEqual(ItemAvaliacaoDesempenho.objects.count(), 18)
+
+    def test_contagens_nao_dependem_do_catalogo_em_cache(self):
+        self.assertEqual(len(tipos_item()), 3)
+        # bulk_create nao dispara os signals: o catalogo em cache fica com 3 tipos
+        TipoItemAvaliacaoDesempenho.objects.bulk_create([
+            TipoItemAvaliacaoDesempenho(dimensao='Entregas', tipo_item_avaliacao_desempenho='Novo', descricao='Novo'),
+        ])
+        self.assertEqual(len(tipos_item()), 3)
+        resultado = abrir_ciclo(FEVEREIRO, supervisor_padrao=self.supervisor.pk)
+        self.assertEqual(resultado, {'criadas': 6, 'existentes': 0, 'sem_supervisor': 1, 'itens_criados': 24})
+
+    def test_sem_tipos_cadastrados(self):
+        TipoItemAvaliacaoDesempenho.objects.all().delete()
+        resultado = abrir_ciclo(FEVEREIRO, supervisor_padrao=self.supervisor.pk)
+        self.assertEqual((resultado['criadas'], resultado['itens_criados']), (6, 0))
+
+    def test_endpoint(self):
+        client = APIClient()
+        response = client.post('/api/avaliacoes/abrir-ciclo/', {
+            'mes_competencia': '2026-02-01',
+            'supervisores': {str(self.colaboradores[0].pk): self.outro_supervisor.pk},
+            'supervisor_padrao': self.supervisor.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['criadas'], 6)
+        response = client.post('/api/avaliacoes/abrir-ciclo/', {
+            'mes_competencia': '2026-03-01',
+            'supervisores': {'999999': self.supervisor.pk},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_comando_com_mapa(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as arquivo:
+            arquivo.write('colaborador_id,supervisor_id\n')
+            arquivo.write(f'{self.colaboradores[0].pk},{self.outro_supervisor.pk}\n')
+        self.addCleanup(os.remove, arquivo.name)
+        saida = StringIO()
+        call_command(
+            'abrir_ciclo', '2026-02-01', '--mapa', arquivo.name,
+            '--supervisor-padrao', str(self.supervisor.pk), stdout=saida,
+        )
+        self.assertIn('6 avaliacoes criadas', saida.getvalue())
+        self.assertEqual(self.supervisores()[self.colaboradores[0].pk], self.outro_supervisor.pk)
+
+    def test_comando_com_supervisor_inexistente(self):
+        with self.assertRaisesMessage(CommandError, 'Supervisores inexistentes: [999999]'):
+            call_command('abrir_ciclo', '2026-02-01', '--supervisor-padrao', '999999', stdout=StringIO())
+        self.assertFalse(AvaliacaoDesempenho.objects.exists())
@@ -0,0 +1,136 @@
+"""
+Transicoes e edicoes de itens disputando a mesma avaliacao.
+
+Cada thread usa a propria conexao e faz commit de verdade, por isso os
+testes sao TransactionTestCase (o TestCase prende tudo numa transacao so).
+A barreira solta as threads juntas para as requisicoes se cruzarem no banco.
+"""
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..catalogo import invalidar_catalogo
+from ..models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao
+from .dados import criar_avaliacao, criar_colaboradores, criar_tipos
+
+THREADS = 8
+
+
+def em_paralelo(funcoes):
+    """Roda as funcoes em threads soltas ao mesmo tempo; retorna os resultados na mesma ordem"""
+    barreira = threading.Barrier(len(funcoes))
+    resultados = [None] * len(funcoes)
+    erros = []
+
+    def rodar(posicao, funcao):
+        try:
+            barreira.wait()
+            resultados[posicao] = funcao()
+        except Exception as erro:
+            erros.append(erro)
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=rodar, args=(posicao, funcao))
+        for posicao, funcao in enumerate(funcoes)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if erros:
+        raise erros[0]
+    return resultados
+
+
+class ConcorrenciaTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        invalidar_catalogo()
+        self.addCleanup(cache.clear)
+        criar_tipos(por_dimensao=THREADS // 3 + 1)
+        supervisor, colaborador = criar_colaboradores(2)
+        self.avaliacao = criar_avaliacao(colaborador, supervisor, status=StatusAvaliacao.EM_AVALIACAO)
+        self.itens = list(self.avaliacao.itens.order_by('pk'))
+
+    def post(self, url):
+        return lambda: APIClient().post(url).status_code
+
+    def patch_item(self, item, nota):
+        url = f'/api/avaliacoes/{self.avaliacao.pk}/itens/{item.pk}/'
+        return lambda: APIClient().patch(url, {'nota': nota}, format='json').status_code
+
+    def test_concluir_concorrente_so_passa_uma_vez(self):
+        url = f'/api/avaliacoes/{self.avaliacao.pk}/concluir/'
+        codigos = em_paralelo([self.post(url) for _ in range(THREADS)])
+        self.assertEqual(codigos.count(200), 1, codigos)
+        self.assertEqual(codigos.count(400), THREADS - 1, codigos)
+        self.avaliacao.refresh_from_db()
+        self.assertEqual(self.avaliacao.status_avaliacao, StatusAvaliacao.CONCLUIDA)
+
+    def test_transicoes_diferentes_na_mesma_avaliacao(self):
+        # dar feedback exige "Em elaboracao"; so o concluir pode passar
+        base = f'/api/avaliacoes/{self.avaliacao.pk}'
+        codigos = em_paralelo([
+            self.post(f'{base}/concluir/') if posicao % 2 else self.post(f'{base}/dar-feedback/')
+            for posicao in range(THREADS)
+        ])
+        self.assertEqual(codigos.count(200), 1, codigos)
+        self.avaliacao.refresh_from_db()
+        self.assertEqual(self.avaliacao.status_avaliacao, StatusAvaliacao.CONCLUIDA)
+
+    def test_edicoes_de_itens_disputando_com_o_concluir(self):
+        itens = self.itens[:THREADS - 1]
+        codigos = em_paralelo(
+            [self.patch_item(item, 4) for item in itens]
+            + [self.post(f'/api/avaliacoes/{self.avaliacao.pk}/concluir/')]
+        )
+        self.assertEqual(codigos[-1], 200)
+        notas = dict(ItemAvaliacaoDesempenho.objects.values_list('pk', 'nota'))
+        for item, codigo in zip(itens, codigos):
+            # ou a edicao entrou antes do concluir, ou foi recusada sem gravar nada
+            self.assertIn(codigo, (200, 400))
+            self.assertEqual(notas[item.pk], 4 if codigo == 200 else None)
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+
+    def test_edicoes_simultaneas_nao_perdem_deltas(self):
+        codigos = em_paralelo([self.patch_item(item, 3) for item in self.itens[:THREADS]])
+        self.assertEqual(codigos, [200] * THREADS)
+        self.avaliacao.refresh_from_db()
+        self.assertEqual(self.avaliacao.soma_notas, 3 * THREADS)
+        self.assertEqual(self.avaliacao.itens_avaliados, THREADS)
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+
+    def test_save_com_instancia_velha_nao_desfaz_transicao(self):
+        # o admin salva a instancia que carregou antes do concluir
+        velha = AvaliacaoDesempenho.objects.get(pk=self.avaliacao.pk)
+        codigos = em_paralelo([
+            self.post(f'/api/avaliacoes/{self.avaliacao.pk}/concluir/'),
+            self.patch_item(self.itens[0], 5),
+        ])
+        self.assertEqual(codigos[0], 200)
+        velha.sugestoes_supervisor = 'Texto novo'
+        velha.save()
+        self.avaliacao.refresh_from_db()
+        self.assertEqual(self.avaliacao.status_avaliacao, StatusAvaliacao.CONCLUIDA)
+        self.assertEqual(self.avaliacao.sugestoes_supervisor, 'Texto novo')
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+
+    def test_edicao_trava_a_avaliacao_antes_de_ler_o_item_uma_vez(self):
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(self.patch_item(self.itens[0], 4)(), 200)
+        consultas = [consulta['sql'] for consulta in contexto.captured_queries]
+        trava = next(posicao for posicao, sql in enumerate(consultas) if 'FOR UPDATE' in sql)
+        self.assertIn('"avaliacao_avaliacaodesempenho"', consultas[trava])
+        leituras_do_item = [
+            sql for sql in consultas
+            if sql.startswith('SELECT') and 'FOR UPDATE' not in sql
+            and f'"avaliacao_itemavaliacaodesempenho"."id" = {self.itens[0].pk}' in sql
+        ]
+        self.assertEqual(len(leituras_do_item), 1, leituras_do_item)
+        self.assertGreater(consultas.index(leituras_do_item[0]), trava)
@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import Colaborador, StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class GetCondicionalTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, self.colaborador, self.outro = criar_colaboradores(3)
+        self.avaliacao = criar_avaliacao(self.colaborador, self.supervisor, status=StatusAvaliacao.EM_ELABORACAO)
+        self.outra = criar_avaliacao(self.outro, self.supervisor)
+        self.url = f'/api/avaliacoes/{self.avaliacao.pk}/'
+        self.client = APIClient()
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_detalhe_responde_304_com_uma_consulta(self):
+        response = self.client.get(self.url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(contexto.captured_queries), 1)
+
+    def test_if_modified_since(self):
+        ultima = self.client.get(self.url)['Last-Modified']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=ultima).status_code, 304)
+
+    def test_edicao_de_item_muda_o_etag(self):
+        etag = self.etag(self.url)
+        item = self.avaliacao.itens.first()
+        self.client.patch(f'{self.url}itens/{item.pk}/', {'nota': 4}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_nome_do_colaborador_muda_o_etag(self):
+        etag = self.etag(self.url)
+        Colaborador.objects.filter(pk=self.colaborador.pk).first().save()
+        self.assertNotEqual(self.etag(self.url), etag)
+
+    def test_listagem_usa_o_maximo_do_filtro(self):
+        url_filtrada = f'/api/avaliacoes/?colaborador={self.outro.pk}'
+        etag_lista, etag_filtrada = self.etag('/api/avaliacoes/'), self.etag(url_filtrada)
+        self.assertNotEqual(etag_lista, etag_filtrada)
+        self.assertEqual(self.client.get(url_filtrada, HTTP_IF_NONE_MATCH=etag_filtrada).status_code, 304)
+        # alterar uma avaliacao fora do filtro nao invalida a listagem filtrada
+        self.client.post(f'{self.url}dar-feedback/')
+        self.assertEqual(self.client.get(url_filtrada, HTTP_IF_NONE_MATCH=etag_filtrada).status_code, 304)
+        self.assertEqual(self.client.get('/api/avaliacoes/', HTTP_IF_NONE_MATCH=etag_lista).status_code, 200)
+
+    def test_remocao_muda_o_etag_da_listagem(self):
+        etag = self.etag('/api/avaliacoes/')
+        self.outra.itens.all().delete()
+        self.outra.delete()
+        self.assertNotEqual(self.etag('/api/avaliacoes/'), etag)
+
+    def test_catalogo_e_itens(self):
+        etag_catalogo = self.etag('/api/tipos-item-avaliacao/')
+        url_itens = f'{self.url}itens/'
+        etag_itens = self.etag(url_itens)
+        self.assertEqual(self.client.get(url_itens, HTTP_IF_NONE_MATCH=etag_itens).status_code, 304)
+        criar_tipos()
+        self.assertEqual(self.client.get('/api/tipos-item-avaliacao/', HTTP_IF_NONE_MATCH=etag_catalogo).status_code, 200)
+        # os itens mostram o detalhe do tipo, que vem do catalogo
+        self.assertEqual(self.client.get(url_itens, HTTP_IF_NONE_MATCH=etag_itens).status_code, 200)
+
+    def test_avaliacao_inexistente(self):
+        self.assertEqual(self.client.get('/api/avaliacoes/999999/', HTTP_IF_NONE_MATCH='"x"').status_code, 404)
+        self.assertEqual(self.client.get('/api/avaliacoes/abc/').status_code, 404)
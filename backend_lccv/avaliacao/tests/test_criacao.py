@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho
+from .dados import AvaliacaoTestCase, criar_colaboradores, criar_tipos
+
+
+class CriacaoAvaliacaoTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.supervisor, self.colaborador = criar_colaboradores(2)
+        self.client = APIClient()
+
+    def criar(self):
+        return self.client.post('/api/avaliacoes/', {
+            'colaborador': self.colaborador.pk,
+            'supervisor': self.supervisor.pk,
+            'mes_competencia': '2026-01-01',
+        }, format='json')
+
+    def test_cria_um_item_por_tipo_num_unico_insert(self):
+        tipos = criar_tipos(por_dimensao=4)
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.criar()
+        self.assertEqual(response.status_code, 201, response.content)
+        inserts_itens = [
+            consulta for consulta in contexto.captured_queries
+            if consulta['sql'].startswith('INSERT INTO "avaliacao_itemavaliacaodesempenho"')
+        ]
+        self.assertEqual(len(inserts_itens), 1)
+        itens = response.json()['itens']
+        self.assertEqual(len(itens), len(tipos))
+        self.assertEqual(
+            sorted(item['tipo_item_avaliacao_desempenho'] for item in itens),
+            sorted(tipo.pk for tipo in tipos),
+        )
+        self.assertEqual(ItemAvaliacaoDesempenho.objects.count(), len(tipos))
+        # a resposta usa os itens em memoria, sem SELECT dos itens depois do INSERT
+        self.assertFalse([
+            consulta for consulta in contexto.captured_queries
+            if consulta['sql'].startswith('SELECT') and 'avaliacao_itemavaliacaodesempenho' in consulta['sql']
+        ])
+
+    def test_consultas_nao_crescem_com_o_catalogo(self):
+        criar_tipos()
+        with CaptureQueriesContext(connection) as poucos_tipos:
+            self.criar()
+        AvaliacaoDesempenho.objects.all().delete()
+        criar_tipos(por_dimensao=10)
+        with CaptureQueriesContext(connection) as muitos_tipos:
+            self.criar()
+        self.assertEqual(len(poucos_tipos.captured_queries), len(muitos_tipos.captured_queries))
+
+    def test_falha_nos_itens_desfaz_a_avaliacao(self):
+        criar_tipos()
+        self.client.raise_request_exception = False
+        with mock.patch.object(
+            ItemAvaliacaoDesempenho.objects, 'bulk_create', side_effect=DatabaseError('falha simulada'),
+        ):
+            response = self.criar()
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(AvaliacaoDesempenho.objects.exists())
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from .. import exportacao
+from ..models import AvaliacaoDesempenho
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+FEVEREIRO = date(2026, 2, 1)
+
+
+class ExportacaoTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos()
+        self.supervisor, self.colaborador, self.outro = criar_colaboradores(3)
+        self.avaliacao = criar_avaliacao(
+            self.colaborador, self.supervisor, notas=[5, 4], sugestoes_supervisor='Texto, com virgula',
+        )
+        criar_avaliacao(self.outro, self.supervisor, mes=FEVEREIRO)
+        self.client = APIClient()
+
+    def baixar(self, **parametros):
+        response = self.client.get('/api/avaliacoes/export/', parametros)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_uma_linha_por_item(self):
+        response, texto = self.baixar()
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="avaliacoes.csv"')
+        linhas = list(csv.DictReader(io.StringIO(texto)))
+        self.assertEqual(len(linhas), 6)
+        primeira = linhas[0]
+        self.assertEqual(list(primeira), exportacao.COLUNAS)
+        self.assertEqual(primeira['avaliacao_id'], str(self.avaliacao.pk))
+        self.assertEqual(primeira['colaborador_nome'], 'Colaborador 002')
+        self.assertEqual(primeira['sugestoes_supervisor'], 'Texto, com virgula')
+        self.assertEqual(primeira['nota_avaliacao'], '60.0')
+        self.assertEqual(primeira['tipo_item'], self.tipos[0].tipo_item_avaliacao_desempenho)
+        self.assertEqual(primeira['nota_item'], '5')
+
+    def test_jsonl_filtrado_por_mes(self):
+        response, texto = self.baixar(format='jsonl', mes_competencia='2026-02-01')
+        self.assertTrue(response['Content-Type'].startswith('application/jsonl'))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="avaliacoes-2026-02.jsonl"')
+        linhas = [json.loads(linha) for linha in texto.splitlines()]
+        self.assertEqual(len(linhas), 3)
+        self.assertEqual({linha['mes_competencia'] for linha in linhas}, {'2026-02-01'})
+        self.assertIsNone(linhas[0]['nota_item'])
+
+    def test_avaliacao_sem_itens_sai_uma_vez(self):
+        sem_itens = AvaliacaoDesempenho.objects.create(
+            colaborador=self.supervisor, supervisor=self.outro, mes_competencia=FEVEREIRO,
+        )
+        _, texto = self.baixar()
+        linhas = [linha for linha in csv.DictReader(io.StringIO(texto)) if linha['avaliacao_id'] == str(sem_itens.pk)]
+        self.assertEqual(len(linhas), 1)
+        self.assertEqual(linhas[0]['item_id'], '')
+
+    def test_gera_em_blocos(self):
+        with mock.patch.object(exportacao, 'TAMANHO_BLOCO', 100):
+            response = self.client.get('/api/avaliacoes/export/')
+            blocos = list(response.streaming_content)
+        self.assertGreater(len(blocos), 3)
+        self.assertEqual(len(list(csv.reader(io.StringIO(b''.join(blocos).decode())))), 7)
+
+    def test_le_com_cursor_no_servidor(self):
+        with mock.patch('django.db.models.query.QuerySet.iterator', autospec=True,
+                        side_effect=lambda queryset, chunk_size=None: iter(list(queryset))) as iterator:
+            linhas = list(exportacao.linhas_exportacao(AvaliacaoDesempenho.objects.all()))
+        self.assertEqual(len(linhas), 6)
+        iterator.assert_called_once()
+        self.assertEqual(iterator.call_args.kwargs['chunk_size'], exportacao.TAMANHO_LOTE)
+
+    def test_comando_grava_arquivo(self):
+        with tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False) as arquivo:
+            pass
+        self.addCleanup(os.remove, arquivo.name)
+        call_command(
+            'exportar_avaliacoes', '--formato', 'jsonl', '--mes-competencia', '2026-01-01',
+            '--saida', arquivo.name, stderr=io.StringIO(),
+        )
+        with open(arquivo.name, encoding='utf-8') as gravado:
+            linhas = [json.loads(linha) for linha in gravado]
+        self.assertEqual(len(linhas), 3)
+        self.assertEqual({linha['avaliacao_id'] for linha in linhas}, {self.avaliacao.pk})
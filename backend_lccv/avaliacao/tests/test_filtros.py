@@ -0,0 +1,159 @@
+"""
+SQL gerado pelos filtros da listagem de avaliacoes.
+
+Todo filtro tem que virar um predicado direto sobre a coluna indexada
+("coluna" <op> valor), sem funcao em volta da coluna, sem JOIN e sem
+consulta extra para validar ids.
+"""
+import re
+from datetime import date
+
+from django.db import connection
+from rest_framework.test import APIClient
+
+from ..filters import AvaliacaoDesempenhoFilter
+from ..models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+TABELA = '"avaliacao_avaliacaodesempenho"'
+# funcoes que impediriam o uso do indice se aplicadas na coluna
+FUNCOES = re.compile(r'\b(UPPER|LOWER|EXTRACT|DATE_TRUNC|COALESCE|CAST|CASE)\b|::', re.IGNORECASE)
+
+
+def sql_filtrado(**parametros):
+    # sem a ordenacao padrao do modelo, que faz o JOIN com o colaborador
+    filtro = AvaliacaoDesempenhoFilter(data=parametros, queryset=AvaliacaoDesempenho.objects.order_by())
+    assert filtro.is_valid(), filtro.errors
+    return str(filtro.qs.query)
+
+
+def clausula_where(sql):
+    return sql.split(' WHERE ', 1)[1].split(' ORDER BY ')[0] if ' WHERE ' in sql else ''
+
+
+class SqlDosFiltrosTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        # 3 tipos: nota = soma_notas * 20 / 3
+        self.tipos = criar_tipos()
+
+    def assertSargavel(self, sql, *predicados):
+        self.assertNotIn('JOIN', sql)
+        where = clausula_where(sql)
+        for predicado in predicados:
+            self.assertIn(f'{TABELA}.{predicado}', where)
+        self.assertIsNone(FUNCOES.search(where), where)
+
+    def test_faixa_de_mes(self):
+        sql = sql_filtrado(mes_inicio='2026-01-01', mes_fim='2026-03-01')
+        self.assertSargavel(sql, '"mes_competencia" >= 2026-01-01', '"mes_competencia" <= 2026-03-01')
+        self.assertSargavel(sql_filtrado(mes_competencia='2026-02-01'), '"mes_competencia" = 2026-02-01')
+
+    def test_faixa_de_nota_vira_faixa_de_soma_notas(self):
+        with self.assertNumQueries(0):
+            # total de tipos vem do catalogo em cache
+            sql_filtrado()
+        sql = sql_filtrado(nota_min='50', nota_max='80')
+        # ceil(50 * 3 / 20) = 8 e floor(80 * 3 / 20) = 12
+        self.assertSargavel(sql, '"soma_notas" >= 8', '"soma_notas" <= 12')
+        self.assertNotIn('nota_calculada', sql)
+
+    def test_ids(self):
+        with self.assertNumQueries(0):
+            sql = sql_filtrado(colaborador='5', supervisor='7')
+        self.assertSargavel(sql, '"colaborador_id" = 5', '"supervisor_id" = 7')
+        filtro = AvaliacaoDesempenhoFilter(data={'colaborador': 'abc'}, queryset=AvaliacaoDesempenho.objects.all())
+        self.assertFalse(filtro.is_valid())
+
+    def test_status_em_um_unico_in(self):
+        sql = sql_filtrado(status_avaliacao=[StatusAvaliacao.CRIADA, StatusAvaliacao.CONCLUIDA])
+        self.assertSargavel(sql, '"status_avaliacao" IN (Criada, Concluida)')
+        self.assertNotIn(' OR ', sql)
+
+    def test_itens_pendentes_vira_exists(self):
+        sql = sql_filtrado(itens_pendentes='true')
+        # correlacionado pela FK e com o predicado do indice parcial (nota IS NULL)
+        self.assertRegex(
+            clausula_where(sql),
+            r'^EXISTS\(SELECT .*U0\."avaliacao_desempenho_id" = \("avaliacao_avaliacaodesempenho"\."id"\) '
+            r'AND U0\."nota" IS NULL\)',
+        )
+        self.assertRegex(clausula_where(sql_filtrado(itens_pendentes='false')), r'^NOT EXISTS\(SELECT ')
+
+    def test_planos_usam_os_indices(self):
+        # com a tabela vazia a escolha do indice muda conforme o autovacuum ja
+        # passou ou nao; com dados e ANALYZE ela so depende da consulta
+        supervisores = criar_colaboradores(10, prefixo='Supervisor')
+        avaliacoes = AvaliacaoDesempenho.objects.bulk_create([
+            AvaliacaoDesempenho(
+                colaborador=colaborador, supervisor=supervisores[numero % 10],
+                mes_competencia=date(2025, mes, 1), soma_notas=numero % 16,
+            )
+            for numero, colaborador in enumerate(criar_colaboradores(30))
+            for mes in range(1, 13)
+        ])
+        ItemAvaliacaoDesempenho.objects.bulk_create([
+            ItemAvaliacaoDesempenho(
+                avaliacao_desempenho=avaliacao, tipo_item_avaliacao_desempenho=tipo,
+                nota=None if numero % 40 == 0 else 3,
+            )
+            for numero, avaliacao in enumerate(avaliacoes)
+            for tipo in self.tipos
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'ANALYZE {AvaliacaoDesempenho._meta.db_table}, {ItemAvaliacaoDesempenho._meta.db_table}'
+            )
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE tablename = 'avaliacao_avaliacaodesempenho' "
+                "AND indexdef LIKE '%%(soma_notas)'"
+            )
+            indice_soma, = cursor.fetchone()
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        casos = [
+            ({'nota_min': '50', 'nota_max': '80'}, indice_soma),
+            ({'supervisor': str(supervisores[6].pk), 'mes_inicio': '2025-12-01'}, 'avaliacao_supervisor_mes_idx'),
+            ({'mes_inicio': '2025-01-01', 'mes_fim': '2025-03-01'}, 'avaliacao_mes_colaborador_idx'),
+            ({'itens_pendentes': 'true'}, 'item_sem_nota_idx'),
+        ]
+        for parametros, indice in casos:
+            filtro = AvaliacaoDesempenhoFilter(data=parametros, queryset=AvaliacaoDesempenho.objects.order_by())
+            plano = filtro.qs.explain()
+            self.assertIn(indice, plano, parametros)
+
+
+class FiltrosApiTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, self.outro, *colaboradores = criar_colaboradores(5)
+        self.janeiro = criar_avaliacao(colaboradores[0], self.supervisor, notas=[5, 5, 5],
+                                       status=StatusAvaliacao.CONCLUIDA)
+        self.fevereiro = criar_avaliacao(colaboradores[1], self.supervisor, mes=date(2026, 2, 1), notas=[3, 3])
+        self.marco = criar_avaliacao(colaboradores[2], self.outro, mes=date(2026, 3, 1), notas=[1, 2],
+                                     status=StatusAvaliacao.EM_ELABORACAO)
+        self.client = APIClient()
+
+    def ids(self, **parametros):
+        response = self.client.get('/api/avaliacoes/', parametros)
+        self.assertEqual(response.status_code, 200, response.content)
+        return {linha['id'] for linha in response.json()['results']}
+
+    def test_filtros(self):
+        self.assertEqual(self.ids(supervisor=self.supervisor.pk), {self.janeiro.pk, self.fevereiro.pk})
+        self.assertEqual(self.ids(mes_inicio='2026-02-01'), {self.fevereiro.pk, self.marco.pk})
+        self.assertEqual(self.ids(mes_fim='2026-02-01'), {self.janeiro.pk, self.fevereiro.pk})
+        # notas: 100, 40 e 20
+        self.assertEqual(self.ids(nota_min=40), {self.janeiro.pk, self.fevereiro.pk})
+        self.assertEqual(self.ids(nota_max=40), {self.fevereiro.pk, self.marco.pk})
+        self.assertEqual(self.ids(nota_min=21, nota_max=99), {self.fevereiro.pk})
+        self.assertEqual(
+            self.ids(status_avaliacao=[StatusAvaliacao.CONCLUIDA, StatusAvaliacao.EM_ELABORACAO]),
+            {self.janeiro.pk, self.marco.pk},
+        )
+        self.assertEqual(self.ids(itens_pendentes='false'), {self.janeiro.pk})
+        self.assertEqual(self.ids(itens_pendentes='true', supervisor=self.supervisor.pk), {self.fevereiro.pk})
+
+    def test_valores_invalidos(self):
+        for parametros in ({'colaborador': 'abc'}, {'mes_inicio': 'janeiro'}, {'status_avaliacao': 'Arquivada'}):
+            self.assertEqual(self.client.get('/api/avaliacoes/', parametros).status_code, 400, parametros)
@@ -0,0 +1,122 @@
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..catalogo import tipos_item_por_id
+from ..historico import historico
+from ..models import StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+JANEIRO, FEVEREIRO, ABRIL = date(2026, 1, 1), date(2026, 2, 1), date(2026, 4, 1)
+
+
+class HistoricoTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        # 6 tipos (2 por dimensao): nota = soma_notas * 100 / 30
+        criar_tipos(por_dimensao=2)
+        self.supervisor, self.colaborador, outro = criar_colaboradores(3)
+        self.janeiro = criar_avaliacao(self.colaborador, self.supervisor, mes=JANEIRO, notas=[5] * 6,
+                                       status=StatusAvaliacao.CONCLUIDA)
+        self.fevereiro = criar_avaliacao(self.colaborador, self.supervisor, mes=FEVEREIRO, notas=[4, 2, 3, 3, 1],
+                                         status=StatusAvaliacao.EM_AVALIACAO)
+        # marco sem avaliacao
+        self.abril = criar_avaliacao(self.colaborador, self.supervisor, mes=ABRIL)
+        criar_avaliacao(outro, self.supervisor, mes=FEVEREIRO, notas=[1] * 6)
+        tipos_item_por_id()
+        self.client = APIClient()
+
+    def get(self, **parametros):
+        response = self.client.get(f'/api/colaboradores/{self.colaborador.pk}/historico/', parametros)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_nota_e_medias_por_dimensao(self):
+        dados = self.get()
+        self.assertEqual(dados['colaborador']['id'], self.colaborador.pk)
+        self.assertIsNone(dados['janela'])
+        meses = dados['meses']
+        self.assertEqual([mes['mes_competencia'] for mes in meses], ['2026-01-01', '2026-02-01', '2026-04-01'])
+        self.assertEqual([mes['avaliacao'] for mes in meses], [self.janeiro.pk, self.fevereiro.pk, self.abril.pk])
+        self.assertEqual([mes['nota'] for mes in meses], [100.0, 43.33, 0.0])
+        self.assertEqual(meses[1]['status_avaliacao'], StatusAvaliacao.EM_AVALIACAO)
+        self.assertEqual(meses[1]['dimensoes'], [
+            {'dimensao': 'Comportamento', 'itens_avaliados': 2, 'nota_media': 3.0, 'media_movel': None, 'variacao': None},
+            {'dimensao': 'Entregas', 'itens_avaliados': 2, 'nota_media': 3.0, 'media_movel': None, 'variacao': None},
+            {'dimensao': 'Trabalho em equipe', 'itens_avaliados': 1, 'nota_media': 1.0, 'media_movel': None,
+             'variacao': None},
+        ])
+        # sem nenhum item avaliado a media fica nula
+        self.assertEqual({dimensao['nota_media'] for dimensao in meses[2]['dimensoes']}, {None})
+        self.assertEqual({mes['nota_media_movel'] for mes in meses}, {None})
+
+    def test_media_movel_e_variacao(self):
+        dados = self.get(janela=2, variacao='true')
+        self.assertEqual(dados['janela'], 2)
+        meses = dados['meses']
+        self.assertEqual([mes['nota_media_movel'] for mes in meses], [100.0, 71.67, 21.67])
+        self.assertEqual([mes['nota_variacao'] for mes in meses], [None, -56.67, -43.33])
+        comportamento = [mes['dimensoes'][0] for mes in meses]
+        # o AVG da janela ignora o mes sem itens avaliados
+        self.assertEqual([dimensao['media_movel'] for dimensao in comportamento], [5.0, 4.0, 3.0])
+        self.assertEqual([dimensao['variacao'] for dimensao in comportamento], [None, -2.0, None])
+
+    def test_periodo(self):
+        meses = self.get(inicio='2026-02-01', janela=2, variacao='true')['meses']
+        self.assertEqual([mes['mes_competencia'] for mes in meses], ['2026-02-01', '2026-04-01'])
+        # o primeiro mes do periodo ainda olha para janeiro
+        self.assertEqual((meses[0]['nota_media_movel'], meses[0]['nota_variacao']), (71.67, -56.67))
+        # com um mes sem avaliacao no meio a janela continua contando avaliacoes
+        abril = self.get(inicio='2026-03-01', janela=3, variacao='true')['meses']
+        self.assertEqual([mes['mes_competencia'] for mes in abril], ['2026-04-01'])
+        self.assertEqual((abril[0]['nota_media_movel'], abril[0]['nota_variacao']), (47.78, -43.33))
+        meses = self.get(fim='2026-03-01')['meses']
+        self.assertEqual([mes['avaliacao'] for mes in meses], [self.janeiro.pk, self.fevereiro.pk])
+        self.assertEqual(self.get(inicio='2027-01-01')['meses'], [])
+
+    def test_erros(self):
+        url = f'/api/colaboradores/{self.colaborador.pk}/historico/'
+        for parametros in ({'janela': 1}, {'janela': 37}, {'inicio': '2026-03-01', 'fim': '2026-02-01'},
+                           {'variacao': 'talvez'}):
+            self.assertEqual(self.client.get(url, parametros).status_code, 400, parametros)
+        self.assertEqual(self.client.get('/api/colaboradores/999999/historico/').status_code, 404)
+
+    def test_uma_consulta_com_funcoes_de_janela(self):
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(len(historico(self.colaborador.pk, janela=3, variacao=True)), 3)
+        self.assertEqual(len(contexto.captured_queries), 1)
+        sql = contexto.captured_queries[0]['sql']
+        self.assertIn('LAG(', sql)
+        self.assertIn('ROWS BETWEEN 2 PRECEDING AND CURRENT ROW', sql)
+        # dimensoes vem do catalogo em cache
+        self.assertNotIn('tipoitemavaliacaodesempenho', sql)
+
+        for mes in (date(2025, numero, 1) for numero in range(1, 13)):
+            criar_avaliacao(self.colaborador, self.supervisor, mes=mes, notas=[3] * 6)
+        tipos_item_por_id()
+        with self.assertNumQueries(2):
+            # get_object e o historico
+            self.assertEqual(len(self.get(janela=3, variacao='true')['meses']), 15)
+
+    def test_inicio_filtrado_no_banco(self):
+        for mes in (date(2025, numero, 1) for numero in range(1, 13)):
+            criar_avaliacao(self.colaborador, self.supervisor, mes=mes, notas=[3] * 6)
+        tipos_item_por_id()
+        with CaptureQueriesContext(connection) as contexto:
+            meses = historico(self.colaborador.pk, inicio=FEVEREIRO, janela=3)
+        self.assertEqual([mes['avaliacao'] for mes in meses], [self.fevereiro.pk, self.abril.pk])
+        # nota 60 em dez/2025, 100 em janeiro e 43.33 em fevereiro
+        self.assertEqual(meses[0]['nota_media_movel'], 67.78)
+        self.assertEqual(len(contexto.captured_queries), 1)
+        sql = contexto.captured_queries[0]['sql']
+        self.assertIn('"mes_competencia" >= \'2026-02-01\'::date', sql)
+        self.assertIn('LIMIT 2', sql)
+        # sem janela nem variacao nenhuma avaliacao anterior eh lida
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(len(historico(self.colaborador.pk, inicio=FEVEREIRO)), 2)
+        self.assertNotIn('LIMIT', contexto.captured_queries[0]['sql'])
+
+    def test_sem_avaliacoes(self):
+        self.assertEqual(historico(self.supervisor.pk), [])
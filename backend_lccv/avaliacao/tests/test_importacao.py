@@ -0,0 +1,155 @@
+import csv
+import io
+import os
+import tempfile
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from ..importacao import importar_csv
+from ..models import AvaliacaoDesempenho, Colaborador, ItemAvaliacaoDesempenho, ResumoMensal, StatusAvaliacao
+from .dados import MES, AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+COLUNAS = [
+    'colaborador_nome', 'colaborador_cargo', 'supervisor_nome', 'supervisor_cargo', 'mes_competencia',
+    'status_avaliacao', 'sugestoes_supervisor', 'observacoes_avaliado', 'tipo_item', 'nota_item',
+    'observacoes_item',
+]
+
+
+def gerar_csv(linhas):
+    arquivo = io.StringIO()
+    escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS)
+    escritor.writeheader()
+    escritor.writerows(linhas)
+    return arquivo.getvalue()
+
+
+def importar(linhas, **kwargs):
+    return importar_csv(io.StringIO(gerar_csv(linhas)), **kwargs)
+
+
+class ImportacaoTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos()
+        self.nomes_tipos = [tipo.tipo_item_avaliacao_desempenho for tipo in self.tipos]
+
+    def linha(self, colaborador='Ana', tipo=0, nota='', **campos):
+        return {
+            'colaborador_nome': colaborador,
+            'colaborador_cargo': 'Analista',
+            'supervisor_nome': 'Bruno',
+            'supervisor_cargo': 'Gerente',
+            'mes_competencia': MES.isoformat(),
+            'tipo_item': self.nomes_tipos[tipo] if tipo is not None else '',
+            'nota_item': nota,
+            **campos,
+        }
+
+    def test_importa_colaboradores_avaliacoes_e_itens(self):
+        resultado = importar([
+            self.linha(tipo=0, nota='5', sugestoes_supervisor='Muito bom'),
+            self.linha(tipo=1, nota='3', observacoes_item='Pode melhorar'),
+            self.linha(colaborador='Carla', tipo=None),
+            {'colaborador_nome': 'Davi', 'colaborador_cargo': 'Estagiario'},
+        ])
+        self.assertEqual(resultado['total_erros'], 0, resultado['erros'])
+        self.assertEqual(resultado['linhas'], 4)
+        self.assertEqual(resultado['colaboradores_criados'], 4)
+        self.assertEqual(resultado['avaliacoes_criadas'], 2)
+        self.assertEqual(resultado['itens_importados'], 2)
+        ana = AvaliacaoDesempenho.objects.get(colaborador__nome='Ana')
+        self.assertEqual(ana.supervisor.nome, 'Bruno')
+        self.assertEqual((ana.soma_notas, ana.itens_avaliados), (8, 2))
+        self.assertEqual(ana.sugestoes_supervisor, 'Muito bom')
+        # avaliacao nova recebe um item por tipo do catalogo
+        self.assertEqual(ana.itens.count(), 3)
+        self.assertEqual(AvaliacaoDesempenho.objects.get(colaborador__nome='Carla').itens.count(), 3)
+        self.assertEqual(Colaborador.objects.get(nome='Davi').cargo, 'Estagiario')
+        self.assertEqual(ResumoMensal.objects.get(supervisor__nome='Bruno').total_avaliacoes, 2)
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+
+    def test_celulas_vazias_nao_apagam_o_que_esta_gravado(self):
+        supervisor, colaborador = criar_colaboradores(2)
+        avaliacao = criar_avaliacao(
+            colaborador, supervisor, notas=[4, 2],
+            sugestoes_supervisor='Sugestao antiga', observacoes_avaliado='Observacao antiga',
+        )
+        item = avaliacao.itens.get(tipo_item_avaliacao_desempenho=self.tipos[0])
+        item.observacoes = 'Observacao do item'
+        item.save()
+
+        resultado = importar([
+            self.linha(colaborador.nome, supervisor_nome=supervisor.nome, tipo=0,
+                       status_avaliacao=StatusAvaliacao.EM_ELABORACAO),
+            self.linha(colaborador.nome, supervisor_nome=supervisor.nome, tipo=1, nota='5',
+                       observacoes_item='Nova'),
+        ])
+        self.assertEqual(resultado['total_erros'], 0, resultado['erros'])
+        avaliacao.refresh_from_db()
+        self.assertEqual(avaliacao.status_avaliacao, StatusAvaliacao.EM_ELABORACAO)
+        self.assertEqual(avaliacao.sugestoes_supervisor, 'Sugestao antiga')
+        self.assertEqual(avaliacao.observacoes_avaliado, 'Observacao antiga')
+        item.refresh_from_db()
+        self.assertEqual((item.nota, item.observacoes), (4, 'Observacao do item'))
+        segundo = avaliacao.itens.get(tipo_item_avaliacao_desempenho=self.tipos[1])
+        self.assertEqual((segundo.nota, segundo.observacoes), (5, 'Nova'))
+        self.assertEqual((avaliacao.soma_notas, avaliacao.itens_avaliados), (9, 2))
+
+        # celula preenchida continua sobrescrevendo
+        importar([self.linha(colaborador.nome, supervisor_nome=supervisor.nome, tipo=None,
+                             sugestoes_supervisor='Sugestao nova')])
+        avaliacao.refresh_from_db()
+        self.assertEqual(avaliacao.sugestoes_supervisor, 'Sugestao nova')
+        self.assertEqual(avaliacao.observacoes_avaliado, 'Observacao antiga')
+
+    def test_erro_do_banco_fica_na_linha_certa(self):
+        # cargo maior que a coluna: so o banco recusa
+        resultado = importar([
+            self.linha('Ana', tipo=0, nota='5'),
+            self.linha('Carla', tipo=0, nota='4', colaborador_cargo='x' * 300),
+            self.linha('Eva', tipo=0, nota='3'),
+        ])
+        self.assertEqual(resultado['total_erros'], 1)
+        self.assertEqual(resultado['erros'][0]['linha'], 3)
+        self.assertIn('Erro ao gravar a linha', resultado['erros'][0]['erros'][0])
+        self.assertEqual(resultado['avaliacoes_criadas'], 2)
+        self.assertEqual(
+            sorted(AvaliacaoDesempenho.objects.values_list('colaborador__nome', flat=True)), ['Ana', 'Eva'],
+        )
+        self.assertFalse(Colaborador.objects.filter(nome='Carla').exists())
+        self.assertEqual(ResumoMensal.objects.get(supervisor__nome='Bruno').total_avaliacoes, 2)
+
+    def test_erros_de_validacao_por_linha(self):
+        resultado = importar([
+            self.linha(tipo=0, nota='9'),
+            self.linha(colaborador='', tipo=None),
+            self.linha(colaborador='Carla', tipo=None, mes_competencia='2026-13-01'),
+            self.linha(colaborador='Davi', tipo=None, status_avaliacao='Arquivada'),
+            self.linha(colaborador='Eva', tipo=None),
+        ], tamanho_lote=2)
+        self.assertEqual([erro['linha'] for erro in resultado['erros']], [2, 3, 4, 5])
+        self.assertEqual(resultado['total_erros'], 4)
+        self.assertEqual(resultado['avaliacoes_criadas'], 1)
+
+    def test_endpoint(self):
+        client = APIClient()
+        arquivo = SimpleUploadedFile('avaliacoes.csv', gerar_csv([self.linha(tipo=0, nota='5')]).encode())
+        response = client.post('/api/avaliacoes/import/', {'arquivo': arquivo}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['itens_importados'], 1)
+        invalido = SimpleUploadedFile('avaliacoes.csv', b'nome,cargo\nAna,Analista\n')
+        response = client.post('/api/avaliacoes/import/', {'arquivo': invalido}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_comando(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write(gerar_csv([self.linha(tipo=0, nota='2'), self.linha('Carla', tipo=1, nota='3')]))
+        self.addCleanup(os.remove, arquivo.name)
+        saida = StringIO()
+        call_command('importar_avaliacoes', arquivo.name, '--lote', '1', stdout=saida, stderr=StringIO())
+        self.assertIn('2 avaliacoes criadas', saida.getvalue())
+        self.assertEqual(ItemAvaliacaoDesempenho.objects.filter(nota__isnull=False).count(), 2)
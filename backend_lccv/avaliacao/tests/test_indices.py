@@ -0,0 +1,77 @@
+"""
+Uso dos indices da migracao 0003 pelas consultas mais comuns.
+
+Com poucas linhas o postgres prefere ler a tabela inteira, entao o teste
+grava alguns milhares de avaliacoes, roda ANALYZE e desliga o seq scan
+(SET LOCAL, so dentro da transacao do teste). O EXPLAIN tem que citar o
+indice esperado; se uma mudanca na consulta ou no indice deixar a consulta
+sem indice, o plano cai para outro caminho e o teste falha.
+"""
+from datetime import date
+
+from django.db import connection
+
+from ..models import AvaliacaoDesempenho, Colaborador, StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_colaboradores
+
+MESES = [date(2025, mes, 1) for mes in range(1, 13)]
+
+
+class IndicesTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.supervisores = criar_colaboradores(20, prefixo='Supervisor')
+        colaboradores = Colaborador.objects.bulk_create([
+            Colaborador(nome=f'Colaborador {numero:04d}', cargo='Analista') for numero in range(400)
+        ])
+        status = list(StatusAvaliacao)
+        AvaliacaoDesempenho.objects.bulk_create([
+            AvaliacaoDesempenho(
+                colaborador=colaborador,
+                supervisor=self.supervisores[posicao % len(self.supervisores)],
+                mes_competencia=mes,
+                status_avaliacao=status[(posicao + numero_mes) % len(status)],
+            )
+            for numero_mes, mes in enumerate(MESES)
+            for posicao, colaborador in enumerate(colaboradores)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE avaliacao_avaliacaodesempenho')
+            cursor.execute('ANALYZE avaliacao_colaborador')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsaIndice(self, queryset, indice):
+        plano = queryset.explain()
+        self.assertIn(indice, plano, plano)
+
+    def test_listagem_do_mes(self):
+        self.assertUsaIndice(
+            AvaliacaoDesempenho.objects.filter(mes_competencia=MESES[5]),
+            'avaliacao_mes_colaborador_idx',
+        )
+
+    def test_status_por_mes(self):
+        self.assertUsaIndice(
+            AvaliacaoDesempenho.objects.filter(
+                status_avaliacao=StatusAvaliacao.EM_AVALIACAO, mes_competencia__gte=MESES[9],
+            ),
+            'avaliacao_status_mes_idx',
+        )
+
+    def test_avaliacoes_do_supervisor(self):
+        self.assertUsaIndice(
+            AvaliacaoDesempenho.objects.filter(supervisor=self.supervisores[3]).order_by('-mes_competencia'),
+            'avaliacao_supervisor_mes_idx',
+        )
+
+    def test_busca_por_nome_do_colaborador(self):
+        # pg_trgm eh instalada pela migracao 0003 no banco de teste
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest('extensao pg_trgm indisponivel no banco de teste')
+        # search_fields do admin: UPPER(nome::text) LIKE UPPER('%...%')
+        self.assertUsaIndice(
+            Colaborador.objects.filter(nome__icontains='dor 01'),
+            'colaborador_nome_trgm_idx',
+        )
@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import AvaliacaoDesempenho, StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class ItensLoteTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos(por_dimensao=2)
+        self.supervisor, self.colaborador, self.outro = criar_colaboradores(3)
+        self.avaliacao = criar_avaliacao(
+            self.colaborador, self.supervisor, notas=[1], status=StatusAvaliacao.EM_ELABORACAO,
+        )
+        self.itens = list(self.avaliacao.itens.order_by('pk'))
+        self.url = f'/api/avaliacoes/{self.avaliacao.pk}/itens/'
+        self.client = APIClient()
+
+    def patch(self, linhas, url=None):
+        return self.client.patch(url or self.url, linhas, format='json')
+
+    def test_edita_varios_itens_e_devolve_a_avaliacao(self):
+        response = self.patch([
+            {'id': self.itens[0].pk, 'nota': 5},
+            {'id': self.itens[1].pk, 'nota': 4, 'observacoes': 'Bom'},
+            {'id': self.itens[2].pk, 'observacoes': 'So texto'},
+        ])
+        self.assertEqual(response.status_code, 200, response.content)
+        dados = response.json()
+        self.assertEqual(dados['id'], self.avaliacao.pk)
+        self.assertEqual(dados['nota'], 30.0)
+        itens = {item['id']: item for item in dados['itens']}
+        self.assertEqual(itens[self.itens[1].pk]['observacoes'], 'Bom')
+        self.assertEqual(itens[self.itens[2].pk]['observacoes'], 'So texto')
+        self.assertIsNone(itens[self.itens[2].pk]['nota'])
+        self.avaliacao.refresh_from_db()
+        self.assertEqual((self.avaliacao.soma_notas, self.avaliacao.itens_avaliados), (9, 2))
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+
+    def test_consultas_nao_crescem_com_os_itens(self):
+        # a primeira requisicao carrega o catalogo no cache
+        self.patch([{'id': self.itens[0].pk, 'nota': 1}])
+        with CaptureQueriesContext(connection) as dois:
+            self.patch([{'id': item.pk, 'nota': 3} for item in self.itens[:2]])
+        with CaptureQueriesContext(connection) as seis:
+            self.patch([{'id': item.pk, 'nota': 2} for item in self.itens])
+        self.assertEqual(len(dois.captured_queries), len(seis.captured_queries))
+
+    def test_status_nao_editavel(self):
+        AvaliacaoDesempenho.objects.filter(pk=self.avaliacao.pk).update(status_avaliacao=StatusAvaliacao.CONCLUIDA)
+        response = self.patch([{'id': self.itens[0].pk, 'nota': 5}])
+        self.assertEqual(response.status_code, 400)
+        self.itens[0].refresh_from_db()
+        self.assertEqual(self.itens[0].nota, 1)
+
+    def test_nota_invalida_nao_grava_nada(self):
+        response = self.patch([
+            {'id': self.itens[0].pk, 'nota': 4},
+            {'id': self.itens[1].pk, 'nota': 9},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.itens[0].refresh_from_db()
+        self.assertEqual(self.itens[0].nota, 1)
+
+    def test_item_de_outra_avaliacao(self):
+        outra = criar_avaliacao(self.outro, self.supervisor, status=StatusAvaliacao.EM_ELABORACAO)
+        item_de_outra = outra.itens.first()
+        response = self.patch([{'id': self.itens[0].pk, 'nota': 4}, {'id': item_de_outra.pk, 'nota': 4}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(item_de_outra.pk), response.json()['detail'])
+        item_de_outra.refresh_from_db()
+        self.assertIsNone(item_de_outra.nota)
+
+    def test_avaliacao_inexistente(self):
+        response = self.patch([{'id': self.itens[0].pk, 'nota': 4}], url='/api/avaliacoes/999999/itens/')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,177 @@
+import json
+import logging
+import time
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from .. import metricas, serializacao
+from ..catalogo import tipos_item_por_id
+from ..resumos import reconstruir_resumos
+from ..serializers import AvaliacaoDesempenhoListSerializer
+from ..testing import OrcamentoConsultasMixin, orcamento_consultas
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class OrcamentoEndpointsTests(OrcamentoConsultasMixin, AvaliacaoTestCase):
+    """As consultas nao podem crescer com a quantidade de linhas da resposta"""
+
+    orcamentos = {
+        'GET avaliacao-list': 2,
+        # marcador do ETag, avaliacao e itens
+        'GET avaliacao-detail': 3,
+        'GET avaliacao-itens-list': 2,
+        'GET avaliacao-itens-detail': 2,
+        'GET colaborador-list': 2,
+        'GET colaborador-detail': 2,
+        'GET colaborador-painel': 4,
+        'GET relatorio-por-mes': 1,
+        'GET relatorio-por-supervisor': 1,
+        'GET relatorio-por-dimensao': 1,
+        'GET relatorio-por-tipo-item': 1,
+        'GET relatorio-status-por-mes': 1,
+    }
+
+    def setUp(self):
+        self.client = APIClient()
+        super().setUp()
+        criar_tipos(por_dimensao=3)
+        self.supervisor, self.outro_supervisor = criar_colaboradores(2, prefixo='Supervisor')
+        self.avaliacoes = [
+            criar_avaliacao(colaborador, self.supervisor if numero % 2 else self.outro_supervisor,
+                            notas=[numero % 5 + 1] * 6)
+            for numero, colaborador in enumerate(criar_colaboradores(30))
+        ]
+        reconstruir_resumos()
+        # orcamentos com o catalogo ja no cache; frio ele custa uma consulta a mais
+        tipos_item_por_id()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def nas_duas_serializacoes(self, teste):
+        for rapida in (True, False):
+            with self.subTest(serializacao_rapida=rapida), override_settings(SERIALIZACAO_RAPIDA=rapida):
+                teste()
+
+    def test_avaliacoes(self):
+        avaliacao = self.avaliacoes[0]
+
+        def teste():
+            self.assertEqual(len(self.get('/api/avaliacoes/?page_size=100').json()['results']), 30)
+            self.get('/api/avaliacoes/?page_size=100&fields=id,colaborador_nome,nota&ordering=-nota')
+            self.get('/api/avaliacoes/?page_size=100&q=colaborador')
+            self.assertEqual(len(self.get(f'/api/avaliacoes/{avaliacao.pk}/').json()['itens']), 9)
+        self.nas_duas_serializacoes(teste)
+
+    def test_itens(self):
+        avaliacao = self.avaliacoes[0]
+        self.assertEqual(len(self.get(f'/api/avaliacoes/{avaliacao.pk}/itens/?page_size=100').json()['results']), 9)
+        self.get(f'/api/avaliacoes/{avaliacao.pk}/itens/{avaliacao.itens.first().pk}/')
+
+    def test_colaboradores(self):
+        self.assertEqual(len(self.get('/api/colaboradores/?page_size=100').json()['results']), 32)
+        self.get('/api/colaboradores/?q=supervisor')
+        self.get(f'/api/colaboradores/{self.supervisor.pk}/')
+
+    def test_relatorios(self):
+        for nome in ('por-mes', 'por-supervisor', 'por-dimensao', 'por-tipo-item', 'status-por-mes'):
+            self.get(f'/api/relatorios/{nome}/')
+
+    def test_painel(self):
+        for supervisor in (self.supervisor, self.outro_supervisor):
+            self.assertEqual(self.get(f'/api/colaboradores/{supervisor.pk}/painel/').json()['supervisor']['id'],
+                             supervisor.pk)
+        # do cache
+        self.get(f'/api/colaboradores/{self.supervisor.pk}/painel/')
+
+    def test_estouro_do_orcamento_falha(self):
+        self.orcamentos = {**self.orcamentos, 'GET avaliacao-list': 1}
+        with self.assertRaisesRegex(AssertionError, r'avaliacao-list \(/api/avaliacoes/\) executou 2 consultas'):
+            self.client.get('/api/avaliacoes/')
+
+
+class MetricasMiddlewareTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        supervisor, colaborador = criar_colaboradores(2)
+        self.avaliacao = criar_avaliacao(colaborador, supervisor, notas=[5])
+        metricas.limpar_histogramas()
+        self.addCleanup(metricas.limpar_histogramas)
+        self.client = APIClient()
+
+    def test_server_timing_e_log(self):
+        with self.assertLogs('avaliacao.metricas', 'INFO') as logs:
+            response = self.client.get('/api/avaliacoes/')
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ consultas", serializacao;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        linha = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(linha['rota'], 'GET avaliacao-list')
+        self.assertEqual(linha['status'], 200)
+        self.assertEqual(linha['bytes'], len(response.content))
+        self.assertEqual(linha['consultas'], response.metricas['consultas'])
+        self.assertGreater(linha['consultas'], 0)
+        self.assertIsNone(self.client.get('/api/avaliacoes/export/').metricas['bytes'])
+
+    def test_log_desligado_no_nivel_padrao(self):
+        self.addCleanup(metricas.logger.setLevel, metricas.logger.level)
+        metricas.logger.setLevel(logging.WARNING)
+        with mock.patch.object(metricas.logger, 'info') as info:
+            response = self.client.get('/api/avaliacoes/')
+        info.assert_not_called()
+        # o cabecalho e os histogramas continuam
+        self.assertIn('Server-Timing', response)
+        self.assertEqual(metricas.histogramas()['GET avaliacao-list']['requisicoes'], 1)
+
+    def test_serializacao_inclui_a_montagem_dos_dados(self):
+        def devagar(funcao):
+            def lenta(*args, **kwargs):
+                time.sleep(0.05)
+                return funcao(*args, **kwargs)
+            return lenta
+
+        casos = (
+            (True, 'serializar_avaliacoes', serializacao),
+            (False, 'to_representation', AvaliacaoDesempenhoListSerializer),
+        )
+        for rapida, nome, alvo in casos:
+            with self.subTest(serializacao_rapida=rapida), override_settings(SERIALIZACAO_RAPIDA=rapida), \
+                    mock.patch.object(alvo, nome, devagar(getattr(alvo, nome))):
+                response = self.client.get('/api/avaliacoes/')
+                self.assertEqual(response.status_code, 200)
+                self.assertGreaterEqual(response.metricas['serializacao_ms'], 50)
+                self.assertLess(response.metricas['banco_ms'], 50)
+
+    def test_histogramas_por_rota(self):
+        for _ in range(3):
+            self.client.get(f'/api/avaliacoes/{self.avaliacao.pk}/')
+        self.client.get('/api/avaliacoes/999999/')
+        dados = self.client.get('/api/_metrics/').json()
+        detalhe = dados['GET avaliacao-detail']
+        self.assertEqual(detalhe['requisicoes'], 4)
+        self.assertEqual(detalhe['erros'], 0)
+        self.assertEqual(sum(detalhe['latencia_ms']['faixas'].values()), 4)
+        self.assertEqual(sum(detalhe['consultas']['faixas'].values()), 4)
+        self.assertGreater(detalhe['bytes'], 0)
+        self.assertNotIn('GET metricas-list', dados)
+
+    @override_settings(METRICAS_HABILITADAS=False)
+    def test_desligado(self):
+        response = self.client.get('/api/avaliacoes/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(metricas.histogramas(), {})
+
+    def test_orcamento_consultas(self):
+        with orcamento_consultas(1):
+            list(self.avaliacao.itens.all())
+        with self.assertRaisesRegex(AssertionError, '4 consultas executadas, orcamento de 2'):
+            with orcamento_consultas(2):
+                # N+1: uma consulta por tipo de item
+                for item in self.avaliacao.itens.all():
+                    item.tipo_item_avaliacao_desempenho.dimensao
@@ -0,0 +1,66 @@
+"""
+Migracoes com dados: volta o banco de teste para antes da migracao, grava os
+dados no estado antigo e migra de novo. Por mexer no schema sao
+TransactionTestCase, e o banco volta para a ultima migracao no fim.
+"""
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from .dados import MES
+
+ANTES = [('avaliacao', '0005_resumos_mensais')]
+DEPOIS = [('avaliacao', '0006_item_unico_por_tipo')]
+
+
+class ItemUnicoPorTipoTests(TransactionTestCase):
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.ultimas = executor.loader.graph.leaf_nodes('avaliacao')
+        executor.migrate(ANTES)
+        self.apps = executor.loader.project_state(ANTES).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.ultimas)
+
+    def migrar(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(DEPOIS)
+        return executor.loader.project_state(DEPOIS).apps
+
+    def test_mantem_o_item_com_nota_e_refaz_as_somas(self):
+        Colaborador = self.apps.get_model('avaliacao', 'Colaborador')
+        Tipo = self.apps.get_model('avaliacao', 'TipoItemAvaliacaoDesempenho')
+        Avaliacao = self.apps.get_model('avaliacao', 'AvaliacaoDesempenho')
+        Item = self.apps.get_model('avaliacao', 'ItemAvaliacaoDesempenho')
+        ResumoMensalItem = self.apps.get_model('avaliacao', 'ResumoMensalItem')
+        supervisor = Colaborador.objects.create(nome='Supervisor', cargo='Gerente')
+        colaborador = Colaborador.objects.create(nome='Ana', cargo='Analista')
+        tipo, outro_tipo = [
+            Tipo.objects.create(dimensao='Entregas', tipo_item_avaliacao_desempenho=nome, descricao=nome)
+            for nome in ('Prazo', 'Qualidade')
+        ]
+        avaliacao = Avaliacao.objects.create(
+            colaborador=colaborador, supervisor=supervisor, mes_competencia=MES,
+            soma_notas=4 + 2 + 3, itens_avaliados=3,
+        )
+        sem_nota = Item.objects.create(avaliacao_desempenho=avaliacao, tipo_item_avaliacao_desempenho=tipo)
+        com_nota = Item.objects.create(avaliacao_desempenho=avaliacao, tipo_item_avaliacao_desempenho=tipo, nota=4)
+        Item.objects.create(avaliacao_desempenho=avaliacao, tipo_item_avaliacao_desempenho=tipo, nota=2)
+        Item.objects.filter(pk=com_nota.pk).update(atualizado_em=sem_nota.atualizado_em.replace(year=2030))
+        unico = Item.objects.create(avaliacao_desempenho=avaliacao, tipo_item_avaliacao_desempenho=outro_tipo, nota=3)
+        ResumoMensalItem.objects.create(
+            mes_competencia=MES, supervisor=supervisor, tipo_item_avaliacao_desempenho=tipo,
+            total_itens=3, itens_avaliados=2, soma_notas=6,
+        )
+
+        apps = self.migrar()
+        Item = apps.get_model('avaliacao', 'ItemAvaliacaoDesempenho')
+        self.assertEqual(sorted(Item.objects.values_list('pk', flat=True)), [com_nota.pk, unico.pk])
+        avaliacao = apps.get_model('avaliacao', 'AvaliacaoDesempenho').objects.get()
+        self.assertEqual((avaliacao.soma_notas, avaliacao.itens_avaliados), (7, 2))
+        resumo = apps.get_model('avaliacao', 'ResumoMensal').objects.get()
+        self.assertEqual((resumo.total_avaliacoes, resumo.soma_notas, resumo.itens_avaliados), (1, 7, 2))
+        resumo_tipo = apps.get_model('avaliacao', 'ResumoMensalItem').objects.get(tipo_item_avaliacao_desempenho=tipo.pk)
+        self.assertEqual((resumo_tipo.total_itens, resumo_tipo.itens_avaliados, resumo_tipo.soma_notas), (1, 1, 4))
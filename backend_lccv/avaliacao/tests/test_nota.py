@@ -0,0 +1,65 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import AvaliacaoDesempenho
+from .dados import AvaliacaoTestCase, MES, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class NotaTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos()
+        self.supervisor, self.colaborador = criar_colaboradores(2)
+        self.client = APIClient()
+
+    def test_com_nota_calcula_no_banco(self):
+        avaliacao = criar_avaliacao(self.colaborador, self.supervisor, notas=[5, 4])
+        anotada = AvaliacaoDesempenho.objects.com_nota().get(pk=avaliacao.pk)
+        # (5 + 4) / (3 tipos * 5) * 100
+        self.assertEqual(anotada.nota_calculada, 60.0)
+        with self.assertNumQueries(0):
+            self.assertEqual(anotada.nota, 60.0)
+
+    def test_propriedade_sem_anotacao_usa_soma_notas(self):
+        avaliacao = criar_avaliacao(self.colaborador, self.supervisor, notas=[5, 5, 5])
+        self.assertEqual(AvaliacaoDesempenho.objects.get(pk=avaliacao.pk).nota, 100.0)
+
+    def test_sem_tipos_nota_zero(self):
+        avaliacao = AvaliacaoDesempenho.objects.create(
+            colaborador=self.colaborador, supervisor=self.supervisor, mes_competencia=MES,
+        )
+        for tipo in self.tipos:
+            tipo.delete()
+        self.assertEqual(AvaliacaoDesempenho.objects.com_nota().get(pk=avaliacao.pk).nota_calculada, 0.0)
+        self.assertEqual(AvaliacaoDesempenho.objects.get(pk=avaliacao.pk).nota, 0)
+
+    def _consultas_listagem(self):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/api/avaliacoes/')
+        self.assertEqual(response.status_code, 200)
+        return len(contexto.captured_queries), response.json()['results']
+
+    def _listagem_nao_cresce(self):
+        colaboradores = criar_colaboradores(12, prefixo='Avaliado')
+        criar_avaliacao(colaboradores[0], self.supervisor, notas=[3, 3, 3])
+        consultas_uma, resultados = self._consultas_listagem()
+        self.assertEqual(resultados[0]['nota'], 60.0)
+        for colaborador in colaboradores[1:]:
+            criar_avaliacao(colaborador, self.supervisor, notas=[1])
+        consultas_varias, resultados = self._consultas_listagem()
+        self.assertEqual(len(resultados), 12)
+        self.assertEqual(consultas_uma, consultas_varias)
+
+    def test_listagem_nao_consulta_por_linha(self):
+        self._listagem_nao_cresce()
+
+    @override_settings(SERIALIZACAO_RAPIDA=False)
+    def test_listagem_nao_consulta_por_linha_com_serializers(self):
+        self._listagem_nao_cresce()
+
+    def test_consulta_traz_nota(self):
+        avaliacao = criar_avaliacao(self.colaborador, self.supervisor, notas=[5, 1])
+        response = self.client.get(f'/api/avaliacoes/{avaliacao.pk}/')
+        self.assertEqual(response.json()['nota'], 40.0)
@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import date
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import AvaliacaoDesempenho
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class PaginacaoTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, = criar_colaboradores(1, prefixo='Supervisor')
+        # nomes repetidos forcam o desempate pela chave primaria
+        self.colaboradores = criar_colaboradores(4, prefixo='Ana') + criar_colaboradores(3, prefixo='Ana')
+        for mes in [date(2026, 1, 1), date(2026, 2, 1)]:
+            for colaborador in self.colaboradores:
+                criar_avaliacao(colaborador, self.supervisor, mes=mes)
+        self.client = APIClient()
+
+    def percorrer(self, url):
+        ids, paginas = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            dados = response.json()
+            paginas.append(dados)
+            ids.extend(linha['id'] for linha in dados['results'])
+            url = dados['next']
+        return ids, paginas
+
+    def test_percorre_tudo_na_ordem_padrao(self):
+        ids, paginas = self.percorrer('/api/avaliacoes/?page_size=3')
+        esperado = list(
+            AvaliacaoDesempenho.objects.order_by('-mes_competencia', 'colaborador__nome', 'pk')
+            .values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, esperado)
+        self.assertEqual(len(paginas), 5)
+        self.assertIsNone(paginas[0]['previous'])
+
+    def test_volta_pela_pagina_anterior(self):
+        _, paginas = self.percorrer('/api/avaliacoes/?page_size=4')
+        terceira = paginas[2]
+        anterior = self.client.get(terceira['previous']).json()
+        self.assertEqual(anterior['results'], paginas[1]['results'])
+
+    def test_ordenacao_pedida_tambem_pagina(self):
+        ids, _ = self.percorrer('/api/avaliacoes/?page_size=5&ordering=colaborador__nome')
+        esperado = list(
+            AvaliacaoDesempenho.objects.order_by('colaborador__nome', 'pk').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, esperado)
+
+    @override_settings(PAGINACAO_TAMANHO_MAXIMO=5)
+    def test_tamanho_maximo(self):
+        response = self.client.get('/api/avaliacoes/?page_size=1000')
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_pagina_profunda_sem_offset(self):
+        _, paginas = self.percorrer('/api/avaliacoes/?page_size=2')
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.get(paginas[-2]['next'])
+        sql = ' '.join(consulta['sql'] for consulta in contexto.captured_queries)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get('/api/avaliacoes/?cursor=xyz').status_code, 404)
+
+    def test_cursor_adulterado(self):
+        def cursor(dados):
+            return base64.urlsafe_b64encode(json.dumps(dados).encode()).decode()
+
+        # ordem padrao: -mes_competencia, colaborador__nome, pk
+        self.assertEqual(
+            self.client.get('/api/avaliacoes/', {'cursor': cursor({'v': ['2026-02-01', 'Ana 002', 0]})}).status_code,
+            200,
+        )
+        adulterados = [
+            [1, 2],
+            {'v': 5},
+            {'v': {'a': 1}},
+            {'v': ['2026-02-01', 'Ana 002']},
+            {'v': [20260201, 'Ana 002', 0]},
+            {'v': [None, 'Ana 002', 0]},
+            {'v': ['fevereiro', 'Ana 002', 0]},
+            {'v': ['2026-02-01', 'Ana 002', 'abc']},
+            {'v': [['2026-02-01'], 'Ana 002', 0]},
+        ]
+        for dados in adulterados:
+            with self.subTest(dados):
+                response = self.client.get('/api/avaliacoes/', {'cursor': cursor(dados)})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Cursor invalido'})
+
+    def test_colaboradores_e_itens(self):
+        ids, _ = self.percorrer('/api/colaboradores/?page_size=3')
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(len(set(ids)), 8)
+        avaliacao = AvaliacaoDesempenho.objects.first()
+        ids, _ = self.percorrer(f'/api/avaliacoes/{avaliacao.pk}/itens/?page_size=2')
+        self.assertEqual(sorted(ids), sorted(avaliacao.itens.values_list('pk', flat=True)))
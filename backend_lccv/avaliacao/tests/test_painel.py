@@ -0,0 +1,140 @@
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..catalogo import tipos_item_por_id
+from ..models import AvaliacaoDesempenho, Colaborador, StatusAvaliacao
+from .dados import MES, AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+FEVEREIRO = date(2026, 2, 1)
+
+
+class PainelTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, self.outro_supervisor = criar_colaboradores(2, prefixo='Supervisor')
+        # os resumos (e a invalidacao dos paineis) rodam no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_equipe()
+        # catalogo aquecido: frio, ele soma uma consulta
+        tipos_item_por_id()
+        self.client = APIClient()
+
+    def criar_equipe(self):
+        self.ana, self.bruno, self.carla, self.davi = [
+            Colaborador.objects.create(nome=nome, cargo='Analista') for nome in ('Ana', 'Bruno', 'Carla', 'Davi')
+        ]
+        criar_avaliacao(self.ana, self.supervisor, notas=[5, 5, 5], status=StatusAvaliacao.CONCLUIDA)
+        # fevereiro eh o ciclo atual do supervisor
+        self.carla_fev = criar_avaliacao(self.carla, self.supervisor, mes=FEVEREIRO)
+        self.ana_fev = criar_avaliacao(self.ana, self.supervisor, mes=FEVEREIRO, notas=[5, 4],
+                                       status=StatusAvaliacao.EM_ELABORACAO)
+        self.bruno_fev = criar_avaliacao(self.bruno, self.supervisor, mes=FEVEREIRO, notas=[3, 3, 3],
+                                         status=StatusAvaliacao.EM_AVALIACAO)
+        self.davi_fev = criar_avaliacao(self.davi, self.outro_supervisor, mes=FEVEREIRO, notas=[1])
+
+    def painel(self, supervisor=None, **parametros):
+        supervisor = supervisor or self.supervisor
+        response = self.client.get(f'/api/colaboradores/{supervisor.pk}/painel/', parametros)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def consultas_do_painel(self, supervisor=None, **parametros):
+        with CaptureQueriesContext(connection) as contexto:
+            dados = self.painel(supervisor, **parametros)
+        return dados, len(contexto.captured_queries)
+
+    def test_payload_do_ciclo_atual(self):
+        dados = self.painel()
+        self.assertEqual(dados['supervisor'], {'id': self.supervisor.pk, 'nome': 'Supervisor 001', 'cargo': 'Analista'})
+        self.assertEqual(dados['mes_competencia'], '2026-02-01')
+        self.assertEqual(dados['total_avaliacoes'], 3)
+        self.assertEqual(dados['status'], {'Criada': 1, 'Em elaboracao': 1, 'Em avaliacao': 1, 'Concluida': 0})
+        # notas 60, 60 e 0 (3 tipos de item, nota maxima 5)
+        self.assertEqual(dados['media_equipe'], 40.0)
+        self.assertEqual(dados['itens_pendentes'], 1 + 3)
+        self.assertEqual(dados['avaliacoes'], [
+            {'id': self.ana_fev.pk, 'colaborador': self.ana.pk, 'colaborador_nome': 'Ana',
+             'status_avaliacao': 'Em elaboracao', 'nota': 60.0, 'itens_avaliados': 2, 'itens_pendentes': 1},
+            {'id': self.bruno_fev.pk, 'colaborador': self.bruno.pk, 'colaborador_nome': 'Bruno',
+             'status_avaliacao': 'Em avaliacao', 'nota': 60.0, 'itens_avaliados': 3, 'itens_pendentes': 0},
+            {'id': self.carla_fev.pk, 'colaborador': self.carla.pk, 'colaborador_nome': 'Carla',
+             'status_avaliacao': 'Criada', 'nota': 0.0, 'itens_avaliados': 0, 'itens_pendentes': 3},
+        ])
+
+    def test_outro_mes_e_supervisor_sem_avaliacoes(self):
+        dados = self.painel(mes=MES.isoformat())
+        self.assertEqual((dados['total_avaliacoes'], dados['media_equipe']), (1, 100.0))
+        self.assertEqual(self.painel(mes='2025-06-01')['avaliacoes'], [])
+        vazio = self.painel(self.ana)
+        self.assertEqual((vazio['mes_competencia'], vazio['total_avaliacoes'], vazio['avaliacoes']), (None, 0, []))
+
+    def test_erros(self):
+        self.assertEqual(self.client.get('/api/colaboradores/999999/painel/').status_code, 404)
+        self.assertEqual(
+            self.client.get(f'/api/colaboradores/{self.supervisor.pk}/painel/', {'mes': 'fevereiro'}).status_code, 400,
+        )
+
+    def test_consultas_nao_crescem_com_a_equipe(self):
+        _, poucas = self.consultas_do_painel()
+        for colaborador in criar_colaboradores(20, prefixo='Outro'):
+            criar_avaliacao(colaborador, self.outro_supervisor, mes=FEVEREIRO, notas=[2])
+        dados, muitas = self.consultas_do_painel(self.outro_supervisor)
+        self.assertEqual(dados['total_avaliacoes'], 21)
+        self.assertEqual(poucas, muitas)
+        # supervisor, ultimo mes, linhas e agregados
+        self.assertLessEqual(muitas, 4)
+
+    def test_vem_do_cache(self):
+        primeiro, _ = self.consultas_do_painel(mes='2026-02-01')
+        dados, consultas = self.consultas_do_painel(mes='2026-02-01')
+        self.assertEqual(dados, primeiro)
+        # so o supervisor (get_object)
+        self.assertEqual(consultas, 1)
+        # UPDATE direto nao passa pelos resumos, o painel continua o do cache
+        AvaliacaoDesempenho.objects.filter(pk=self.carla_fev.pk).update(soma_notas=15)
+        self.assertEqual(self.painel(mes='2026-02-01'), primeiro)
+
+    def test_edicao_de_item_invalida(self):
+        self.painel()
+        item = self.ana_fev.itens.filter(nota__isnull=True).get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/avaliacoes/{self.ana_fev.pk}/itens/{item.pk}/', {'nota': 5},
+                                         format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        linha = self.painel()['avaliacoes'][0]
+        self.assertEqual((linha['nota'], linha['itens_pendentes']), (14 * 100 / 15, 0))
+
+    def test_transicao_invalida_so_o_balde_alterado(self):
+        self.painel()
+        self.painel(self.outro_supervisor)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/avaliacoes/transicao/', {
+                'ids': [self.carla_fev.pk], 'status_destino': StatusAvaliacao.EM_ELABORACAO,
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.painel()['status']['Em elaboracao'], 2)
+        # painel do outro supervisor continua no cache: so o get_object e o ultimo mes
+        _, consultas = self.consultas_do_painel(self.outro_supervisor)
+        self.assertEqual(consultas, 2)
+
+    def test_nova_avaliacao_e_nome_do_colaborador_invalidam(self):
+        self.painel()
+        novo = Colaborador.objects.create(nome='Eva', cargo='Analista')
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_avaliacao(novo, self.supervisor, mes=FEVEREIRO)
+        self.assertEqual(self.painel()['total_avaliacoes'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/colaboradores/{self.bruno.pk}/', {'nome': 'Bruno Dias'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('Bruno Dias', [linha['colaborador_nome'] for linha in self.painel()['avaliacoes']])
+
+    def test_catalogo_muda_a_nota(self):
+        self.assertEqual(self.painel()['media_equipe'], 40.0)
+        criar_tipos()
+        # 6 tipos: as mesmas somas valem metade
+        self.assertEqual(self.painel()['media_equipe'], 20.0)
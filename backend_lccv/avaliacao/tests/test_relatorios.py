@@ -0,0 +1,102 @@
+from datetime import date
+
+from django.db import connection
+from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import AvaliacaoDesempenho, StatusAvaliacao
+from ..resumos import reconstruir_resumos
+from .dados import MES, AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+FEVEREIRO = date(2026, 2, 1)
+
+
+class RelatoriosTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos()
+        self.supervisor, self.outro_supervisor = criar_colaboradores(2, prefixo='Supervisor')
+        self.colaboradores = criar_colaboradores(3)
+        criar_avaliacao(self.colaboradores[0], self.supervisor, notas=[5, 4])
+        criar_avaliacao(self.colaboradores[1], self.supervisor, notas=[3], status=StatusAvaliacao.EM_ELABORACAO)
+        criar_avaliacao(
+            self.colaboradores[2], self.outro_supervisor, mes=FEVEREIRO, notas=[5, 5, 5],
+            status=StatusAvaliacao.CONCLUIDA,
+        )
+        reconstruir_resumos()
+        self.client = APIClient()
+
+    def relatorio(self, nome, **parametros):
+        response = self.client.get(f'/api/relatorios/{nome}/', parametros)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_por_mes(self):
+        self.assertEqual(self.relatorio('por-mes'), [
+            {'mes_competencia': '2026-01-01', 'total_avaliacoes': 2, 'nota_media': 40.0},
+            {'mes_competencia': '2026-02-01', 'total_avaliacoes': 1, 'nota_media': 100.0},
+        ])
+
+    def test_media_bate_com_a_nota_das_avaliacoes(self):
+        esperado = AvaliacaoDesempenho.objects.filter(mes_competencia=MES).com_nota().aggregate(
+            media=Avg('nota_calculada'),
+        )['media']
+        self.assertAlmostEqual(self.relatorio('por-mes')[0]['nota_media'], esperado, places=2)
+
+    def test_por_supervisor(self):
+        self.assertEqual(self.relatorio('por-supervisor'), [
+            {'supervisor': self.supervisor.pk, 'supervisor_nome': 'Supervisor 001', 'total_avaliacoes': 2, 'nota_media': 40.0},
+            {'supervisor': self.outro_supervisor.pk, 'supervisor_nome': 'Supervisor 002', 'total_avaliacoes': 1, 'nota_media': 100.0},
+        ])
+
+    def test_por_tipo_item_e_dimensao(self):
+        por_tipo = {linha['tipo_item_avaliacao_desempenho']: linha for linha in self.relatorio('por-tipo-item')}
+        primeiro, segundo, terceiro = self.tipos
+        self.assertEqual(por_tipo[primeiro.pk]['nota_media'], 4.33)
+        self.assertEqual(por_tipo[segundo.pk]['nota_media'], 4.5)
+        self.assertEqual(por_tipo[terceiro.pk]['itens_avaliados'], 1)
+        self.assertEqual(por_tipo[terceiro.pk]['total_itens'], 3)
+        self.assertEqual(por_tipo[primeiro.pk]['tipo_item_avaliacao_desempenho_nome'], primeiro.tipo_item_avaliacao_desempenho)
+
+        por_dimensao = {linha['dimensao']: linha for linha in self.relatorio('por-dimensao')}
+        self.assertEqual(por_dimensao[terceiro.dimensao], {
+            'dimensao': terceiro.dimensao, 'total_itens': 3, 'itens_avaliados': 1, 'nota_media': 5.0,
+        })
+
+    def test_status_por_mes(self):
+        janeiro, fevereiro = self.relatorio('status-por-mes')
+        self.assertEqual(
+            (janeiro['total_avaliacoes'], janeiro['criada'], janeiro['em_elaboracao'], janeiro['concluida']),
+            (2, 1, 1, 0),
+        )
+        self.assertEqual((fevereiro['total_avaliacoes'], fevereiro['concluida']), (1, 1))
+
+    def test_periodo(self):
+        self.assertEqual(
+            [linha['mes_competencia'] for linha in self.relatorio('por-mes', inicio='2026-02-01')],
+            ['2026-02-01'],
+        )
+        self.assertEqual(
+            [linha['mes_competencia'] for linha in self.relatorio('status-por-mes', fim='2026-01-01')],
+            ['2026-01-01'],
+        )
+        por_tipo = self.relatorio('por-tipo-item', inicio='2026-02-01', fim='2026-02-01')
+        self.assertEqual({linha['itens_avaliados'] for linha in por_tipo}, {1})
+        self.assertEqual(self.client.get('/api/relatorios/por-mes/', {'inicio': 'janeiro'}).status_code, 400)
+
+    def test_consultas_nao_crescem_com_as_avaliacoes(self):
+        nomes = ['por-mes', 'por-supervisor', 'por-dimensao', 'por-tipo-item', 'status-por-mes']
+        for nome in nomes:
+            self.relatorio(nome)
+        with CaptureQueriesContext(connection) as poucas:
+            for nome in nomes:
+                self.relatorio(nome)
+        for colaborador in criar_colaboradores(20, prefixo='Outro'):
+            criar_avaliacao(colaborador, self.supervisor, notas=[1, 2, 3])
+        reconstruir_resumos()
+        with CaptureQueriesContext(connection) as muitas:
+            for nome in nomes:
+                self.relatorio(nome)
+        self.assertEqual(len(poucas.captured_queries), len(muitas.captured_queries))
+        self.assertLessEqual(len(muitas.captured_queries), len(nomes))
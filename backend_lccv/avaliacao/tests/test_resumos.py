@@ -0,0 +1,208 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .. import resumos
+from ..catalogo import tipos_item_por_id
+from ..models import AvaliacaoDesempenho, ItemAvaliacaoDesempenho, ResumoMensal, ResumoMensalItem, StatusAvaliacao
+from ..resumos import marcar_baldes, reconstruir_resumos
+from .dados import MES, AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+FEVEREIRO = date(2026, 2, 1)
+
+
+class Falha(Exception):
+    pass
+
+
+class ResumosTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, self.outro_supervisor = criar_colaboradores(2, prefixo='Supervisor')
+        self.colaboradores = criar_colaboradores(3)
+        self.client = APIClient()
+
+    def resumo(self, mes=MES, supervisor=None):
+        return ResumoMensal.objects.get(mes_competencia=mes, supervisor=supervisor or self.supervisor)
+
+    def fotografia(self):
+        resumos_mensais = list(ResumoMensal.objects.order_by('pk').values(
+            'mes_competencia', 'supervisor_id', 'total_avaliacoes', 'soma_notas',
+            'itens_avaliados', 'criada', 'em_elaboracao', 'em_avaliacao', 'concluida',
+        ))
+        resumos_itens = list(ResumoMensalItem.objects.order_by('pk').values(
+            'mes_competencia', 'supervisor_id', 'tipo_item_avaliacao_desempenho_id',
+            'total_itens', 'itens_avaliados', 'soma_notas',
+        ))
+        chave = lambda linha: sorted(linha.items())
+        return sorted(resumos_mensais, key=chave), sorted(resumos_itens, key=chave)
+
+    def test_edicao_de_item_atualiza_no_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            avaliacao = criar_avaliacao(
+                self.colaboradores[0], self.supervisor, notas=[3], status=StatusAvaliacao.EM_ELABORACAO,
+            )
+        item = avaliacao.itens.order_by('pk')[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'/api/avaliacoes/{avaliacao.pk}/itens/{item.pk}/', {'nota': 5}, format='json',
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        resumo = self.resumo()
+        self.assertEqual((resumo.total_avaliacoes, resumo.soma_notas, resumo.itens_avaliados), (1, 8, 2))
+        self.assertEqual(resumo.em_elaboracao, 1)
+        self.assertEqual(
+            ResumoMensalItem.objects.get(tipo_item_avaliacao_desempenho=item.tipo_item_avaliacao_desempenho).soma_notas,
+            5,
+        )
+
+    def test_incremental_bate_com_reconstrucao(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_avaliacao(self.colaboradores[0], self.supervisor, notas=[1, 2])
+            criar_avaliacao(self.colaboradores[1], self.supervisor, notas=[4])
+            criar_avaliacao(self.colaboradores[2], self.outro_supervisor, mes=FEVEREIRO, notas=[5, 5, 5])
+        with self.captureOnCommitCallbacks(execute=True):
+            AvaliacaoDesempenho.objects.filter(mes_competencia=MES).transicionar(StatusAvaliacao.EM_ELABORACAO)
+        fevereiro = AvaliacaoDesempenho.objects.get(mes_competencia=FEVEREIRO)
+        itens = list(fevereiro.itens.order_by('pk'))
+        with self.captureOnCommitCallbacks(execute=True):
+            itens[0].nota = None
+            itens[0].save()
+            itens[1].nota = 1
+            ItemAvaliacaoDesempenho.objects.atualizar_notas(itens[1:2])
+            itens[2].delete()
+            fevereiro.iniciar()
+        incremental = self.fotografia()
+        reconstruir_resumos()
+        self.assertEqual(self.fotografia(), incremental)
+
+    def test_rollback_descarta_os_baldes_marcados(self):
+        with mock.patch.object(resumos, 'atualizar_resumos') as atualizar:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        marcar_baldes([(MES, self.supervisor.pk)])
+                        raise Falha
+                except Falha:
+                    pass
+                marcar_baldes([(FEVEREIRO, self.outro_supervisor.pk)])
+        atualizar.assert_called_once_with({(FEVEREIRO, self.outro_supervisor.pk)})
+
+    def test_marcacoes_da_transacao_viram_um_recalculo(self):
+        with mock.patch.object(resumos, 'atualizar_resumos') as atualizar:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                marcar_baldes([(MES, self.supervisor.pk)])
+                marcar_baldes([(FEVEREIRO, self.supervisor.pk)])
+                marcar_baldes([(MES, self.supervisor.pk)])
+        self.assertEqual(len(callbacks), 1)
+        atualizar.assert_called_once_with({(MES, self.supervisor.pk), (FEVEREIRO, self.supervisor.pk)})
+        # depois do commit a proxima marcacao registra um novo recalculo
+        with mock.patch.object(resumos, 'atualizar_resumos') as atualizar:
+            with self.captureOnCommitCallbacks(execute=True):
+                marcar_baldes([(MES, self.outro_supervisor.pk)])
+        atualizar.assert_called_once_with({(MES, self.outro_supervisor.pk)})
+
+    def test_transicao_em_lotes_move_as_contagens_sem_recalcular(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for colaborador in self.colaboradores:
+                criar_avaliacao(colaborador, self.supervisor)
+            criar_avaliacao(self.colaboradores[0], self.outro_supervisor, mes=FEVEREIRO)
+        with mock.patch.object(resumos, 'atualizar_resumos') as atualizar:
+            with self.captureOnCommitCallbacks(execute=True):
+                ids = AvaliacaoDesempenho.objects.transicionar(StatusAvaliacao.EM_ELABORACAO, lote=1)
+        self.assertEqual(len(ids), 4)
+        atualizar.assert_not_called()
+        self.assertEqual((self.resumo().criada, self.resumo().em_elaboracao), (0, 3))
+        fevereiro = self.resumo(FEVEREIRO, self.outro_supervisor)
+        self.assertEqual((fevereiro.criada, fevereiro.em_elaboracao), (0, 1))
+
+    def test_edicao_de_item_aplica_o_delta_sem_recalcular(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            avaliacao = criar_avaliacao(
+                self.colaboradores[0], self.supervisor, notas=[3, 4], status=StatusAvaliacao.EM_ELABORACAO,
+            )
+            criar_avaliacao(self.colaboradores[1], self.supervisor, notas=[2])
+        tipos_item_por_id()
+        item = avaliacao.itens.order_by('pk')[0]
+        with CaptureQueriesContext(connection) as contexto:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f'/api/avaliacoes/{avaliacao.pk}/itens/{item.pk}/', {'nota': 1}, format='json',
+                )
+        self.assertEqual(response.status_code, 200, response.content)
+        sqls = [consulta['sql'] for consulta in contexto.captured_queries]
+        self.assertFalse([sql for sql in sqls if sql.startswith(('DELETE', 'INSERT'))])
+        self.assertEqual(len([sql for sql in sqls if 'avaliacao_resumomensal' in sql]), 2)
+        self.assertLessEqual(len(sqls), 12)
+        resumo = self.resumo()
+        self.assertEqual((resumo.soma_notas, resumo.itens_avaliados), (1 + 4 + 2, 3))
+        incremental = self.fotografia()
+        reconstruir_resumos()
+        self.assertEqual(self.fotografia(), incremental)
+
+    def test_delta_desfeito_com_a_transacao(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            avaliacao = criar_avaliacao(self.colaboradores[0], self.supervisor, notas=[3])
+        antes = self.fotografia()
+        item = avaliacao.itens.order_by('pk')[0]
+        with mock.patch.object(resumos, 'atualizar_resumos') as atualizar:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        item.nota = 5
+                        item.save()
+                        self.assertEqual(self.resumo().soma_notas, 5)
+                        avaliacao.iniciar()
+                        raise Falha
+                except Falha:
+                    pass
+        atualizar.assert_not_called()
+        self.assertEqual(self.fotografia(), antes)
+
+    def test_balde_sem_resumo_eh_recalculado_no_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            avaliacao = criar_avaliacao(self.colaboradores[0], self.supervisor, notas=[3])
+        ResumoMensalItem.objects.all().delete()
+        item = avaliacao.itens.order_by('pk')[0]
+        item.nota = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+        self.assertEqual(self.resumo().soma_notas, 2)
+        self.assertEqual(ResumoMensalItem.objects.get(tipo_item_avaliacao_desempenho=item.tipo_item_avaliacao_desempenho)
+                         .soma_notas, 2)
+
+    def test_deltas_travam_os_meses_compartilhados(self):
+        with CaptureQueriesContext(connection) as contexto:
+            resumos.mover_status({(FEVEREIRO, self.supervisor.pk): 1, (MES, self.supervisor.pk): 2},
+                                 StatusAvaliacao.CRIADA, StatusAvaliacao.EM_ELABORACAO)
+        travas = [consulta['sql'] for consulta in contexto.captured_queries if 'pg_advisory_xact_lock' in consulta['sql']]
+        chave = resumos.CHAVE_TRAVA
+        self.assertEqual(travas, [
+            f'SELECT pg_advisory_xact_lock_shared({chave}, 0), pg_advisory_xact_lock_shared({chave}, {2026 * 12 + 1}), '
+            f'pg_advisory_xact_lock_shared({chave}, {2026 * 12 + 2})',
+        ])
+
+    def test_recalculo_trava_os_meses(self):
+        with CaptureQueriesContext(connection) as contexto:
+            resumos.atualizar_resumos({(FEVEREIRO, self.supervisor.pk), ('2026-01-01', self.supervisor.pk)})
+        travas = [consulta['sql'] for consulta in contexto.captured_queries if 'pg_advisory_xact_lock' in consulta['sql']]
+        chave = resumos.CHAVE_TRAVA
+        self.assertEqual(travas, [
+            f'SELECT pg_advisory_xact_lock_shared({chave}, 0)',
+            f'SELECT pg_advisory_xact_lock({chave}, {2026 * 12 + 1})',
+            f'SELECT pg_advisory_xact_lock({chave}, {2026 * 12 + 2})',
+        ])
+
+    def test_comando_reconstruir(self):
+        criar_avaliacao(self.colaboradores[0], self.supervisor, notas=[2])
+        ResumoMensal.objects.all().delete()
+        saida = StringIO()
+        call_command('reconstruir_resumos', stdout=saida)
+        self.assertIn('1 resumos mensais e 3 resumos por tipo de item recalculados', saida.getvalue())
+        self.assertEqual(self.resumo().soma_notas, 2)
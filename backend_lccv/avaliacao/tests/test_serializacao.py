@@ -0,0 +1,95 @@
+from datetime import date
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from ..benchmark import executar_benchmark
+from ..models import StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+FEVEREIRO = date(2026, 2, 1)
+
+
+class SerializacaoRapidaTests(AvaliacaoTestCase):
+    """A serializacao rapida tem que responder byte a byte o mesmo que os serializers do DRF"""
+
+    def setUp(self):
+        super().setUp()
+        criar_tipos(por_dimensao=2)
+        supervisor, outro_supervisor = criar_colaboradores(2, prefixo='Supervisor', cargo='Gerente')
+        colaboradores = criar_colaboradores(5)
+        self.avaliacoes = [
+            criar_avaliacao(colaboradores[0], supervisor, notas=[5, 4, 3], status=StatusAvaliacao.EM_ELABORACAO,
+                            sugestoes_supervisor='Manter o ritmo das entregas'),
+            criar_avaliacao(colaboradores[1], supervisor, notas=[1, 2, 3, 4, 5, 5], status=StatusAvaliacao.CONCLUIDA,
+                            observacoes_avaliado='Entregas no prazo, com ajuda da equipe'),
+            criar_avaliacao(colaboradores[2], outro_supervisor),
+            criar_avaliacao(colaboradores[3], outro_supervisor, mes=FEVEREIRO, notas=[2],
+                            status=StatusAvaliacao.EM_AVALIACAO, sugestoes_supervisor='Revisar as entregas'),
+            criar_avaliacao(colaboradores[4], supervisor, mes=FEVEREIRO, notas=[4, 4],
+                            status=StatusAvaliacao.EM_ELABORACAO),
+        ]
+        item = self.avaliacoes[0].itens.first()
+        item.observacoes = 'Ótimo — acima do esperado'
+        item.save()
+        self.client = APIClient()
+
+    def respostas(self, url):
+        conteudos = []
+        for rapida in (True, False):
+            with override_settings(SERIALIZACAO_RAPIDA=rapida):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            conteudos.append(response.content)
+        return conteudos
+
+    def assertMesmaResposta(self, url):
+        rapida, serializer = self.respostas(url)
+        self.assertEqual(rapida, serializer, url)
+        return rapida
+
+    def test_listagem(self):
+        conteudo = self.assertMesmaResposta('/api/avaliacoes/')
+        self.assertIn(b'"nota":', conteudo)
+        self.assertIn(b'"supervisor_nome":"Supervisor 002"', conteudo)
+
+    def test_listagem_paginada(self):
+        conteudo = self.assertMesmaResposta('/api/avaliacoes/?page_size=2')
+        self.assertIn(b'"next":"http', conteudo)
+
+    def test_detalhe(self):
+        for avaliacao in self.avaliacoes:
+            conteudo = self.assertMesmaResposta(f'/api/avaliacoes/{avaliacao.pk}/')
+            self.assertIn(b'"itens":[', conteudo)
+        self.assertIn('Ótimo'.encode(), self.respostas(f'/api/avaliacoes/{self.avaliacoes[0].pk}/')[0])
+
+    def test_fields(self):
+        for fields in ('id,mes_competencia', 'colaborador_nome,nota,id', 'supervisor_nome,status_avaliacao_display'):
+            self.assertMesmaResposta(f'/api/avaliacoes/?fields={fields}')
+        avaliacao = self.avaliacoes[0]
+        for fields in ('id,itens', 'nota,colaborador_detail', 'supervisor_detail,sugestoes_supervisor,observacoes_avaliado'):
+            self.assertMesmaResposta(f'/api/avaliacoes/{avaliacao.pk}/?fields={fields}')
+
+    def test_ordering(self):
+        for ordenacao in ('nota', '-nota', 'colaborador__nome', '-mes_competencia', 'soma_notas,-colaborador__nome'):
+            self.assertMesmaResposta(f'/api/avaliacoes/?ordering={ordenacao}')
+        self.assertMesmaResposta('/api/avaliacoes/?ordering=-nota&fields=id,nota&page_size=2')
+
+    def test_busca(self):
+        conteudo = self.assertMesmaResposta('/api/avaliacoes/?q=entregas')
+        self.assertIn(b'"id":', conteudo)
+        self.assertMesmaResposta('/api/avaliacoes/?q=entregas&fields=id,colaborador_nome&ordering=nota')
+        self.assertMesmaResposta('/api/avaliacoes/?q=inexistente')
+
+    def test_filtros(self):
+        self.assertMesmaResposta(f'/api/avaliacoes/?mes_competencia={FEVEREIRO.isoformat()}')
+        self.assertMesmaResposta(f'/api/avaliacoes/?status_avaliacao={StatusAvaliacao.EM_ELABORACAO}')
+
+
+class BenchmarkSerializacaoTests(AvaliacaoTestCase):
+    def test_mede_as_duas_serializacoes(self):
+        resultado = executar_benchmark([10], repeticoes=1, tipos=3, meses=1)
+        casos = resultado['escalas'][0]['casos']
+        for caso in ('avaliacoes_lista_200', 'avaliacao_detalhe'):
+            rapida, serializer = casos[f'{caso}_rapida'], casos[f'{caso}_serializer']
+            self.assertLessEqual(rapida['consultas'], serializer['consultas'])
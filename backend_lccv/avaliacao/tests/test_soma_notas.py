@@ -0,0 +1,135 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery
+from django.core.management import CommandError, call_command
+from rest_framework.test import APIClient
+
+from ..models import CONFIG_BUSCA, AvaliacaoDesempenho, ItemAvaliacaoDesempenho, ResumoMensal, StatusAvaliacao
+from .dados import AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class SomaNotasTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipos = criar_tipos()
+        self.supervisor, self.colaborador = criar_colaboradores(2)
+        # os resumos do balde sao gravados no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.avaliacao = criar_avaliacao(
+                self.colaborador, self.supervisor, status=StatusAvaliacao.EM_ELABORACAO,
+            )
+        self.itens = list(self.avaliacao.itens.order_by('pk'))
+        self.client = APIClient()
+
+    def totais(self):
+        return AvaliacaoDesempenho.objects.values_list('soma_notas', 'itens_avaliados').get(pk=self.avaliacao.pk)
+
+    def encontradas(self, termo):
+        return AvaliacaoDesempenho.objects.filter(busca=SearchQuery(termo, config=CONFIG_BUSCA)).count()
+
+    def test_edicao_de_item_pela_api_aplica_delta(self):
+        url = f'/api/avaliacoes/{self.avaliacao.pk}/itens/{self.itens[0].pk}/'
+        self.client.patch(url, {'nota': 5}, format='json')
+        self.assertEqual(self.totais(), (5, 1))
+        self.client.patch(url, {'nota': 2}, format='json')
+        self.assertEqual(self.totais(), (2, 1))
+        self.client.patch(url, {'nota': None}, format='json')
+        self.assertEqual(self.totais(), (0, 0))
+
+    def test_atualizar_notas_em_lote(self):
+        for nota, item in zip([4, 3, 2], self.itens):
+            item.nota = nota
+        ItemAvaliacaoDesempenho.objects.atualizar_notas(self.itens)
+        self.assertEqual(self.totais(), (9, 3))
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+
+    def test_save_da_avaliacao_nao_desfaz_edicao_dos_itens(self):
+        # instancia lida antes das edicoes dos itens, como um formulario do admin aberto
+        antiga = AvaliacaoDesempenho.objects.get(pk=self.avaliacao.pk)
+        item = ItemAvaliacaoDesempenho.objects.get(pk=self.itens[0].pk)
+        item.nota = 5
+        item.save()
+        self.itens[1].nota = 3
+        ItemAvaliacaoDesempenho.objects.atualizar_notas([self.itens[1]])
+
+        antiga.sugestoes_supervisor = 'Melhorar a documentacao'
+        antiga.save()
+        # um save() depois do outro, intercalado com mais uma edicao
+        item.nota = 4
+        item.save()
+        antiga.observacoes_avaliado = 'Concordo'
+        antiga.save()
+
+        self.assertEqual(self.totais(), (7, 2))
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+        antiga.refresh_from_db()
+        self.assertEqual(antiga.sugestoes_supervisor, 'Melhorar a documentacao')
+
+    def test_save_com_update_fields_recusa_colunas_desnormalizadas(self):
+        self.avaliacao.soma_notas = 99
+        self.avaliacao.itens_avaliados = 9
+        self.avaliacao.sugestoes_supervisor = 'Texto novo'
+        with self.assertRaisesMessage(ValueError, 'itens_avaliados, soma_notas nao sao gravados pelo save()'):
+            self.avaliacao.save(update_fields=['soma_notas', 'itens_avaliados', 'sugestoes_supervisor'])
+        self.assertEqual(self.totais(), (0, 0))
+        self.assertIsNone(AvaliacaoDesempenho.objects.get(pk=self.avaliacao.pk).sugestoes_supervisor)
+
+    def test_item_apagado_sai_da_soma_da_busca_e_do_resumo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for nota, texto, item in zip([4, 3, 2], ['Pontualidade', 'Organizacao', 'Comunicacao'], self.itens):
+                item.nota = nota
+                item.observacoes = texto
+                item.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.itens[0].delete()
+        self.assertEqual(self.totais(), (5, 2))
+        self.assertFalse(AvaliacaoDesempenho.objects.divergentes().exists())
+        self.assertEqual(ResumoMensal.objects.values_list('soma_notas', 'itens_avaliados').get(), (5, 2))
+        self.assertEqual(self.encontradas('pontualidade'), 0)
+        self.assertEqual(self.encontradas('organizacao'), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ItemAvaliacaoDesempenho.objects.filter(pk__in=[item.pk for item in self.itens[1:]]).delete()
+        self.assertEqual(self.totais(), (0, 0))
+        self.assertEqual(ResumoMensal.objects.values_list('soma_notas', 'itens_avaliados').get(), (0, 0))
+        self.assertEqual(self.encontradas('organizacao'), 0)
+
+    def test_item_apagado_pelo_admin(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha'))
+        item = self.itens[0]
+        item.nota = 5
+        item.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/avaliacao/itemavaliacaodesempenho/', {
+                'action': 'delete_selected', '_selected_action': [item.pk], 'post': 'yes',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.totais(), (0, 0))
+        self.assertEqual(ResumoMensal.objects.values_list('soma_notas', flat=True).get(), 0)
+
+    def test_avaliacao_apagada_leva_os_itens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.avaliacao.delete()
+        self.assertFalse(ItemAvaliacaoDesempenho.objects.exists())
+        self.assertFalse(ResumoMensal.objects.exists())
+
+    def test_comando_recalcular_notas(self):
+        ItemAvaliacaoDesempenho.objects.filter(pk=self.itens[0].pk).update(nota=5)
+        with self.assertRaises(CommandError):
+            call_command('recalcular_notas', verificar=True, stdout=StringIO())
+        call_command('recalcular_notas', stdout=StringIO())
+        self.assertEqual(self.totais(), (5, 1))
+        call_command('recalcular_notas', verificar=True, stdout=StringIO())
+
+    def test_ordenacao_e_faixa_por_nota(self):
+        outros = criar_colaboradores(2, prefixo='Outro')
+        media = criar_avaliacao(outros[0], self.supervisor, notas=[3, 3, 3])
+        alta = criar_avaliacao(outros[1], self.supervisor, notas=[5, 5, 5])
+        response = self.client.get('/api/avaliacoes/?ordering=-nota')
+        self.assertEqual(
+            [linha['id'] for linha in response.json()['results']],
+            [alta.pk, media.pk, self.avaliacao.pk],
+        )
+        response = self.client.get('/api/avaliacoes/?nota_min=50&nota_max=80')
+        self.assertEqual([linha['id'] for linha in response.json()['results']], [media.pk])
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import AvaliacaoDesempenho, StatusAvaliacao
+from .dados import MES, AvaliacaoTestCase, criar_avaliacao, criar_colaboradores, criar_tipos
+
+
+class TransicaoLoteTests(AvaliacaoTestCase):
+    def setUp(self):
+        super().setUp()
+        criar_tipos()
+        self.supervisor, self.outro_supervisor = criar_colaboradores(2, prefixo='Supervisor')
+        self.avaliacoes = [
+            criar_avaliacao(colaborador, self.supervisor)
+            for colaborador in criar_colaboradores(4)
+        ]
+        self.client = APIClient()
+
+    def status(self):
+        return dict(AvaliacaoDesempenho.objects.values_list('pk', 'status_avaliacao'))
+
+    def transicao(self, **dados):
+        return self.client.post('/api/avaliacoes/transicao/', dados, format='json')
+
+    def test_por_ids_com_falhas_por_id(self):
+        concluida = criar_avaliacao(
+            criar_colaboradores(1, prefixo='Outro')[0], self.supervisor, status=StatusAvaliacao.CONCLUIDA,
+        )
+        ids = [self.avaliacoes[0].pk, self.avaliacoes[1].pk, concluida.pk, 999999]
+        response = self.transicao(status_destino=StatusAvaliacao.EM_ELABORACAO, ids=ids)
+        self.assertEqual(response.status_code, 200, response.content)
+        dados = response.json()
+        self.assertEqual(sorted(dados['sucesso']), [self.avaliacoes[0].pk, self.avaliacoes[1].pk])
+        self.assertEqual([falha['id'] for falha in dados['falhas']], [concluida.pk, 999999])
+        self.assertIn('Concluida', dados['falhas'][0]['detail'])
+        self.assertEqual(dados['falhas'][1]['detail'], 'Avaliacao nao encontrada')
+        status = self.status()
+        self.assertEqual(status[self.avaliacoes[0].pk], StatusAvaliacao.EM_ELABORACAO)
+        self.assertEqual(status[self.avaliacoes[2].pk], StatusAvaliacao.CRIADA)
+        self.assertEqual(status[concluida.pk], StatusAvaliacao.CONCLUIDA)
+
+    def test_por_filtro(self):
+        outra = criar_avaliacao(criar_colaboradores(1, prefixo='Outro')[0], self.outro_supervisor)
+        response = self.transicao(
+            status_destino=StatusAvaliacao.EM_ELABORACAO,
+            mes_competencia=MES.isoformat(),
+            supervisor=self.supervisor.pk,
+        )
+        self.assertEqual(sorted(response.json()['sucesso']), sorted(a.pk for a in self.avaliacoes))
+        self.assertEqual(self.status()[outra.pk], StatusAvaliacao.CRIADA)
+
+    def test_exige_ids_ou_filtro(self):
+        response = self.transicao(status_destino=StatusAvaliacao.EM_ELABORACAO)
+        self.assertEqual(response.status_code, 400)
+        response = self.transicao(status_destino=StatusAvaliacao.CRIADA, ids=[self.avaliacoes[0].pk])
+        self.assertEqual(response.status_code, 400)
+
+    def test_um_update_por_lote(self):
+        ids = list(AvaliacaoDesempenho.objects.values_list('pk', flat=True))
+        with CaptureQueriesContext(connection) as contexto:
+            atualizadas = AvaliacaoDesempenho.objects.filter(pk__in=ids).transicionar(
+                StatusAvaliacao.EM_ELABORACAO, lote=2,
+            )
+        self.assertEqual(sorted(atualizadas), sorted(ids))
+        updates = [
+            consulta['sql'] for consulta in contexto.captured_queries
+            if consulta['sql'].startswith('UPDATE "avaliacao_avaliacaodesempenho"')
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertTrue(all('"status_avaliacao" = ' in sql.split('WHERE', 1)[1] for sql in updates))
+
+    def test_ciclo_completo(self):
+        ids = [avaliacao.pk for avaliacao in self.avaliacoes]
+        for destino in [StatusAvaliacao.EM_ELABORACAO, StatusAvaliacao.EM_AVALIACAO, StatusAvaliacao.CONCLUIDA]:
+            self.assertEqual(sorted(self.transicao(status_destino=destino, ids=ids).json()['sucesso']), ids)
+        # repetir a ultima transicao nao acha mais nada no status de origem
+        dados = self.transicao(status_destino=StatusAvaliacao.CONCLUIDA, ids=ids).json()
+        self.assertEqual(dados['sucesso'], [])
+        self.assertEqual(len(dados['falhas']), 4)
+
+    def test_acao_do_admin_usa_o_lote(self):
+        usuario = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.client.force_login(usuario)
+        selecionadas = [self.avaliacoes[0].pk, self.avaliacoes[1].pk]
+        response = self.client.post('/admin/avaliacao/avaliacaodesempenho/', {
+            'action': 'acao_iniciar',
+            '_selected_action': selecionadas,
+        }, follow=True)
+        self.assertContains(response, '2 avaliacoes iniciadas com sucesso')
+        status = self.status()
+        self.assertEqual(status[self.avaliacoes[0].pk], StatusAvaliacao.EM_ELABORACAO)
+        self.assertEqual(status[self.avaliacoes[2].pk], StatusAvaliacao.CRIADA)
@@ -1,14 +1,25 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import DefaultRouter, Route
 from rest_framework_nested import routers as nested_routers
 from django.urls import path, include
 
+from . import assincrono
 from .views import (
     ColaboradorViewSet,
     TipoItemAvaliacaoDesempenhoViewSet,
     AvaliacaoDesempenhoViewSet,
     ItemAvaliacaoDesempenhoViewSet,
+    RelatorioViewSet,
+    MetricasViewSet,
 )
 
+class ItensRouter(nested_routers.NestedDefaultRouter):
+    # PATCH na rota de listagem edita varios itens de uma vez
+    routes = [
+        route._replace(mapping={**route.mapping, 'patch': 'atualizar_lote'})
+        if isinstance(route, Route) and route.name == '{basename}-list' else route
+        for route in nested_routers.NestedDefaultRouter.routes
+    ]
+
 router = DefaultRouter()
 
 router.register('colaboradores', ColaboradorViewSet, basename='colaborador')
@@ -17,11 +28,32 @@ router.register('tipos-item-avaliacao', TipoItemAvaliacaoDesempenhoViewSet, base
 
 router.register('avaliacoes', AvaliacaoDesempenhoViewSet, basename='avaliacao')
 
+router.register('relatorios', RelatorioViewSet, basename='relatorio')
+
+router.register('_metrics', MetricasViewSet, basename='metricas')
+
 #rota aninhada
-avaliacoes_router = nested_routers.NestedDefaultRouter(router, 'avaliacoes', lookup='avaliacao')
+avaliacoes_router = ItensRouter(router, 'avaliacoes', lookup='avaliacao')
 avaliacoes_router.register('itens', ItemAvaliacaoDesempenhoViewSet, basename='avaliacao-itens')
 
+# variantes async dos endpoints de leitura, para rodar com ASGI (ver assincrono.py)
+urls_async = [
+    path('colaboradores/', assincrono.colaboradores, name='async-colaborador-list'),
+    path('colaboradores/<str:pk>/', assincrono.colaborador, name='async-colaborador-detail'),
+    path('avaliacoes/', assincrono.avaliacoes, name='async-avaliacao-list'),
+    path('avaliacoes/export/', assincrono.exportar, name='async-avaliacao-exportar'),
+    path('avaliacoes/<str:pk>/', assincrono.avaliacao, name='async-avaliacao-detail'),
+    path('avaliacoes/<str:avaliacao_pk>/itens/', assincrono.itens, name='async-avaliacao-itens-list'),
+    path('avaliacoes/<str:avaliacao_pk>/itens/<str:pk>/', assincrono.item, name='async-avaliacao-itens-detail'),
+    path('relatorios/por-mes/', assincrono.relatorio_por_mes, name='async-relatorio-por-mes'),
+    path('relatorios/por-supervisor/', assincrono.relatorio_por_supervisor, name='async-relatorio-por-supervisor'),
+    path('relatorios/por-dimensao/', assincrono.relatorio_por_dimensao, name='async-relatorio-por-dimensao'),
+    path('relatorios/por-tipo-item/', assincrono.relatorio_por_tipo_item, name='async-relatorio-por-tipo-item'),
+    path('relatorios/status-por-mes/', assincrono.relatorio_status_por_mes, name='async-relatorio-status-por-mes'),
+]
+
 urlpatterns = [
+    path('async/', include(urls_async)),
     path('', include(router.urls)),
     path('', include(avaliacoes_router.urls)),
 ]
\ No newline at end of file
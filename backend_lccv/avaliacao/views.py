@@ -1,9 +1,30 @@
-from django.shortcuts import render
+import csv
+import io
+
+from django.shortcuts import render, get_object_or_404
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from .models import (Colaborador,TipoItemAvaliacaoDesempenho,AvaliacaoDesempenho,ItemAvaliacaoDesempenho,StatusAvaliacao)
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from django_filters.rest_framework import DjangoFilterBackend
+from .filters import (
+    AvaliacaoDesempenhoFilter,
+    AvaliacaoOrderingFilter,
+    BuscaOrderingFilter,
+    BuscaTextualFilter,
+    colunas_ordenacao,
+)
+from .ciclos import abrir_ciclo
+from .condicional import ConditionalGetMixin
+from . import exportacao, historico, importacao, metricas, painel, relatorios
+from .renderers import CSVRenderer, JSONLinesRenderer
+from .serializacao import SerializacaoRapidaMixin
+from .models import (Colaborador,TipoItemAvaliacaoDesempenho,AvaliacaoDesempenho,ItemAvaliacaoDesempenho,StatusAvaliacao,ORIGEM_TRANSICAO)
 
 from .serializers import (
     ColaboradorSerializer,
@@ -12,6 +33,24 @@ from .serializers import (
     AvaliacaoDesempenhoDetailSerializer,
     AvaliacaoDesempenhoEditarSerializer,
     ItemAvaliacaoDesempenhoSerializer,
+    ItemNotaLoteSerializer,
+    AbrirCicloSerializer,
+    CicloResultadoSerializer,
+    TransicaoLoteSerializer,
+    TransicaoResultadoSerializer,
+    CONSULTA_CAMPOS_AVALIACAO,
+    PeriodoRelatorioSerializer,
+    RelatorioMesSerializer,
+    RelatorioSupervisorSerializer,
+    RelatorioDimensaoSerializer,
+    RelatorioTipoItemSerializer,
+    RelatorioStatusMesSerializer,
+    ImportacaoSerializer,
+    ImportacaoResultadoSerializer,
+    PainelFiltroSerializer,
+    HistoricoFiltroSerializer,
+    HistoricoSerializer,
+    PainelSerializer,
 )
 
 @extend_schema_view(
@@ -21,10 +60,52 @@ from .serializers import (
     update=extend_schema(summary='Editar colaborador'),
     partial_update=extend_schema(summary='Editar colaborador parcialmente'),
 )
-class ColaboradorViewSet(viewsets.ModelViewSet):
+class ColaboradorViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Colaborador.objects.all()
     serializer_class = ColaboradorSerializer
     http_method_names = ['get', 'post', 'patch', 'put']
+    filter_backends = [DjangoFilterBackend, BuscaTextualFilter, BuscaOrderingFilter]
+    ordering_fields = ['nome']
+    ordering = ['nome']
+
+    @extend_schema(
+        summary='Painel do supervisor',
+        description=(
+            'Avaliacoes supervisionadas pelo colaborador no mes, com nota, itens pendentes, '
+            'contagem por status e media da equipe. Fica em cache por supervisor e mes ate a '
+            'proxima alteracao nas avaliacoes do mes.'
+        ),
+        parameters=[PainelFiltroSerializer],
+        responses={200: PainelSerializer},
+    )
+    @action(detail=True, methods=['get'])
+    def painel(self, request, pk=None):
+        filtro = PainelFiltroSerializer(data=request.query_params)
+        filtro.is_valid(raise_exception=True)
+        supervisor = self.get_object()
+        dados = painel.painel(supervisor.pk, filtro.validated_data.get('mes'))
+        return Response({'supervisor': ColaboradorSerializer(supervisor).data, **dados})
+
+    @extend_schema(
+        summary='Historico de notas do colaborador',
+        description=(
+            'Nota da avaliacao e media dos itens por dimensao em cada mes de competencia, '
+            'com media movel (?janela=) e variacao em relacao a avaliacao anterior (?variacao=true).'
+        ),
+        parameters=[HistoricoFiltroSerializer],
+        responses={200: HistoricoSerializer},
+    )
+    @action(detail=True, methods=['get'])
+    def historico(self, request, pk=None):
+        filtro = HistoricoFiltroSerializer(data=request.query_params)
+        filtro.is_valid(raise_exception=True)
+        colaborador = self.get_object()
+        meses = historico.historico(colaborador.pk, **filtro.validated_data)
+        return Response(HistoricoSerializer({
+            'colaborador': colaborador,
+            'janela': filtro.validated_data.get('janela'),
+            'meses': meses,
+        }).data)
 
 @extend_schema_view(
     list=extend_schema(summary='Listar tipos de itens de avaliação'),
@@ -33,33 +114,234 @@ class ColaboradorViewSet(viewsets.ModelViewSet):
     update=extend_schema(summary='Editar tipo de item de avaliação'),
     partial_update=extend_schema(summary='Editar tipo de item de avaliação parcialmente'),
 )
-class TipoItemAvaliacaoDesempenhoViewSet(viewsets.ModelViewSet):
+class TipoItemAvaliacaoDesempenhoViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 
     """gerenciar  tipos de itens de avaliação"""
 
     queryset = TipoItemAvaliacaoDesempenho.objects.all()
     serializer_class = TipoItemAvaliacaoDesempenhoSerializer
     http_method_names = ['get', 'post', 'patch', 'put']
+    # catalogo pequeno, os clientes sempre carregam ele inteiro
+    pagination_class = None
 
 @extend_schema_view(
-    list=extend_schema(summary='Listar avaliações de desempenho'),
-    retrieve=extend_schema(summary='Consultar avaliação de desempenho'),
+    list=extend_schema(
+        summary='Listar avaliações de desempenho',
+        parameters=[OpenApiParameter('fields', str, description='Campos da resposta, separados por virgula')],
+    ),
+    retrieve=extend_schema(
+        summary='Consultar avaliação de desempenho',
+        parameters=[OpenApiParameter('fields', str, description='Campos da resposta, separados por virgula')],
+    ),
     create=extend_schema(summary='Cadastrar avaliação de desempenho'),
     update=extend_schema(summary='Editar avaliação de desempenho'),
     partial_update=extend_schema(summary='Editar avaliação de desempenho parcialmente'),
 )
-class AvaliacaoDesempenhoViewSet(viewsets.ModelViewSet):
+class AvaliacaoDesempenhoViewSet(ConditionalGetMixin, SerializacaoRapidaMixin, viewsets.ModelViewSet):
     queryset = AvaliacaoDesempenho.objects.select_related(
         'colaborador', 'supervisor'
-        ).prefetch_related('itens__tipo_item_avaliacao_desempenho')
+        ).prefetch_related('itens').com_nota()
     http_method_names = ['get', 'post', 'patch', 'put']
+    filter_backends = [DjangoFilterBackend, BuscaTextualFilter, AvaliacaoOrderingFilter]
+    filterset_class = AvaliacaoDesempenhoFilter
+    ordering_fields = ['mes_competencia', 'colaborador__nome', 'soma_notas']
+    ordering = ['-mes_competencia', 'colaborador__nome']
+    campos_versao = ['atualizado_em', 'colaborador__atualizado_em', 'supervisor__atualizado_em']
+    depende_catalogo = True
 
     def get_serializer_class(self):
         if self.action == 'list':
             return AvaliacaoDesempenhoListSerializer
         if self.action in ['update', 'partial_update']:
             return AvaliacaoDesempenhoEditarSerializer
+        if self.action == 'abrir_ciclo':
+            return AbrirCicloSerializer
+        if self.action == 'transicao':
+            return TransicaoLoteSerializer
         return AvaliacaoDesempenhoDetailSerializer
+
+    def get_queryset_versao(self):
+        return AvaliacaoDesempenho.objects.all()
+
+    def campos_requisitados(self):
+        """Campos pedidos em ?fields= (so em list e retrieve), None se nao informado"""
+        if self.action not in ['list', 'retrieve']:
+            return None
+        valor = self.request.query_params.get('fields')
+        if not valor:
+            return None
+        campos = [campo.strip() for campo in valor.split(',') if campo.strip()]
+        invalidos = sorted(set(campos) - set(self.get_serializer_class().Meta.fields))
+        if invalidos:
+            raise ValidationError({'fields': f'Campos invalidos: {", ".join(invalidos)}'})
+        return campos
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['campos'] = self.campos_requisitados()
+        return context
+
+    def queryset_para_campos(self):
+        """
+        Monta a consulta so com o que os campos da resposta usam: colunas (only),
+        joins, prefetch dos itens e a nota anotada. Os campos da ordenacao
+        tambem sao carregados, a paginacao le os valores para montar o cursor
+        """
+        campos = self.campos_requisitados() or self.get_serializer_class().Meta.fields
+        colunas, joins, prefetch, nota = {'id'}, set(), set(), False
+        for campo in campos:
+            regra = CONSULTA_CAMPOS_AVALIACAO[campo]
+            colunas.update(regra.get('only', []))
+            joins.update(regra.get('select', []))
+            prefetch.update(regra.get('prefetch', []))
+            nota = nota or regra.get('nota', False)
+
+        queryset = AvaliacaoDesempenho.objects.all()
+        ordenacao = AvaliacaoOrderingFilter().get_ordering(self.request, queryset, self) or []
+        for campo in colunas_ordenacao(ordenacao):
+            colunas.add(campo)
+            if '__' in campo:
+                relacao = campo.split('__')[0]
+                colunas.add(relacao)
+                joins.add(relacao)
+
+        # select_related() sem argumentos seguiria todas as FKs
+        if joins:
+            queryset = queryset.select_related(*joins)
+        queryset = queryset.prefetch_related(*prefetch).only(*colunas)
+        if nota:
+            queryset = queryset.com_nota()
+        return queryset
+
+    def get_queryset(self):
+        if self.action in ['list', 'retrieve']:
+            return self.queryset_para_campos()
+        queryset = super().get_queryset()
+        if self.action in ['update', 'partial_update']:
+            # trava a avaliacao para a validacao de status nao correr com uma transicao
+            return queryset.select_for_update(of=('self',))
+        return queryset
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @extend_schema(
+        summary='Transição de status em lote',
+        description=(
+            'Move para status_destino as avaliações informadas (ids) ou que atendem aos filtros '
+            'e estão no status de origem da transição. Retorna o resultado por id'
+        ),
+        responses={200: TransicaoResultadoSerializer},
+    )
+    @action(detail=False, methods=['post'])
+    def transicao(self, request):
+        serializer = TransicaoLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+        destino = dados['status_destino']
+
+        avaliacoes = AvaliacaoDesempenho.objects.all()
+        ids = dados.get('ids')
+        if ids:
+            avaliacoes = avaliacoes.filter(pk__in=ids)
+        if dados.get('mes_competencia'):
+            avaliacoes = avaliacoes.filter(mes_competencia=dados['mes_competencia'])
+        if dados.get('supervisor'):
+            avaliacoes = avaliacoes.filter(supervisor_id=dados['supervisor'])
+
+        sucesso = avaliacoes.transicionar(destino)
+        falhas = []
+        if ids:
+            restantes = set(ids) - set(sucesso)
+            status_atuais = dict(
+                AvaliacaoDesempenho.objects.filter(pk__in=restantes)
+                .values_list('pk', 'status_avaliacao')
+            )
+            origem = ORIGEM_TRANSICAO[destino]
+            for avaliacao_id in sorted(restantes):
+                if avaliacao_id not in status_atuais:
+                    detail = 'Avaliacao nao encontrada'
+                else:
+                    detail = (
+                        f'A avaliacao esta com status "{status_atuais[avaliacao_id]}", '
+                        f'precisa estar "{origem}"'
+                    )
+                falhas.append({'id': avaliacao_id, 'detail': detail})
+
+        return Response({'status_destino': destino, 'sucesso': sucesso, 'falhas': falhas})
+
+    @extend_schema(
+        summary='Exportar avaliações com itens',
+        description=(
+            'Arquivo com uma linha por item de avaliação (CSV ou JSON Lines), gerado em streaming. '
+            'Aceita os mesmos filtros da listagem'
+        ),
+        parameters=[
+            OpenApiParameter('format', enum=list(exportacao.FORMATOS), default='csv'),
+            OpenApiParameter('mes_competencia', OpenApiTypes.DATE),
+        ],
+        responses={
+            (200, media_type): OpenApiTypes.STR for media_type in exportacao.FORMATOS.values()
+        },
+    )
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        renderer_classes=[CSVRenderer, JSONLinesRenderer],
+        pagination_class=None,
+    )
+    def exportar(self, request):
+        formato = request.accepted_renderer.format
+        avaliacoes = self.filter_queryset(AvaliacaoDesempenho.objects.all())
+        response = StreamingHttpResponse(
+            exportacao.exportar(avaliacoes, formato),
+            content_type=f'{exportacao.FORMATOS[formato]}; charset=utf-8',
+        )
+        nome = exportacao.nome_arquivo(request.query_params.get('mes_competencia'), formato)
+        response['Content-Disposition'] = f'attachment; filename="{nome}"'
+        return response
+
+    @extend_schema(
+        summary='Importar colaboradores e avaliações de um CSV',
+        description=(
+            'Cadastra/atualiza colaboradores, avaliações e itens em lotes. Nomes de colaborador e '
+            'supervisor são resolvidos para ids (colaboradores novos são criados). '
+            'Linhas inválidas são listadas em "erros" sem interromper o restante do arquivo'
+        ),
+        request={'multipart/form-data': ImportacaoSerializer},
+        responses={200: ImportacaoResultadoSerializer},
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def importar(self, request):
+        serializer = ImportacaoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        arquivo = io.TextIOWrapper(serializer.validated_data['arquivo'], encoding='utf-8-sig', newline='')
+        try:
+            resultado = importacao.importar_csv(arquivo)
+        except (importacao.ArquivoInvalido, UnicodeDecodeError, csv.Error) as erro:
+            return Response({'detail': f'Arquivo invalido: {erro}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resultado)
+
+    @extend_schema(
+        summary='Abrir ciclo de avaliação',
+        description='Cria em lote as avaliações do mês para todos os colaboradores, ignorando as que já existem',
+        responses={201: CicloResultadoSerializer},
+    )
+    @action(detail=False, methods=['post'], url_path='abrir-ciclo')
+    def abrir_ciclo(self, request):
+        serializer = AbrirCicloSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+        supervisor_padrao = dados.get('supervisor_padrao')
+        resultado = abrir_ciclo(
+            dados['mes_competencia'],
+            supervisores=dados.get('supervisores'),
+            supervisor_padrao=supervisor_padrao.pk if supervisor_padrao else None,
+            usar_mes_anterior=dados['usar_mes_anterior'],
+        )
+        return Response(resultado, status=status.HTTP_201_CREATED)
     
     @extend_schema(
         summary='Iniciar avaliação',
@@ -69,14 +351,13 @@ class AvaliacaoDesempenhoViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def iniciar(self, request, pk=None):
         avaliacao = self.get_object()
-        if avaliacao.status_avaliacao != StatusAvaliacao.CRIADA:
-            return response(
+        if not avaliacao.iniciar():
+            return Response(
                 {'detail': 'A avaliacao deve ter o status de "criada" para poder ser iniciada'},
                 status= status.HTTP_400_BAD_REQUEST,
             )
-        avaliacao.iniciar()
         serializer = AvaliacaoDesempenhoDetailSerializer(avaliacao)
-        return response(serializer.data)
+        return Response(serializer.data)
     
     @extend_schema(
         summary='Dar feedback',
@@ -86,12 +367,11 @@ class AvaliacaoDesempenhoViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='dar-feedback')
     def dar_feedback(self, request, pk=None):
         avaliacao = self.get_object()
-        if avaliacao.status_avaliacao != StatusAvaliacao.EM_ELABORACAO:
+        if not avaliacao.dar_feedback():
             return Response(
                 {'detail': 'A avaliacao precisa estar "Em elaboração" para receber feedback'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        avaliacao.dar_feedback()
         serializer = AvaliacaoDesempenhoDetailSerializer(avaliacao)
         return Response(serializer.data)
     
@@ -103,12 +383,11 @@ class AvaliacaoDesempenhoViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def concluir(self, request, pk=None):
         avaliacao = self.get_object()
-        if avaliacao.status_avaliacao != StatusAvaliacao.EM_AVALIACAO:
+        if not avaliacao.concluir():
             return Response(
                 {'detail': 'A avaliacao precisa estar "Em avaliação" para ser concluida'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        avaliacao.concluir()
         serializer = AvaliacaoDesempenhoDetailSerializer(avaliacao)
         return Response(serializer.data)
 
@@ -118,7 +397,8 @@ class AvaliacaoDesempenhoViewSet(viewsets.ModelViewSet):
     update=extend_schema(summary='Editar item de avaliacao'),
     partial_update=extend_schema(summary='Editar item de uma avaliacao parcialmente'),
 )
-class ItemAvaliacaoDesempenhoViewSet(viewsets.GenericViewSet,
+class ItemAvaliacaoDesempenhoViewSet(ConditionalGetMixin,
+                                     viewsets.GenericViewSet,
                                      viewsets.mixins.ListModelMixin,
                                      viewsets.mixins.RetrieveModelMixin,
                                      viewsets.mixins.UpdateModelMixin):
@@ -129,6 +409,7 @@ class ItemAvaliacaoDesempenhoViewSet(viewsets.GenericViewSet,
     """
     serializer_class = ItemAvaliacaoDesempenhoSerializer
     http_method_names = ['get', 'patch', 'put']
+    depende_catalogo = True
 
     def get_queryset(self):
         return ItemAvaliacaoDesempenho.objects.filter(
@@ -144,10 +425,133 @@ class ItemAvaliacaoDesempenhoViewSet(viewsets.GenericViewSet,
             )
         return None
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
+        # trava a avaliacao ate o fim da edicao, uma transicao concorrente
+        # (ex: concluir) espera o item ser salvo ou eh vista aqui
+        avaliacao = get_object_or_404(
+            AvaliacaoDesempenho.objects.select_for_update().only('status_avaliacao'),
+            pk=self.kwargs['avaliacao_pk'],
+        )
+        # o item eh lido uma vez so, ja com a avaliacao travada
         item = self.get_object()
-        erro = self.validate_status_editavel(item.avaliacao_desempenho)
+        erro = self.validate_status_editavel(avaliacao)
         if erro:
             return erro
-        response = super().update(request, *args, **kwargs)
-        return response
\ No newline at end of file
+        serializer = self.get_serializer(item, data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+    @extend_schema(
+        summary='Editar itens de uma avaliacao em lote',
+        operation_id='avaliacoes_itens_atualizar_lote',
+        description='Recebe uma lista de {id, nota, observacoes} e retorna a avaliacao atualizada',
+        request=ItemNotaLoteSerializer(many=True),
+        responses={200: AvaliacaoDesempenhoDetailSerializer},
+    )
+    @transaction.atomic
+    def atualizar_lote(self, request, *args, **kwargs):
+        serializer = ItemNotaLoteSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        avaliacao = get_object_or_404(
+            AvaliacaoDesempenho.objects.select_for_update().only('status_avaliacao'),
+            pk=self.kwargs['avaliacao_pk'],
+        )
+        erro = self.validate_status_editavel(avaliacao)
+        if erro:
+            return erro
+
+        dados = {linha['id']: linha for linha in serializer.validated_data}
+        itens = list(self.get_queryset().filter(pk__in=dados))
+        faltando = sorted(set(dados) - {item.pk for item in itens})
+        if faltando:
+            return Response(
+                {'detail': f'Itens nao pertencem a essa avaliacao: {faltando}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        for item in itens:
+            linha = dados[item.pk]
+            if 'nota' in linha:
+                item.nota = linha['nota']
+            if 'observacoes' in linha:
+                item.observacoes = linha['observacoes']
+        ItemAvaliacaoDesempenho.objects.atualizar_notas(itens)
+
+        avaliacao = AvaliacaoDesempenhoViewSet.queryset.get(pk=avaliacao.pk)
+        return Response(AvaliacaoDesempenhoDetailSerializer(avaliacao).data)
+
+
+class RelatorioViewSet(viewsets.ViewSet):
+    """
+    Relatorios agregados das avaliacoes, calculados no banco.
+    Todos aceitam ?inicio= e ?fim= (mes de competencia, inclusive)
+    """
+
+    def _responder(self, request, funcao, serializer_class):
+        periodo = PeriodoRelatorioSerializer(data=request.query_params)
+        periodo.is_valid(raise_exception=True)
+        linhas = funcao(**periodo.validated_data)
+        return Response(serializer_class(linhas, many=True).data)
+
+    @extend_schema(
+        summary='Nota media por mes',
+        parameters=[PeriodoRelatorioSerializer],
+        responses={200: RelatorioMesSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'], url_path='por-mes')
+    def por_mes(self, request):
+        return self._responder(request, relatorios.media_por_mes, RelatorioMesSerializer)
+
+    @extend_schema(
+        summary='Nota media por supervisor',
+        parameters=[PeriodoRelatorioSerializer],
+        responses={200: RelatorioSupervisorSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'], url_path='por-supervisor')
+    def por_supervisor(self, request):
+        return self._responder(request, relatorios.media_por_supervisor, RelatorioSupervisorSerializer)
+
+    @extend_schema(
+        summary='Nota media dos itens por dimensao',
+        parameters=[PeriodoRelatorioSerializer],
+        responses={200: RelatorioDimensaoSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'], url_path='por-dimensao')
+    def por_dimensao(self, request):
+        return self._responder(request, relatorios.media_por_dimensao, RelatorioDimensaoSerializer)
+
+    @extend_schema(
+        summary='Nota media dos itens por tipo de item',
+        parameters=[PeriodoRelatorioSerializer],
+        responses={200: RelatorioTipoItemSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'], url_path='por-tipo-item')
+    def por_tipo_item(self, request):
+        return self._responder(request, relatorios.media_por_tipo_item, RelatorioTipoItemSerializer)
+
+    @extend_schema(
+        summary='Quantidade de avaliacoes por status em cada mes',
+        parameters=[PeriodoRelatorioSerializer],
+        responses={200: RelatorioStatusMesSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'], url_path='status-por-mes')
+    def status_por_mes(self, request):
+        return self._responder(request, relatorios.status_por_mes, RelatorioStatusMesSerializer)
+
+
+class MetricasViewSet(viewsets.ViewSet):
+    """Histogramas por rota medidos pelo MetricasMiddleware (deste processo)"""
+
+    @extend_schema(
+        summary='Metricas por rota',
+        description=(
+            'Para cada rota (metodo + nome da view): total de requisicoes, erros 5xx, histogramas de '
+            'latencia (ms) e de consultas SQL por requisicao, e somas de tempo de banco, de '
+            'serializacao e de bytes. Os valores sao do processo que atendeu a requisicao'
+        ),
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def list(self, request):
+        return Response(metricas.histogramas())
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'avaliacao',
     'rest_framework',
     'drf_spectacular',
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # primeiro da lista para medir tambem o tempo dos outros middlewares
+    'avaliacao.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -74,6 +77,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend_lccv.wsgi.application'
+ASGI_APPLICATION = 'backend_lccv.asgi.application'
 
 
 # Database
@@ -91,6 +95,18 @@ DATABASES = {
 }
 
 
+# Cache
+# Em producao com varios workers use um backend compartilhado (arquivo, redis...)
+# para a invalidacao do catalogo e dos paineis chegar em todos (check avaliacao.W001)
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'avaliacao'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,6 +153,36 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'avaliacao.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('PAGE_SIZE', '50')),
+}
+
+# limite para o parametro ?page_size= das listagens
+PAGINACAO_TAMANHO_MAXIMO = int(os.environ.get('PAGINACAO_TAMANHO_MAXIMO', '200'))
+
+# com True, list e retrieve de /api/avaliacoes/ montam a resposta direto de .values() (ver avaliacao/serializacao.py)
+SERIALIZACAO_RAPIDA = os.environ.get('SERIALIZACAO_RAPIDA', 'False') == 'True'
+
+# por quantos segundos cada worker reaproveita a versao do catalogo lida do cache
+CATALOGO_VERSAO_TTL = float(os.environ.get('CATALOGO_VERSAO_TTL', '5'))
+
+# consultas, tempo de banco e de serializacao por requisicao (Server-Timing, log e /api/_metrics/)
+METRICAS_HABILITADAS = os.environ.get('METRICAS_HABILITADAS', 'True') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # uma linha JSON por requisicao, no nivel INFO (com o padrao WARNING nao sai nada)
+        'avaliacao.metricas': {
+            'handlers': ['console'],
+            'level': os.environ.get('METRICAS_LOG_NIVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
 }
 
 SPECTACULAR_SETTINGS = {